@@ -1,22 +1,21 @@
 from flask import Flask, request, session, jsonify, abort
 import os
 
+from user_store import UserStore
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
 # Mock user database
-users = [
+users = UserStore([
     {"id": 1, "username": "alice", "email": "alice@example.com", "is_admin": False},
     {"id": 2, "username": "bob", "email": "bob@example.com", "is_admin": False},
     {"id": 3, "username": "admin", "email": "admin@example.com", "is_admin": True}
-]
+])
 
 # Hàm tìm User theo ID
 def get_user_by_id(user_id):
-    for user in users:
-        if user["id"] == user_id:
-            return user
-    return None
+    return users.get_by_id(user_id)
 
 # Login route
 @app.route("/login", methods=["POST"])
@@ -25,12 +24,12 @@ def login():
     if not data or "username" not in data:
         return jsonify({"error": "Missing username in JSON body"}), 400
     username = data.get("username")
-    for user in users:
-        if user["username"] == username:
-            session["user_id"] = user["id"]
-            session["is_admin"] = user["is_admin"]
-            return jsonify({"message": f"Logged in as {username}"})
-    return jsonify({"error": "Invalid username"}), 401
+    user = users.get_by_username(username)
+    if not user:
+        return jsonify({"error": "Invalid username"}), 401
+    session["user_id"] = user["id"]
+    session["is_admin"] = user["is_admin"]
+    return jsonify({"message": f"Logged in as {username}"})
 
 # Logout route
 @app.route("/logout", methods=["POST"])
@@ -1,14 +1,60 @@
-from flask import Flask, request, jsonify, session
-import bcrypt
+from flask import Flask, request, jsonify, session, Response, stream_with_context
+import json
 import os
 
+from bcrypt_cost import cost_from_env, hash_cost, needs_rehash
+from breach_check import BreachedPasswordIndex
+from hash_pool import HashingExecutor, HashingPoolSaturated
+from pagination import iter_slice, paginate, parse_page_args
+from password_migration import PlaintextMigration
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
+# Hiệu chỉnh cost bcrypt theo phần cứng lúc khởi động (BCRYPT_TARGET_MS / BCRYPT_COST)
+bcrypt_calibration = cost_from_env()
+bcrypt_stats = {"rehashed_on_login": 0}
+
+# Process pool cho bcrypt (không chặn worker Flask khi băm mật khẩu)
+hash_executor = HashingExecutor(
+    max_workers=int(os.environ.get("HASH_POOL_WORKERS", 0)) or None,
+    max_pending=int(os.environ.get("HASH_POOL_MAX_PENDING", 0)) or None,
+    rounds=bcrypt_calibration["cost"]
+)
+
+# Danh sách mật khẩu bị lộ (file tạo bằng: python breach_check.py build ...), tùy chọn
+BREACHED_PASSWORDS_FILE = os.environ.get("BREACHED_PASSWORDS_FILE")
+breach_index = BreachedPasswordIndex(BREACHED_PASSWORDS_FILE) if BREACHED_PASSWORDS_FILE else None
+BREACHED_PASSWORD_ERROR = "Password has appeared in a data breach, please choose another"
+
 # Mock database (in-memory)
 insecure_users = []  # Lưu trữ không an toàn (plain text passwords)
 secure_users = []    # Lưu trữ an toàn (hashed passwords)
 
+# Chỉ mục username -> bản ghi, kiểm tra trùng lặp/tra cứu O(1) thay vì duyệt list
+insecure_by_username = {}
+secure_by_username = {}
+
+# Giới hạn số người dùng trong một request đăng ký hàng loạt: request chạy đồng bộ,
+# mỗi người dùng tốn một lần bcrypt (~250ms ở cost mặc định) nên giữ batch nhỏ
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 100))
+
+# Helper function ghi một người dùng đã băm vào kho an toàn (list + chỉ mục)
+def add_secure_user(username, hashed_password):
+    user = {"username": username, "password": hashed_password}
+    secure_users.append(user)
+    secure_by_username[username] = user
+
+# Job chuyển insecure_users (plain text) sang secure_users (bcrypt), chạy nền
+migration = PlaintextMigration(
+    insecure_users,
+    is_migrated=lambda username: username in secure_by_username,
+    commit=add_secure_user,
+    rounds=hash_executor.rounds,
+    workers=int(os.environ.get("MIGRATION_WORKERS", 0)) or None,
+    checkpoint_path=os.environ.get("MIGRATION_CHECKPOINT")
+)
+
 # Đăng ký người dùng - Phiên bản không an toàn
 @app.route("/register/insecure", methods=["POST"])
 def register_insecure():
@@ -18,17 +64,20 @@ def register_insecure():
 
     username = data["username"]
     password = data["password"]
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({"error": "Invalid username or password"}), 400
 
     # Kiểm tra xem username đã tồn tại chưa
-    for user in insecure_users:
-        if user["username"] == username:
-            return jsonify({"error": "Username already exists"}), 409
+    if username in insecure_by_username:
+        return jsonify({"error": "Username already exists"}), 409
 
     # Lưu mật khẩu dưới dạng plain text (lỗ hổng)
-    insecure_users.append({
+    user = {
         "username": username,
         "password": password  # Plain text!
-    })
+    }
+    insecure_users.append(user)
+    insecure_by_username[username] = user
     return jsonify({"message": f"User {username} registered (insecure)"})
 
 # Đăng ký người dùng - Phiên bản an toàn
@@ -43,22 +92,95 @@ def register_secure():
 
     username = data["username"]
     password = data["password"]
+    if not isinstance(username, str) or not isinstance(password, str):
+        return jsonify({"error": "Invalid username or password"}), 400
 
     # Kiểm tra xem username đã tồn tại chưa
-    for user in secure_users:
-        if user["username"] == username:
-            return jsonify({"error": "Username already exists"}), 409
+    if username in secure_by_username:
+        return jsonify({"error": "Username already exists"}), 409
 
-    # Băm mật khẩu bằng bcrypt
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+    # Từ chối mật khẩu có trong danh sách bị lộ
+    if breach_index and breach_index.is_breached(password):
+        return jsonify({"error": BREACHED_PASSWORD_ERROR}), 400
 
-    secure_users.append({
-        "username": username,
-        "password": hashed_password  # Hashed password
-    })
+    # Băm mật khẩu bằng bcrypt (trong process pool)
+    try:
+        hashed_password = hash_executor.hash_password(password.encode('utf-8'))
+    except HashingPoolSaturated:
+        return jsonify({"error": "Server busy, please try again later"}), 503, {"Retry-After": "1"}
+
+    # Kiểm tra lại: username có thể đã được đăng ký trong lúc chờ băm
+    if username in secure_by_username:
+        return jsonify({"error": "Username already exists"}), 409
+    add_secure_user(username, hashed_password)  # Hashed password
     return jsonify({"message": f"User {username} registered (secure)"})
 
+# Đọc danh sách người dùng cho đăng ký hàng loạt: JSON array hoặc NDJSON (mỗi dòng một object)
+def parse_bulk_items():
+    if request.mimetype == "application/x-ndjson":
+        items = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)  # Dòng lỗi -> trạng thái "invalid" cho item đó
+        return items
+    data = request.get_json(silent=True)
+    return data if isinstance(data, list) else None
+
+# Đăng ký hàng loạt - Phiên bản an toàn
+@app.route("/register/secure/bulk", methods=["POST"])
+def register_secure_bulk():
+    """
+    Đăng ký nhiều người dùng trong một request (JSON array hoặc NDJSON).
+    Kiểm tra trùng bằng chỉ mục username (O(1) mỗi item), băm song song trong
+    process pool và trả về trạng thái cho từng item.
+    """
+    items = parse_bulk_items()
+    if items is None:
+        return jsonify({"error": "Expected a JSON array or NDJSON body"}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"Too many users (max {BULK_MAX_ITEMS})"}), 413
+
+    results = []
+    pending = []        # (vị trí trong results, username, password)
+    seen = set()        # username đã gặp trong chính batch này
+    for index, item in enumerate(items):
+        if (not isinstance(item, dict) or not isinstance(item.get("username"), str)
+                or not isinstance(item.get("password"), str)):
+            results.append({"index": index, "status": "invalid", "error": "Missing username or password"})
+            continue
+        username = item["username"]
+        if username in secure_by_username or username in seen:
+            results.append({"index": index, "username": username, "status": "duplicate"})
+            continue
+        seen.add(username)
+        if breach_index and breach_index.is_breached(item["password"]):
+            results.append({"index": index, "username": username, "status": "breached", "error": BREACHED_PASSWORD_ERROR})
+            continue
+        results.append({"index": index, "username": username, "status": "pending"})
+        pending.append((index, username, item["password"]))
+
+    try:
+        hashes = hash_executor.hash_many([password.encode('utf-8') for _, _, password in pending])
+    except HashingPoolSaturated:
+        return jsonify({"error": "Server busy, please try again later"}), 503, {"Retry-After": "1"}
+
+    for (index, username, _), hashed_password in zip(pending, hashes):
+        # Username có thể đã được đăng ký qua /register/secure trong lúc băm
+        if username in secure_by_username:
+            results[index]["status"] = "duplicate"
+            continue
+        add_secure_user(username, hashed_password)
+        results[index]["status"] = "created"
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return jsonify({"summary": summary, "results": results})
+
 # Đăng nhập - Phiên bản không an toàn
 @app.route("/login/insecure", methods=["POST"])
 def login_insecure():
@@ -69,10 +191,10 @@ def login_insecure():
     username = data["username"]
     password = data["password"]
 
-    for user in insecure_users:
-        if user["username"] == username and user["password"] == password:
-            session["username"] = username
-            return jsonify({"message": f"Logged in as {username} (insecure)"})
+    user = insecure_by_username.get(username) if isinstance(username, str) else None
+    if user and user["password"] == password:
+        session["username"] = username
+        return jsonify({"message": f"Logged in as {username} (insecure)"})
     return jsonify({"error": "Invalid credentials"}), 401
 
 # Đăng nhập - Phiên bản an toàn
@@ -85,12 +207,23 @@ def login_secure():
     username = data["username"]
     password = data["password"]
 
-    for user in secure_users:
-        if user["username"] == username:
-            # So sánh mật khẩu với bản băm
-            if bcrypt.checkpw(password.encode('utf-8'), user["password"]):
-                session["username"] = username
-                return jsonify({"message": f"Logged in as {username} (secure)"})
+    user = secure_by_username.get(username) if isinstance(username, str) else None
+    if user:
+        # So sánh mật khẩu với bản băm (trong process pool)
+        try:
+            valid = hash_executor.check_password(password.encode('utf-8'), user["password"])
+        except HashingPoolSaturated:
+            return jsonify({"error": "Server busy, please try again later"}), 503, {"Retry-After": "1"}
+        if valid:
+            # Hash có cost thấp hơn cost hiện tại -> băm lại (bỏ qua nếu pool đang quá tải)
+            if needs_rehash(user["password"], hash_executor.rounds):
+                try:
+                    user["password"] = hash_executor.hash_password(password.encode('utf-8'))
+                    bcrypt_stats["rehashed_on_login"] += 1
+                except HashingPoolSaturated:
+                    pass
+            session["username"] = username
+            return jsonify({"message": f"Logged in as {username} (secure)"})
     return jsonify({"error": "Invalid credentials"}), 401
 
 # Xem danh sách người dùng - Phiên bản không an toàn (mô phỏng hacker truy cập database)
@@ -99,7 +232,7 @@ def get_users_insecure():
     """
     Lỗ hổng: Hacker có thể thấy mật khẩu plain text.
     """
-    return jsonify(insecure_users)
+    return list_users(insecure_users, lambda user: user)
 
 # Xem danh sách người dùng - Phiên bản an toàn
 @app.route("/users/secure", methods=["GET"])
@@ -108,13 +241,61 @@ def get_users_secure():
     An toàn: Chỉ thấy mật khẩu đã được băm, không thể đọc trực tiếp.
     """
     # Chuyển bytes (hashed password) thành string để hiển thị JSON
-    display_users = []
+    return list_users(secure_users, lambda user: {
+        "username": user["username"],
+        "password": user["password"].decode('utf-8')  # Hiển thị hash dưới dạng string
+    })
+
+# Helper function trả về danh sách người dùng theo trang (cursor + limit)
+# hoặc dạng NDJSON streaming (?format=ndjson) để bộ nhớ không tăng theo số người dùng
+def list_users(users, serialize):
+    try:
+        position, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.args.get("format") == "ndjson":
+        # Không có limit -> stream toàn bộ từ vị trí cursor
+        stop = position + limit if "limit" in request.args else None
+
+        def generate():
+            for user in iter_slice(users, position, stop):
+                yield json.dumps(serialize(user)) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    page, next_cursor = paginate(users, position, limit)
+    return jsonify({"users": [serialize(user) for user in page], "next_cursor": next_cursor})
+
+# Bắt đầu/chạy tiếp job migration mật khẩu plain text -> bcrypt
+@app.route("/migrate/start", methods=["POST"])
+def migrate_start():
+    if not migration.start():
+        return jsonify({"error": "Migration already running", "status": migration.status()}), 409
+    return jsonify({"message": "Migration started", "status": migration.status()}), 202
+
+# Dừng job migration (có thể chạy tiếp bằng /migrate/start)
+@app.route("/migrate/stop", methods=["POST"])
+def migrate_stop():
+    migration.stop()
+    return jsonify({"message": "Migration stopping", "status": migration.status()})
+
+# Tiến độ và thông lượng của job migration
+@app.route("/migrate/status", methods=["GET"])
+def migrate_status():
+    return jsonify(migration.status())
+
+# Thông tin cost bcrypt cho monitoring
+@app.route("/metrics/bcrypt", methods=["GET"])
+def bcrypt_metrics():
+    costs = {}
     for user in secure_users:
-        display_users.append({
-            "username": user["username"],
-            "password": user["password"].decode('utf-8')  # Hiển thị hash dưới dạng string
-        })
-    return jsonify(display_users)
+        cost = hash_cost(user["password"])
+        costs[cost] = costs.get(cost, 0) + 1
+    return jsonify({
+        **bcrypt_calibration,
+        **bcrypt_stats,
+        "stored_hash_costs": {str(cost): count for cost, count in costs.items()}
+    })
 
 # Trang hướng dẫn
 @app.route("/")
@@ -160,16 +341,29 @@ def index():
     <p>5. View list of insecure user</p>
     <ol>
         <li>Create a new request:GET http://127.0.0.1:5000/users/insecure</li>
-        <li>Expected Response:[{"username": "alice", "password": "123456"}] - Status 200 OK</li>
+        <li>Expected Response:{"users": [{"username": "alice", "password": "123456"}], "next_cursor": null} - Status 200 OK</li>
+        <li>Paging: add ?limit=50 and pass back next_cursor as ?cursor=...; add ?format=ndjson to stream one user per line.</li>
         <li>User password is been stored as plaintext, make it easy for hacker to read if they could access the database.</li> 
     </ol>
     <p>6. View list of secure user</p>
     <ol>
         <li>Create a new request: GET http://127.0.0.1:5000/users/secure</li>
-        <li>Expected Response:[{"username": "bob", "password": "$2b$12$..."}] - Status 200 OK</li>
+        <li>Expected Response:{"users": [{"username": "bob", "password": "$2b$12$..."}], "next_cursor": null} - Status 200 OK</li>
         <li>The password value will be a bcrypt hash string and cannot be read directly.</li> 
         <li>Security: The password is hashed, so hackers cannot determine the original password.</li>
     </ol>
+    <p>7. Sign up many users at once ( secure )</p>
+    <ol>
+        <li>Create a new request: POST http://127.0.0.1:5000/register/secure/bulk</li>
+        <li>Body: Raw JSON → [{"username": "carol", "password": "pw1"}, {"username": "bob", "password": "pw2"}] (or NDJSON with Content-Type: application/x-ndjson)</li>
+        <li>Expected Response: {"summary": {"created": 1, "duplicate": 1}, "results": [...]} - Status 200 OK</li>
+    </ol>
+    <p>8. Migrate plaintext users to bcrypt</p>
+    <ol>
+        <li>Create a new request: POST http://127.0.0.1:5000/migrate/start</li>
+        <li>Expected Response: {"message": "Migration started", "status": {...}} - Status 202 Accepted</li>
+        <li>Check progress with GET http://127.0.0.1:5000/migrate/status; POST /migrate/stop pauses it, /migrate/start resumes.</li>
+    </ol>
     """
 
 if __name__ == "__main__":
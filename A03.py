@@ -1,37 +1,89 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
+import json
 import sqlite3
 import os
+import time
+from collections import deque
+
+from db_pool import SQLiteConnectionPool
+from memory_snapshot import MemorySnapshot
+from query_cache import QueryResultCache
+from sql_profiler import QueryProfiler
+from sqli_fingerprint import detect as detect_sqli
+from users_db import init_db
 
 app = Flask(__name__)
 
-# Khởi tạo database SQLite
-def init_db():
-    # Xóa file database cũ nếu tồn tại (cho demo)
-    #if os.path.exists("users.db"):
-        #os.remove("users.db")
-
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    # Tạo bảng users
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            email TEXT NOT NULL
-        )
-    """)
-    # Thêm dữ liệu mẫu
-    sample_users = [
-        ("alice", "alice@example.com"),
-        ("bob", "bob@example.com"),
-        ("charlie", "charlie@example.com")
-    ]
-    cursor.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)", sample_users)
-    conn.commit()
-    conn.close()
-
-# Gọi hàm khởi tạo database khi khởi động
-init_db()
+DB_PATH = "users.db"
+
+# Giới hạn số kết quả cho tìm kiếm full-text
+FULLTEXT_DEFAULT_LIMIT = 20
+FULLTEXT_MAX_LIMIT = 100
+
+# Phân trang keyset (after_id + limit) và streaming kết quả tìm kiếm
+PAGE_DEFAULT_LIMIT = 100
+PAGE_MAX_LIMIT = 1000
+STREAM_BATCH_SIZE = 500
+SQLITE_MAX_INT = 2 ** 63 - 1  # INTEGER của SQLite là số 64 bit có dấu
+
+# Cache kết quả truy vấn (QUERY_CACHE_SIZE=0 để tắt)
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 1024))
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", 30))
+
+# Chế độ snapshot: SEARCH_SNAPSHOT=1 chép users.db vào RAM khi khởi động và mọi route
+# tìm kiếm đọc từ bản sao đó; bản sao được làm mới khi file thay đổi (kiểm tra mỗi SNAPSHOT_REFRESH_S giây)
+SEARCH_SNAPSHOT = os.environ.get("SEARCH_SNAPSHOT") == "1"
+SNAPSHOT_REFRESH_S = float(os.environ.get("SNAPSHOT_REFRESH_S", 5))
+
+# Slow-query log: câu lệnh chạy lâu hơn SLOW_QUERY_MS được ghi kèm EXPLAIN QUERY PLAN
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 50))
+SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG", "slow_query.log")
+
+# Khởi tạo/migrate database SQLite khi khởi động (bỏ qua nếu schema đã mới nhất)
+init_db(DB_PATH)
+
+# Pool kết nối chỉ đọc cho các route tìm kiếm (mỗi request mượn một kết nối, trả lại khi xong),
+# hoặc bản sao in-memory ở chế độ snapshot (xóa cache kết quả mỗi lần đổi bản sao)
+if SEARCH_SNAPSHOT:
+    read_db = MemorySnapshot(DB_PATH, refresh_interval=SNAPSHOT_REFRESH_S,
+                             on_refresh=lambda: query_cache is not None and query_cache.invalidate())
+else:
+    read_db = SQLiteConnectionPool(DB_PATH, readonly=True)
+read_db.init_app(app)
+
+# Cache kết quả cho các route an toàn (route insecure không dùng cache:
+# câu SQL ghép chuỗi sẽ làm mỗi payload thành một khóa riêng)
+query_cache = QueryResultCache(DB_PATH, QUERY_CACHE_SIZE, QUERY_CACHE_TTL) if QUERY_CACHE_SIZE > 0 else None
+
+# Đo thời gian mọi truy vấn của các route tìm kiếm (xem /debug/queries)
+profiler = QueryProfiler(slow_ms=SLOW_QUERY_MS, log_path=SLOW_QUERY_LOG)
+
+# Helper function chạy truy vấn trên database (có đo thời gian)
+def run_query(conn, query, params, max_rows):
+    with profiler.profile(conn, query, params):
+        return conn.execute(query, params).fetchmany(max_rows)
+
+# Helper function chạy truy vấn và lấy tối đa max_rows dòng, qua cache nếu được bật
+def fetch_rows(conn, query, params, max_rows):
+    if query_cache is not None:
+        return query_cache.fetch(conn, query, params, max_rows, run=run_query)
+    return run_query(conn, query, params, max_rows)
+
+# Cảnh báo đầu vào giống SQL injection (chỉ ghi log, không chặn request)
+sqli_stats = {"checked": 0, "flagged": 0}
+sqli_alerts = deque(maxlen=100)  # Các cảnh báo gần nhất
+
+# Helper function kiểm tra tham số theo fingerprint, ghi cảnh báo nếu khớp
+def flag_sqli(value):
+    sqli_stats["checked"] += 1
+    fingerprint = detect_sqli(value)
+    if fingerprint is not None:
+        sqli_stats["flagged"] += 1
+        sqli_alerts.append({"time": time.time(), "path": request.path, "remote_addr": request.remote_addr,
+                            "value": value[:200], "fingerprint": fingerprint})
+        app.logger.warning("Possible SQL injection on %s from %s: %r (fingerprint %s)",
+                           request.path, request.remote_addr, value[:200], fingerprint)
+    return fingerprint
 
 # Tìm kiếm người dùng - Phiên bản không an toàn (SQL Injection)
 @app.route("/search/insecure", methods=["GET"])
@@ -43,20 +95,20 @@ def search_insecure():
     username = request.args.get("username")
     if not username:
         return jsonify({"error": "Missing username parameter"}), 400  
-
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
+    flag_sqli(username)
 
     # Lỗ hổng SQL Injection: Nối trực tiếp username vào query
     query = f"SELECT * FROM users WHERE username = '{username}'"
     try:
-        cursor.execute(query)
-        results = cursor.fetchall()
+        # Mượn kết nối trong try: pool hết kết nối cũng là sqlite3.OperationalError
+        conn = read_db.connection()
+        cursor = conn.cursor()
+        with profiler.profile(conn, query):
+            cursor.execute(query)
+            results = cursor.fetchall()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({"error": str(e)}), 500
 
-    conn.close()
     if not results:
         return jsonify({"message": "No users found"}), 404
 
@@ -73,27 +125,170 @@ def search_secure():
     username = request.args.get("username")
     if not username:
         return jsonify({"error": "Missing username parameter"}), 400
-
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
+    flag_sqli(username)
+    try:
+        after_id, limit, stream = parse_keyset_args()
+    except ValueError:
+        return jsonify({"error": "Invalid after_id or limit"}), 400
 
     # An toàn: Sử dụng parameterized query
-    query = "SELECT * FROM users WHERE username = ?"
+    query = "SELECT id, username, email FROM users WHERE username = ? AND id > ? ORDER BY id"
+    # Trả về kết quả (id, username, email)
+    return keyset_response(query, (username,), after_id, limit, stream,
+                           lambda row: {"id": row[0], "username": row[1], "email": row[2]})
+
+# Đọc tham số phân trang keyset: after_id (mặc định 0), limit, stream=1
+# Khi stream=1 mà không có limit thì trả về toàn bộ kết quả khớp
+def parse_keyset_args():
+    after_id = int(request.args.get("after_id", 0))
+    if not -SQLITE_MAX_INT - 1 <= after_id <= SQLITE_MAX_INT:
+        raise ValueError("Invalid after_id")
+    stream = request.args.get("stream") == "1"
+    if "limit" in request.args:
+        limit = int(request.args["limit"])
+        if not 1 <= limit <= SQLITE_MAX_INT:
+            raise ValueError("Invalid limit")
+        if not stream:
+            limit = min(limit, PAGE_MAX_LIMIT)
+    else:
+        limit = None if stream else PAGE_DEFAULT_LIMIT
+    return after_id, limit, stream
+
+# Helper function chạy truy vấn keyset và trả về kết quả:
+# - query kết thúc bằng "... AND <id> > ? ORDER BY <id>" (chưa có LIMIT)
+# - trang thường: JSON list, header X-Next-After-Id nếu còn trang sau (qua cache)
+# - stream=1: đọc cursor theo từng batch (fetchmany) và ghi JSON dần dần,
+#   bộ nhớ và thời gian tới byte đầu tiên không phụ thuộc số dòng khớp
+def keyset_response(query, params, after_id, limit, stream, to_dict):
+    args = params + (after_id,)
+    if limit is not None:
+        query += " LIMIT ?"
+        args += (limit if stream else limit + 1,)  # Lấy thêm 1 dòng để biết còn trang sau
     try:
-        cursor.execute(query, (username,))
-        results = cursor.fetchall()
+        conn = read_db.connection()
+        if stream:
+            # Chỉ đo tới batch đầu tiên (phần còn lại được đọc khi gửi response)
+            with profiler.profile(conn, query, args):
+                cursor = conn.execute(query, args)
+                first_batch = cursor.fetchmany(STREAM_BATCH_SIZE)
+        else:
+            first_batch = fetch_rows(conn, query, args, limit + 1)
+    except sqlite3.Error as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not first_batch:
+        return jsonify({"message": "No users found"}), 404
+
+    if not stream:
+        page = first_batch[:limit]
+        response = jsonify([to_dict(row) for row in page])
+        if len(first_batch) > limit:
+            response.headers["X-Next-After-Id"] = str(page[-1][0])
+        return response
+
+    def generate():
+        batch = first_batch
+        separator = "["
+        while batch:
+            yield separator + ",".join(json.dumps(to_dict(row)) for row in batch)
+            separator = ","
+            batch = cursor.fetchmany(STREAM_BATCH_SIZE)
+        yield "]"
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+# Tìm kiếm full-text - Phiên bản an toàn (FTS5 + parameterized query)
+@app.route("/search/secure/fulltext", methods=["GET"])
+def search_secure_fulltext():
+    """
+    Tìm theo tiền tố/chuỗi con trên username và email, xếp hạng theo bm25.
+    Từ khóa được truyền dạng tham số và bọc thành chuỗi FTS5 (không thể chèn cú pháp MATCH).
+    Với order=id hoặc stream=1: sắp theo id, phân trang keyset (after_id, limit).
+    """
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "Missing q parameter"}), 400
+
+    if request.args.get("order") == "id" or request.args.get("stream") == "1":
+        try:
+            after_id, limit, stream = parse_keyset_args()
+        except ValueError:
+            return jsonify({"error": "Invalid after_id or limit"}), 400
+        if len(q) >= 3:
+            # Không tính bm25 ở chế độ này: bm25 phải đọc hết doclist, làm TTFB tăng theo số dòng khớp
+            query = ("SELECT u.id, u.username, u.email, NULL "
+                     "FROM users_fts JOIN users u ON u.id = users_fts.rowid "
+                     "WHERE users_fts MATCH ? AND users_fts.rowid > ? ORDER BY users_fts.rowid")
+            params = ('"' + q.replace('"', '""') + '"',)
+        else:
+            query = ("SELECT id, username, email, NULL FROM users "
+                     "WHERE username >= ? AND username < ? AND id > ? ORDER BY id")
+            params = (q, q + "\U0010ffff")
+        return keyset_response(query, params, after_id, limit, stream,
+                               lambda row: {"id": row[0], "username": row[1], "email": row[2], "score": row[3]})
+
+    try:
+        limit = min(int(request.args.get("limit", FULLTEXT_DEFAULT_LIMIT)), FULLTEXT_MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if limit < 1:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    try:
+        conn = read_db.connection()
+        if len(q) >= 3:
+            # Trigram cần ít nhất 3 ký tự; bọc từ khóa trong "..." để FTS5 coi là chuỗi thường
+            results = fetch_rows(
+                conn,
+                "SELECT u.id, u.username, u.email, bm25(users_fts) AS score "
+                "FROM users_fts JOIN users u ON u.id = users_fts.rowid "
+                "WHERE users_fts MATCH ? ORDER BY score LIMIT ?",
+                ('"' + q.replace('"', '""') + '"', limit), limit
+            )
+        else:
+            # Từ khóa ngắn: tìm tiền tố username bằng khoảng trên chỉ mục UNIQUE
+            results = fetch_rows(
+                conn,
+                "SELECT id, username, email, 0 FROM users "
+                "WHERE username >= ? AND username < ? ORDER BY username LIMIT ?",
+                (q, q + "\U0010ffff", limit), limit
+            )
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({"error": str(e)}), 500
 
-    conn.close()
     if not results:
         return jsonify({"message": "No users found"}), 404
 
-    # Trả về kết quả (id, username, email)
-    users = [{"id": row[0], "username": row[1], "email": row[2]} for row in results]
+    users = [{"id": row[0], "username": row[1], "email": row[2], "score": row[3]} for row in results]
     return jsonify(users)
 
+# Thống kê cache kết quả truy vấn (hit/miss, số lần bị xóa do dữ liệu thay đổi)
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    if query_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify(dict(query_cache.stats(), enabled=True))
+
+# Trạng thái bản sao in-memory (chế độ SEARCH_SNAPSHOT=1)
+@app.route("/snapshot/stats", methods=["GET"])
+def snapshot_stats():
+    if not SEARCH_SNAPSHOT:
+        return jsonify({"enabled": False})
+    return jsonify(dict(read_db.stats(), enabled=True))
+
+# Top câu lệnh SQL theo tổng thời gian: số lần chạy, histogram độ trễ, query plan
+@app.route("/debug/queries", methods=["GET"])
+def debug_queries():
+    try:
+        top = int(request.args.get("top", 10))
+    except ValueError:
+        return jsonify({"error": "Invalid top"}), 400
+    return jsonify({"slow_ms": profiler.slow_ms, "statements": profiler.report(top)})
+
+# Thống kê và các cảnh báo SQL injection gần nhất
+@app.route("/debug/sqli", methods=["GET"])
+def debug_sqli():
+    return jsonify(dict(sqli_stats, alerts=list(sqli_alerts)))
+
 # Trang hướng dẫn
 @app.route("/")
 def index():
@@ -131,6 +326,26 @@ def index():
     </ol>
         <li>Safe: The parameterized query treats the input ' OR '1'='1 as a regular string, not as SQL code : SELECT * FROM users WHERE username = "' OR '1'='1'".</li>
         <li>There is no username that matches this string, so no results are returned.</li>
+    <p>4. Full-text search ( secure )</p>
+    <ol>
+        <li>Create a new request: GET http://127.0.0.1:5000/search/secure/fulltext?q=ali&limit=10</li>
+        <li>Expected Response: [{"id": 1, "username": "alice", "email": "alice@example.com", "score": ...}] - Status 200 OK</li>
+        <li>Matches any part of the username or email (3+ characters), ranked by relevance; shorter terms match username prefixes.</li>
+        <li>Add order=id to page by id: pass the X-Next-After-Id response header back as after_id. Add stream=1 to stream every match as one JSON array.</li>
+    </ol>
+    <p>5. Query profile</p>
+    <ol>
+        <li>Run steps 1-3, then create a new request: GET http://127.0.0.1:5000/debug/queries</li>
+        <li>Expected Response: the top SQL statements by total time, with latency histograms and their EXPLAIN QUERY PLAN.</li>
+        <li>The injected statement shows up as SELECT * FROM users WHERE username = ? OR ?=? with plan "SCAN users" (full_scan: true), while the normal lookup uses the UNIQUE index.</li>
+        <li>Statements slower than SLOW_QUERY_MS are also written to slow_query.log; summarize it with: python sql_profiler.py slow_query.log</li>
+    </ol>
+    <p>6. SQL injection alerts</p>
+    <ol>
+        <li>After step 2 or 3, create a new request: GET http://127.0.0.1:5000/debug/sqli</li>
+        <li>Expected Response: {"checked": ..., "flagged": ..., "alerts": [{"path": "/search/insecure", "value": "' OR '1'='1", "fingerprint": "s&sos", ...}]}</li>
+        <li>Both /search routes fingerprint the username and log a warning for injection-like input; requests are not blocked.</li>
+    </ol>
     """
 
 if __name__ == "__main__":
@@ -1,22 +1,88 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, make_response
+from functools import wraps
+import hashlib
 import os
 
+from ttl_cache import TTLCache
+from user_store import ConcurrentUserStore
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
-# Mock database (in-memory)
-users = [
+# Mock database (in-memory), an toàn khi nhiều request xóa cùng lúc
+users = ConcurrentUserStore([
     {"id": 1, "username": "alice", "email": "alice@example.com", "is_admin": False},
     {"id": 2, "username": "bob", "email": "bob@example.com", "is_admin": False},
     {"id": 3, "username": "admin", "email": "admin@example.com", "is_admin": True}
-]
+])
+# Bản ghi xóa hàng loạt chỉ được đánh dấu (tombstone); thread nền gỡ hẳn theo batch
+users.start_compactor()
+
+# Số id tối đa cho mỗi request xóa hàng loạt
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 100_000))
+
+# Idempotency-Key cho các route xóa: response được lưu theo (người dùng, method, path, key)
+# để request gửi lại (retry) nhận đúng response cũ mà không chạy lại thao tác xóa
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 10_000))
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", 3600))
+IDEMPOTENCY_MAX_BODY = int(os.environ.get("IDEMPOTENCY_MAX_BODY", 1_000_000))  # Response lớn hơn không được lưu
+idempotency_cache = TTLCache(maxsize=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL)
+idempotency_stats = {"replayed": 0, "conflicts": 0, "mismatches": 0, "not_stored": 0}
+_IN_FLIGHT = None  # Giá trị lưu tạm khi request đầu tiên với key này còn đang chạy
+
+def idempotent(view):
+    """
+    Decorator: nếu request có header Idempotency-Key (và đã đăng nhập), lần đầu chạy
+    view rồi lưu response; các lần sau cùng key trả lại response đã lưu (header
+    Idempotent-Replayed: true). Cùng key nhưng khác query/body -> 422; trong lúc lần
+    đầu còn đang chạy -> 409. Response lỗi 5xx không được lưu để có thể thử lại.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None or "user_id" not in session:
+            return view(*args, **kwargs)
+        if not key or len(key) > 255:
+            return jsonify({"error": "Invalid Idempotency-Key"}), 400
+
+        cache_key = (session["user_id"], request.method, request.path, key)
+        request_hash = hashlib.sha256(request.query_string + b"\0" + request.get_data()).digest()
+        if not idempotency_cache.add(cache_key, (request_hash, _IN_FLIGHT)):
+            cached = idempotency_cache.get(cache_key)
+            if cached is not None:
+                cached_hash, cached_response = cached
+                if cached_hash != request_hash:
+                    idempotency_stats["mismatches"] += 1
+                    return jsonify({"error": "Idempotency-Key was already used with a different request"}), 422
+                if cached_response is _IN_FLIGHT:
+                    idempotency_stats["conflicts"] += 1
+                    return jsonify({"error": "A request with this Idempotency-Key is still in progress"}), 409
+                idempotency_stats["replayed"] += 1
+                body, status, mimetype = cached_response
+                response = make_response(body, status)
+                response.mimetype = mimetype
+                response.headers["Idempotent-Replayed"] = "true"
+                return response
+            # Entry vừa hết hạn/bị đẩy ra giữa hai thao tác: chạy như request mới
+            idempotency_cache.set(cache_key, (request_hash, _IN_FLIGHT))
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            idempotency_cache.pop(cache_key)
+            raise
+        body = response.get_data()
+        if response.status_code >= 500 or len(body) > IDEMPOTENCY_MAX_BODY:
+            idempotency_stats["not_stored"] += 1
+            idempotency_cache.pop(cache_key)
+        else:
+            idempotency_cache.set(cache_key, (request_hash, (body, response.status_code, response.mimetype)))
+        return response
+    return wrapper
 
 # Helper function để tìm người dùng theo ID
 def get_user_by_id(user_id):
-    for user in users:
-        if user["id"] == user_id:
-            return user
-    return None
+    return users.get_by_id(user_id)
 
 # Đăng nhập
 @app.route("/login", methods=["POST"])
@@ -26,12 +92,12 @@ def login():
         return jsonify({"error": "Missing username"}), 400
 
     username = data["username"]
-    for user in users:
-        if user["username"] == username:
-            session["user_id"] = user["id"]
-            session["is_admin"] = user["is_admin"]
-            return jsonify({"message": f"Logged in as {username}"})
-    return jsonify({"error": "Invalid username"}), 401
+    user = users.get_by_username(username)
+    if not user:
+        return jsonify({"error": "Invalid username"}), 401
+    session["user_id"] = user["id"]
+    session["is_admin"] = user["is_admin"]
+    return jsonify({"message": f"Logged in as {username}"})
 
 # Đăng xuất
 @app.route("/logout", methods=["POST"])
@@ -42,6 +108,7 @@ def logout():
 
 # Xóa tài khoản - Phiên bản không an toàn (Insecure Design)
 @app.route("/delete/insecure/<int:user_id>", methods=["DELETE"])
+@idempotent
 def delete_insecure(user_id):
     """
     Lỗ hổng: Thiết kế không an toàn, không kiểm tra quyền hoặc xác nhận hành động.
@@ -50,16 +117,14 @@ def delete_insecure(user_id):
     if "user_id" not in session:
         return jsonify({"error": "Please log in"}), 401
 
-    user_to_delete = get_user_by_id(user_id)
-    if not user_to_delete:
-        return jsonify({"error": "User not found"}), 404
-
     # Xóa người dùng mà không kiểm tra quyền hoặc xác nhận
-    users.remove(user_to_delete)
+    if users.pop(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
     return jsonify({"message": f"User {user_id} deleted (insecure)"})
 
 # Xóa tài khoản - Phiên bản an toàn (Secure Design)
 @app.route("/delete/secure/<int:user_id>", methods=["DELETE"])
+@idempotent
 def delete_secure(user_id):
     """
     An toàn: Áp dụng thiết kế bảo mật:
@@ -85,10 +150,60 @@ def delete_secure(user_id):
     if confirm != "yes":
         return jsonify({"error": "Confirmation required: Add ?confirm=yes to the request"}), 400
 
-    # Xóa người dùng
-    users.remove(user_to_delete)
+    # Xóa người dùng (request khác có thể đã xóa trước: trả về 404 thay vì lỗi)
+    if users.pop(user_id) is None:
+        return jsonify({"error": "User not found"}), 404
     return jsonify({"message": f"User {user_id} deleted (secure)"})
 
+# Xóa hàng loạt - Phiên bản an toàn
+@app.route("/delete/secure/bulk", methods=["POST"])
+@idempotent
+def delete_secure_bulk():
+    """
+    Xóa nhiều tài khoản trong một request: body {"ids": [...]}, xác nhận bằng ?confirm=yes.
+    Mỗi id được kiểm tra theo đúng các quy tắc của /delete/secure/<id> (quyền, tồn tại,
+    xác nhận) và chỉ bị xóa mềm (O(1)); trả về trạng thái cho từng id.
+    """
+    if "user_id" not in session:
+        return jsonify({"error": "Please log in"}), 401
+
+    data = request.get_json(silent=True)
+    ids = data.get("ids") if isinstance(data, dict) else None
+    if not isinstance(ids, list):
+        return jsonify({"error": "Expected a JSON body {\"ids\": [...]}"}), 400
+    if len(ids) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"Too many ids (max {BULK_MAX_ITEMS})"}), 413
+
+    current_user_id = session["user_id"]
+    is_admin = session.get("is_admin", False)
+    confirmed = request.args.get("confirm", "").lower() == "yes"
+
+    results = []
+    for user_id in ids:
+        if not isinstance(user_id, int) or isinstance(user_id, bool):
+            results.append({"id": user_id, "status": "invalid"})
+        elif current_user_id != user_id and not is_admin:
+            results.append({"id": user_id, "status": "forbidden"})
+        elif get_user_by_id(user_id) is None:
+            results.append({"id": user_id, "status": "not_found"})
+        elif not confirmed:
+            results.append({"id": user_id, "status": "confirmation_required"})
+        elif users.tombstone(user_id) is None:
+            # Đã bị xóa bởi request khác (hoặc id lặp lại trong cùng batch)
+            results.append({"id": user_id, "status": "not_found"})
+        else:
+            results.append({"id": user_id, "status": "deleted"})
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return jsonify({"summary": summary, "results": results})
+
+# Thống kê cache Idempotency-Key (hit rate, số response được trả lại, xung đột)
+@app.route("/idempotency/stats", methods=["GET"])
+def idempotency_cache_stats():
+    return jsonify(dict(idempotency_cache.stats(), **idempotency_stats))
+
 # Trang hướng dẫn
 @app.route("/")
 def index():
@@ -145,6 +260,19 @@ def index():
             <li>Expected Response: {"message": "User 2 deleted (secure)"} - Status 200 OK</li>
              <p> → Secure: Admins are authorized to delete others' accounts, but confirmation is still required. </p>
         </ol>
+        <p>8. Bulk delete (Secure):</p>
+        <ol>
+            <li>Create a new request: POST http://127.0.0.1:5000/delete/secure/bulk?confirm=yes</li>
+            <li>Body: Raw JSON → {"ids": [1, 2, 99]}</li>
+            <li>Expected Response (as admin): {"summary": {"deleted": 2, "not_found": 1}, "results": [...]} - Status 200 OK</li>
+             <p> → Secure: Every id goes through the same permission and confirmation checks as the single delete; non-admins get "forbidden" for other users' ids. </p>
+        </ol>
+        <p>9. Retry a delete safely (Idempotency-Key):</p>
+        <ol>
+            <li>Send DELETE http://127.0.0.1:5000/delete/secure/2?confirm=yes as admin with header Idempotency-Key: 7f1c2a</li>
+            <li>Send the exact same request again: the first response (200 "User 2 deleted") is returned with header Idempotent-Replayed: true instead of a 404.</li>
+            <li>Reusing the key with a different request returns 422. Cache metrics: GET http://127.0.0.1:5000/idempotency/stats</li>
+        </ol>
         """
 
 
@@ -1,22 +1,26 @@
-from flask import Flask, request, jsonify, session, make_response
+from flask import Flask, request, jsonify, session
 import os
 
+from security_headers import SecurityHeaders
+from user_store import UserStore
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
+# Header bảo mật (X-Content-Type-Options, X-Frame-Options, CSP) cho mọi response,
+# trừ các route được đánh dấu @security_headers.exempt
+security_headers = SecurityHeaders(app)
+
 # Mock database (in-memory)
-users = [
+users = UserStore([
     {"id": 1, "username": "alice", "email": "alice@example.com", "is_admin": False},
     {"id": 2, "username": "bob", "email": "bob@example.com", "is_admin": False},
     {"id": 3, "username": "admin", "email": "admin@example.com", "is_admin": True}
-]
+])
 
 # Helper function để tìm người dùng theo ID
 def get_user_by_id(user_id):
-    for user in users:
-        if user["id"] == user_id:
-            return user
-    return None
+    return users.get_by_id(user_id)
 
 # Đăng nhập
 @app.route("/login", methods=["POST"])
@@ -26,12 +30,12 @@ def login():
         return jsonify({"error": "Missing username"}), 400
 
     username = data["username"]
-    for user in users:
-        if user["username"] == username:
-            session["user_id"] = user["id"]
-            session["is_admin"] = user["is_admin"]
-            return jsonify({"message": f"Logged in as {username}"})
-    return jsonify({"error": "Invalid username"}), 401
+    user = users.get_by_username(username)
+    if not user:
+        return jsonify({"error": "Invalid username"}), 401
+    session["user_id"] = user["id"]
+    session["is_admin"] = user["is_admin"]
+    return jsonify({"message": f"Logged in as {username}"})
 
 # Đăng xuất
 @app.route("/logout", methods=["POST"])
@@ -42,6 +46,7 @@ def logout():
 
 # Lấy thông tin người dùng - Phiên bản không an toàn (Security Misconfiguration)
 @app.route("/user/insecure/<user_id>", methods=["GET"])
+@security_headers.exempt
 def user_insecure(user_id):
     """
     Lỗ hổng: Security Misconfiguration
@@ -87,9 +92,7 @@ def user_secure(user_id):
     3. Xử lý lỗi mà không để lộ thông tin nhạy cảm.
     """
     if "user_id" not in session:
-        response = make_response(jsonify({"error": "Please log in"}), 401)
-        response = add_security_headers(response)
-        return response
+        return jsonify({"error": "Please log in"}), 401
 
     current_user_id = session["user_id"]
     is_admin = session.get("is_admin", False)
@@ -98,37 +101,23 @@ def user_secure(user_id):
     try:
         user_id = int(user_id)
     except ValueError:
-        response = make_response(jsonify({"error": "Invalid user_id"}), 400)
-        response = add_security_headers(response)
-        return response
+        return jsonify({"error": "Invalid user_id"}), 400
 
     user = get_user_by_id(user_id)
     if not user:
-        response = make_response(jsonify({"error": "User not found"}), 404)
-        response = add_security_headers(response)
-        return response
+        return jsonify({"error": "User not found"}), 404
 
     # Kiểm tra quyền
     if current_user_id != user_id and not is_admin:
-        response = make_response(jsonify({"error": "Unauthorized access"}), 403)
-        response = add_security_headers(response)
-        return response
+        return jsonify({"error": "Unauthorized access"}), 403
 
-    response = make_response(jsonify({
+    # Header bảo mật được thêm bởi middleware security_headers (after_request)
+    return jsonify({
         "id": user["id"],
         "username": user["username"],
         "email": user["email"],
         "is_admin": user["is_admin"]
-    }))
-    response = add_security_headers(response)
-    return response
-
-# Helper function để thêm các header bảo mật
-def add_security_headers(response):
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["Content-Security-Policy"] = "default-src 'self'"
-    return response
+    })
 
 # Trang hướng dẫn
 @app.route("/")
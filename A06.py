@@ -1,11 +1,65 @@
-from flask import Flask, request, jsonify
-import html
+from flask import Flask, request, jsonify, Response
+import json
 import os
+import threading
+
+from comment_log import CommentLog
+from comment_store import CommentStore
+from inverted_index import InvertedIndex
+from pagination import encode_cursor, parse_page_args
+from sanitizer import default_engine
 
 app = Flask(__name__)
 
-# Mock database (in-memory)
-comments = []
+# Số bình luận được giữ lại (cũ hơn bị ghi đè), độ dài tối đa mỗi bình luận
+# và số bình luận tối đa trong một request /comment/secure/bulk
+COMMENT_RETENTION = int(os.environ.get("COMMENT_RETENTION", 10_000))
+COMMENT_MAX_LENGTH = int(os.environ.get("COMMENT_MAX_LENGTH", 10_000))
+COMMENT_BULK_MAX_ITEMS = int(os.environ.get("COMMENT_BULK_MAX_ITEMS", 1000))
+# Kích thước body tối đa của mọi request (Flask trả 413 trước khi đọc JSON)
+COMMENT_MAX_BODY_BYTES = int(os.environ.get("COMMENT_MAX_BODY_BYTES", 16 * 1024 * 1024))
+app.config["MAX_CONTENT_LENGTH"] = COMMENT_MAX_BODY_BYTES
+# Đặt COMMENT_LOG_PATH để lưu bình luận xuống file log (giữ lại sau khi khởi động lại,
+# không giới hạn bởi COMMENT_RETENTION)
+COMMENT_LOG_PATH = os.environ.get("COMMENT_LOG_PATH")
+
+# Mock database: in-memory giới hạn dung lượng, hoặc file log append-only
+comments = CommentLog(COMMENT_LOG_PATH) if COMMENT_LOG_PATH else CommentStore(COMMENT_RETENTION)
+
+# Chỉ mục tìm kiếm (/comments/search). Bình luận đã có trong log lúc khởi động được đánh
+# chỉ mục ở thread nền (khởi động không phải chờ tokenize cả log); bình luận mới được đánh
+# chỉ mục ngay khi thêm. Trong lúc đó /comments/search trả "index_complete": false.
+search_index = InvertedIndex(retention=None if COMMENT_LOG_PATH else COMMENT_RETENTION)
+index_backfill = {"next_seq": comments.first_seq, "stop_seq": comments.next_seq}
+
+
+def backfill_search_index(batch=10_000):
+    # Seq tăng dần và nhỏ hơn mọi bình luận mới, nên chỉ chèn trước phần đuôi ngắn của posting list
+    while index_backfill["next_seq"] < index_backfill["stop_seq"]:
+        first = index_backfill["next_seq"]
+        count = min(batch, index_backfill["stop_seq"] - first)
+        search_index.add_many(first, comments.page(first, count)[3])
+        index_backfill["next_seq"] = first + count
+
+
+def search_index_complete():
+    return index_backfill["next_seq"] >= index_backfill["stop_seq"]
+
+
+search_index_backfill = threading.Thread(target=backfill_search_index, name="search-index-backfill", daemon=True)
+search_index_backfill.start()
+
+
+def store_comment(comment):
+    seq = comments.append(comment)
+    search_index.add(seq, comment)
+    return seq
+
+
+def store_comments(items):
+    first_seq = comments.extend(items)
+    search_index.add_many(first_seq, items)
+    return first_seq
 
 
 # Giả lập thư viện xử lý đầu vào (phiên bản cũ - không an toàn)
@@ -27,8 +81,18 @@ class InputProcessorV2:
         Phiên bản mới của thư viện (đã vá lỗi).
         Lọc và mã hóa đầu vào để ngăn chặn khai thác.
         """
-        # Mã hóa HTML để ngăn XSS
-        return html.escape(data)
+        # Mã hóa HTML để ngăn XSS (kết quả giống html.escape, có fast path và memo)
+        return default_engine.sanitize(data)
+
+    @staticmethod
+    def process_many(items):
+        """Mã hóa cả list đầu vào trong một lần xử lý."""
+        return default_engine.sanitize_many(items)
+
+
+# Dùng chung một instance cho mọi request (không tạo processor mới mỗi lần)
+input_processor_v1 = InputProcessorV1()
+input_processor_v2 = InputProcessorV2()
 
 
 # Thêm bình luận - Phiên bản không an toàn (Vulnerable Component)
@@ -43,12 +107,15 @@ def comment_insecure():
         return jsonify({"error": "Missing comment"}), 400
 
     comment = data["comment"]
+    # Bình luận không phải chuỗi (dict, list, ...) được giới hạn theo độ dài khi serialize
+    size = len(comment) if isinstance(comment, str) else len(json.dumps(comment, ensure_ascii=False))
+    if size > COMMENT_MAX_LENGTH:
+        return jsonify({"error": f"Comment too long (max {COMMENT_MAX_LENGTH} characters)"}), 413
 
     # Sử dụng phiên bản cũ (có lỗ hổng)
-    processor = InputProcessorV1()
-    processed_comment = processor.process_input(comment)
+    processed_comment = input_processor_v1.process_input(comment)
 
-    comments.append(processed_comment)
+    store_comment(processed_comment)
     return jsonify({
         "message": "Comment added (insecure)",
         "comment": processed_comment,
@@ -68,22 +135,116 @@ def comment_secure():
         return jsonify({"error": "Missing comment"}), 400
 
     comment = data["comment"]
+    if not isinstance(comment, str):
+        return jsonify({"error": "Comment must be a string"}), 400
+    if len(comment) > COMMENT_MAX_LENGTH:
+        return jsonify({"error": f"Comment too long (max {COMMENT_MAX_LENGTH} characters)"}), 413
 
     # Sử dụng phiên bản mới (đã vá lỗi)
-    processor = InputProcessorV2()
-    processed_comment = processor.process_input(comment)
+    processed_comment = input_processor_v2.process_input(comment)
 
-    comments.append(processed_comment)
+    store_comment(processed_comment)
     return jsonify({
         "message": "Comment added (secure)",
         "comment": processed_comment
     })
 
 
-# Xem tất cả bình luận
+# Thêm nhiều bình luận - Phiên bản an toàn
+@app.route("/comment/secure/bulk", methods=["POST"])
+def comment_secure_bulk():
+    """
+    Body {"comments": [...]}: mã hóa mọi bình luận hợp lệ trong một lần (InputProcessorV2.process_many),
+    thêm vào kho dưới một lần khóa và trả về trạng thái cho từng item.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("comments") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON body {\"comments\": [...]}"}), 400
+    if len(items) > COMMENT_BULK_MAX_ITEMS:
+        return jsonify({"error": f"Too many comments (max {COMMENT_BULK_MAX_ITEMS})"}), 413
+
+    results = []
+    valid = []          # (vị trí trong results, bình luận)
+    for index, comment in enumerate(items):
+        if not isinstance(comment, str):
+            results.append({"index": index, "status": "invalid", "error": "Comment must be a string"})
+        elif len(comment) > COMMENT_MAX_LENGTH:
+            results.append({"index": index, "status": "too_long"})
+        else:
+            results.append({"index": index, "status": "added"})
+            valid.append((index, comment))
+
+    processed = input_processor_v2.process_many([comment for _, comment in valid])
+    first_seq = store_comments(processed)
+    for offset, ((index, _), comment) in enumerate(zip(valid, processed)):
+        results[index]["seq"] = first_seq + offset
+        results[index]["comment"] = comment
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return jsonify({"summary": summary, "results": results})
+
+
+# Xem bình luận (phân trang bằng cursor)
 @app.route("/comments", methods=["GET"])
 def get_comments():
-    return jsonify({"comments": comments})
+    """
+    Trả về tối đa `limit` bình luận từ vị trí `cursor` kèm "next_cursor".
+    ETag được tính từ vị trí trang (không cần đọc dữ liệu): client gửi lại
+    If-None-Match và nhận 304 nếu trang không đổi, không phải serialize lại.
+    """
+    try:
+        position, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    etag = comments.etag(*comments.bounds(position, limit))
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    start, stop, has_more, page = comments.page(position, limit)
+    response = jsonify({"comments": page, "next_cursor": encode_cursor(stop) if has_more else None})
+    response.set_etag(comments.etag(start, stop, has_more))
+    return response
+
+
+# Tìm kiếm bình luận (chỉ mục ngược)
+@app.route("/comments/search", methods=["GET"])
+def search_comments():
+    """
+    ?q=: bình luận chứa tất cả các từ trong q (AND, không phân biệt hoa thường),
+    theo thứ tự thêm vào, phân trang bằng cursor/limit như /comments.
+    """
+    query = request.args.get("q", "")
+    if not query.strip():
+        return jsonify({"error": "Missing q"}), 400
+    try:
+        position, limit = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    seqs, has_more = search_index.search(query, max(position, comments.first_seq), limit)
+    results = []
+    for seq in seqs:
+        comment = comments.get(seq)
+        if comment is not None:  # có thể vừa bị ghi đè trong ring buffer
+            results.append({"seq": seq, "comment": comment})
+    return jsonify({
+        "comments": results,
+        "next_cursor": encode_cursor(seqs[-1] + 1) if has_more else None,
+        # false: bình luận cũ trong log chưa được đánh chỉ mục hết, kết quả có thể thiếu
+        "index_complete": search_index_complete()
+    })
+
+
+# Thống kê chỉ mục tìm kiếm
+@app.route("/comments/search/stats", methods=["GET"])
+def search_stats():
+    return jsonify(dict(search_index.stats(), complete=search_index_complete(), backfill=index_backfill))
 
 
 # Trang hướng dẫn
@@ -117,14 +278,30 @@ def index():
         <p>  → Secure: The comment is sanitized, and the malicious code is encoded as HTML entities (&lt;script&gt;alert('XSS')&lt;/script&gt;), preventing XSS.</p>
     </ol>
 
-    <p>3. View all comments:</p>
+    <p>3. Add many comments at once (Secure):</p>
+    <ol>
+        <li>Request: POST http://127.0.0.1:5000/comment/secure/bulk</li>
+        <li>Body: Raw JSON → {"comments": ["hello", "<img src=x onerror=alert(1)>", 42]}</li>
+        <li> Expected Response - Status 200 OK: {"summary": {"added": 2, "invalid": 1}, "results": [...]} </li>
+        <p>  → Secure: every comment is encoded exactly like the single secure route, in one batch.</p>
+    </ol>
+
+    <p>4. View all comments:</p>
     <ol>
         <li>Request: GET http://127.0.0.1:5000/comments</li>
         <li>Expected Response - Status 200 OK: </li>
-        <p> {<br>"comments": ["<script>alert('XSS')</script>",<br>"&lt;script&gt;alert(&#x27;XSS&#x27;)&lt;/script&gt;"<br>]<br>} </p> 
+        <p> {<br>"comments": ["<script>alert('XSS')</script>",<br>"&lt;script&gt;alert(&#x27;XSS&#x27;)&lt;/script&gt;"<br>],<br>"next_cursor": null<br>} </p> 
+        <p>  → Comments are paged (?limit=, default 100); pass next_cursor back as ?cursor= for the next page. Send the ETag response header back as If-None-Match to get 304 Not Modified while nothing changed. Only the latest COMMENT_RETENTION comments are kept, unless COMMENT_LOG_PATH is set (comments are then persisted to that append-only log file and survive restarts).</p>
         <p>  → Vulnerability: The comment contains malicious JavaScript code (<script>alert('XSS')</script>), which is not sanitized, potentially causing XSS if rendered on the web interface.</p>
     </ol>
 
+    <p>5. Search comments:</p>
+    <ol>
+        <li>Request: GET http://127.0.0.1:5000/comments/search?q=alert xss&limit=10</li>
+        <li>Expected Response - Status 200 OK: {"comments": [{"seq": 0, "comment": "..."}, ...], "next_cursor": null}</li>
+        <p>  → Returns comments containing every word of q (AND), paged like /comments. Index size: GET http://127.0.0.1:5000/comments/search/stats. After a restart with COMMENT_LOG_PATH the older comments are indexed in the background and "index_complete" is false until that finishes.</p>
+    </ol>
+
    """
 
 
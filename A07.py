@@ -1,11 +1,19 @@
 from flask import Flask, request, jsonify, session
 import bcrypt
 import os
-from collections import defaultdict
+
+from bcrypt_cost import cost_from_env, hash_cost, needs_rehash
+from rate_limiter import SlidingWindowLimiter
+from shared_throttle import SQLiteThrottle
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
+# Hiệu chỉnh cost bcrypt theo phần cứng lúc khởi động (BCRYPT_TARGET_MS / BCRYPT_COST)
+bcrypt_calibration = cost_from_env()
+BCRYPT_COST = bcrypt_calibration["cost"]
+bcrypt_stats = {"rehashed_on_login": 0}
+
 # Mock database (in-memory)
 users = [
     {"id": 1, "username": "alice", "password": "password123"},  # Plaintext (không an toàn)
@@ -14,13 +22,21 @@ users = [
 
 # Tạo mật khẩu đã mã hóa bằng bcrypt cho phiên bản an toàn
 users_secure = [
-    {"id": 1, "username": "alice", "password": bcrypt.hashpw("password123".encode(), bcrypt.gensalt())},
-    {"id": 2, "username": "bob", "password": bcrypt.hashpw("password456".encode(), bcrypt.gensalt())}
+    {"id": 1, "username": "alice", "password": bcrypt.hashpw("password123".encode(), bcrypt.gensalt(BCRYPT_COST))},
+    {"id": 2, "username": "bob", "password": bcrypt.hashpw("password456".encode(), bcrypt.gensalt(BCRYPT_COST))}
 ]
 
-# Theo dõi số lần thử đăng nhập (chống brute force)
-login_attempts = defaultdict(int)
-MAX_ATTEMPTS = 5
+# Theo dõi số lần thử đăng nhập theo IP (chống brute force): tối đa MAX_ATTEMPTS lần
+# trong LOGIN_WINDOW giây, theo dõi tối đa LOGIN_MAX_TRACKED_IPS IP (bỏ IP lâu không dùng nhất)
+MAX_ATTEMPTS = int(os.environ.get("MAX_ATTEMPTS", 5))
+LOGIN_WINDOW = int(os.environ.get("LOGIN_WINDOW", 60))
+LOGIN_MAX_TRACKED_IPS = int(os.environ.get("LOGIN_MAX_TRACKED_IPS", 100_000))
+# Đặt THROTTLE_DB (file SQLite) để mọi worker trên cùng máy dùng chung bộ đếm
+THROTTLE_DB = os.environ.get("THROTTLE_DB")
+if THROTTLE_DB:
+    login_attempts = SQLiteThrottle(THROTTLE_DB, "a07_login", MAX_ATTEMPTS, LOGIN_WINDOW, LOGIN_MAX_TRACKED_IPS)
+else:
+    login_attempts = SlidingWindowLimiter(MAX_ATTEMPTS, LOGIN_WINDOW, LOGIN_MAX_TRACKED_IPS)
 
 # Helper function để tìm người dùng theo username
 def get_user_by_username(username, user_list):
@@ -73,16 +89,23 @@ def login_secure():
 
     # Kiểm tra số lần thử đăng nhập
     client_ip = request.remote_addr
-    login_attempts[client_ip] += 1
-    if login_attempts[client_ip] > MAX_ATTEMPTS:
-        return jsonify({"error": "Too many login attempts, please try again later"}), 429
+    allowed, retry_after = login_attempts.hit(client_ip)
+    if not allowed:
+        response = jsonify({"error": "Too many login attempts, please try again later"})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 429
 
     user = get_user_by_username(username, users_secure)
     if not user or not bcrypt.checkpw(password.encode(), user["password"]):
         return jsonify({"error": "Invalid credentials"}), 401  # Thông báo lỗi chung
 
+    # Hash có cost thấp hơn cost hiện tại -> băm lại với cost mới
+    if needs_rehash(user["password"], BCRYPT_COST):
+        user["password"] = bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_COST))
+        bcrypt_stats["rehashed_on_login"] += 1
+
     # Đặt lại số lần thử nếu đăng nhập thành công
-    login_attempts[client_ip] = 0
+    login_attempts.reset(client_ip)
     session["user_id"] = user["id"]
     return jsonify({"message": f"Logged in as {username} (secure)"})
 
@@ -92,6 +115,24 @@ def logout():
     session.pop("user_id", None)
     return jsonify({"message": "Logged out"})
 
+# Thông tin cost bcrypt cho monitoring
+@app.route("/metrics/bcrypt", methods=["GET"])
+def bcrypt_metrics():
+    costs = {}
+    for user in users_secure:
+        cost = hash_cost(user["password"])
+        costs[cost] = costs.get(cost, 0) + 1
+    return jsonify({
+        **bcrypt_calibration,
+        **bcrypt_stats,
+        "stored_hash_costs": {str(cost): count for cost, count in costs.items()}
+    })
+
+# Thống kê bộ giới hạn số lần đăng nhập cho monitoring
+@app.route("/metrics/login_attempts", methods=["GET"])
+def login_attempts_metrics():
+    return jsonify(login_attempts.stats())
+
 # Trang hướng dẫn
 @app.route("/")
 def index():
@@ -152,6 +193,7 @@ def index():
         <li>Body: Raw JSON →{"username": "alice", "password": "wrongpassword"}</li>
         <li> Expected Response (6 consecutive requests) - Status 429 Too Many Requests: </li>
         <p>  → Message: "error": "Too many login attempts, please try again later" </p>
+        <p>  → The Retry-After header says how many seconds to wait: attempts are counted over a sliding LOGIN_WINDOW (default 60 seconds), so the IP is unblocked once it slows down, and a successful login resets the counter. Set THROTTLE_DB to a SQLite file path to share the counter between worker processes. Limiter stats: GET http://127.0.0.1:5000/metrics/login_attempts</p>
     </ol>
     """
 
@@ -2,8 +2,9 @@ from flask import Flask, request, jsonify, session
 import logging
 import os
 from datetime import datetime
-from collections import defaultdict
-import time
+
+from rate_limiter import SlidingLogLimiter
+from shared_throttle import SQLiteLogThrottle
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
@@ -31,10 +32,17 @@ def get_user_by_username(username):
             return user
     return None
 
-# Thêm biến lưu số lần đăng nhập sai và thời gian
-FAILED_LOGINS = defaultdict(list)  # key: (ip, username), value: list of timestamps
+# Bộ đếm số lần đăng nhập sai theo (ip, username): lưu thời điểm từng lần, đếm chính xác trong cửa sổ
 BRUTE_FORCE_THRESHOLD = 5          # số lần sai liên tiếp
 BRUTE_FORCE_WINDOW = 60            # trong vòng 60 giây
+BRUTE_FORCE_MAX_KEYS = int(os.environ.get("BRUTE_FORCE_MAX_KEYS", 100_000))
+# Đặt THROTTLE_DB (file SQLite) để mọi worker trên cùng máy dùng chung bộ đếm
+THROTTLE_DB = os.environ.get("THROTTLE_DB")
+if THROTTLE_DB:
+    FAILED_LOGINS = SQLiteLogThrottle(THROTTLE_DB, "a09_failed_logins", BRUTE_FORCE_THRESHOLD,
+                                      BRUTE_FORCE_WINDOW, BRUTE_FORCE_MAX_KEYS)
+else:
+    FAILED_LOGINS = SlidingLogLimiter(BRUTE_FORCE_THRESHOLD, BRUTE_FORCE_WINDOW, BRUTE_FORCE_MAX_KEYS)
 
 # Đăng nhập - Phiên bản không an toàn (Logging Failure)
 @app.route("/login/insecure", methods=["POST"])
@@ -82,26 +90,26 @@ def login_secure():
 
     # Kiểm tra brute force
     key = (client_ip, username)
-    now = time.time()
-    # Xóa các lần sai quá cũ
-    FAILED_LOGINS[key] = [t for t in FAILED_LOGINS[key] if now - t < BRUTE_FORCE_WINDOW]
-    if len(FAILED_LOGINS[key]) >= BRUTE_FORCE_THRESHOLD:
+    allowed, retry_after = FAILED_LOGINS.peek(key)
+    if not allowed:
         logger.warning("Brute force detected", extra={"ip": client_ip, "username": username})
-        return jsonify({"error": "Too many failed login attempts. Please try again later."}), 429
+        response = jsonify({"error": "Too many failed login attempts. Please try again later."})
+        response.headers["Retry-After"] = str(retry_after)
+        return response, 429
 
     user = get_user_by_username(username)
     if not user:
-        FAILED_LOGINS[key].append(now)
+        FAILED_LOGINS.record(key)
         logger.warning("Invalid credentials - Username not found", extra={"ip": client_ip, "username": username})
         return jsonify({"error": "Invalid credentials"}), 401
 
     if user["password"] != password:
-        FAILED_LOGINS[key].append(now)
+        FAILED_LOGINS.record(key)
         logger.warning("Invalid credentials - Wrong password", extra={"ip": client_ip, "username": username})
         return jsonify({"error": "Invalid credentials"}), 401
 
     # Đăng nhập thành công thì reset bộ đếm
-    FAILED_LOGINS[key] = []
+    FAILED_LOGINS.reset(key)
     session["user_id"] = user["id"]
     logger.info("Login successful", extra={"ip": client_ip, "username": username})
     return jsonify({"message": f"Logged in as {username} (secure)"})
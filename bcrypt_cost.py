@@ -0,0 +1,111 @@
+# Hiệu chỉnh cost (work factor) của bcrypt theo phần cứng đang chạy.
+# Thay vì dùng cost mặc định của bcrypt.gensalt(), lúc khởi động đo thời gian
+# băm ở từng cost và chọn cost lớn nhất còn nằm trong ngưỡng độ trễ mục tiêu.
+# Kết quả được lưu vào file (BCRYPT_COST_FILE) và dùng chung: mọi worker/app trên máy
+# dùng cùng một cost thay vì mỗi process tự đo (nhiễu đo có thể cho cost khác nhau).
+# Hash cũ có cost thấp hơn sẽ được băm lại khi người dùng đăng nhập thành công.
+import json
+import os
+import time
+
+import bcrypt
+
+DEFAULT_TARGET_MS = 100
+DEFAULT_COST_FILE = "bcrypt_cost.json"
+MIN_COST = 10   # Không chọn thấp hơn mức này dù máy chậm
+MAX_COST = 16
+
+
+def calibrate_cost(target_ms=DEFAULT_TARGET_MS, min_cost=MIN_COST, max_cost=MAX_COST):
+    """
+    Đo bcrypt.hashpw ở các cost tăng dần (mỗi bậc chậm gấp đôi) và dừng khi
+    vượt target_ms. Trả về dict gồm cost đã chọn và thời gian đo được (ms).
+    """
+    timings = {}
+    cost = min_cost
+    for rounds in range(min_cost, max_cost + 1):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timings[rounds] = round(elapsed_ms, 2)
+        if elapsed_ms > target_ms:
+            break
+        cost = rounds
+    return {
+        "cost": cost,
+        "target_ms": target_ms,
+        "timings_ms": timings,
+        "calibrated_at": time.time(),
+        "source": "calibration",
+    }
+
+
+def load_or_calibrate(path, target_ms=DEFAULT_TARGET_MS):
+    """
+    Đọc kết quả hiệu chỉnh đã lưu ở `path`; nếu chưa có (hoặc được đo với target_ms khác)
+    thì hiệu chỉnh rồi lưu lại. Khi nhiều process cùng khởi động, process ghi trước thắng
+    và mọi process đều dùng kết quả trong file.
+    """
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+        if stored.get("target_ms") == target_ms:
+            return dict(stored, source=path)
+        replace = True
+    except (OSError, ValueError):
+        replace = False
+    result = calibrate_cost(target_ms)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    try:
+        if replace:
+            os.replace(tmp_path, path)
+        else:
+            os.link(tmp_path, path)  # Nguyên tử, thất bại nếu process khác đã ghi trước
+    except FileExistsError:
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    with open(path) as f:
+        return dict(json.load(f), source=path)
+
+
+def cost_from_env():
+    """
+    BCRYPT_COST cố định cost (bỏ qua hiệu chỉnh);
+    nếu không có thì hiệu chỉnh theo BCRYPT_TARGET_MS (mặc định 100ms), dùng chung qua
+    file BCRYPT_COST_FILE (mặc định bcrypt_cost.json; để rỗng thì mỗi process tự hiệu chỉnh).
+    """
+    fixed = os.environ.get("BCRYPT_COST")
+    if fixed:
+        return {"cost": int(fixed), "target_ms": None, "timings_ms": {},
+                "calibrated_at": time.time(), "source": "BCRYPT_COST"}
+    target_ms = float(os.environ.get("BCRYPT_TARGET_MS", DEFAULT_TARGET_MS))
+    path = os.environ.get("BCRYPT_COST_FILE", DEFAULT_COST_FILE)
+    if not path:
+        return calibrate_cost(target_ms)
+    return load_or_calibrate(path, target_ms)
+
+
+def hash_cost(hashed):
+    """Lấy cost từ hash dạng b"$2b$12$..."; None nếu không đọc được."""
+    try:
+        return int(hashed.split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+# BCRYPT_ALLOW_DOWNGRADE=1: băm lại cả hash có cost cao hơn cost hiện tại (mặc định giữ nguyên)
+ALLOW_DOWNGRADE = os.environ.get("BCRYPT_ALLOW_DOWNGRADE") == "1"
+
+
+def needs_rehash(hashed, cost, allow_downgrade=None):
+    """Hash có cost thấp hơn `cost` (hoặc khác `cost` nếu cho phép hạ cost) thì cần băm lại."""
+    current = hash_cost(hashed)
+    if current is None:
+        return True
+    if allow_downgrade is None:
+        allow_downgrade = ALLOW_DOWNGRADE
+    return current != cost if allow_downgrade else current < cost
@@ -0,0 +1,71 @@
+# Benchmark: tìm kiếm chuỗi con trên username/email (A03) ở quy mô lớn -
+# FTS5 trigram (/search/secure/fulltext) vs quét LIKE '%x%'.
+# Chạy trong thư mục tạm nên không đụng tới users.db của repo.
+# Chạy: python benchmarks/bench_a03_fulltext.py [--rows 1000000]
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    import A03
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(A03.DB_PATH)
+    conn.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)",
+                     ((f"user{i:07d}", f"user{i:07d}@mail{i % 500}.example.com") for i in range(args.rows)))
+    conn.commit()
+    print(f"loaded {args.rows} rows (with FTS triggers) in {time.perf_counter() - start:.1f}s")
+
+    terms = [f"{random.randrange(args.rows):07d}"[2:] for _ in range(args.queries)]
+    read = A03.read_db.acquire()
+
+    def run_fts(term):
+        return read.execute(
+            "SELECT u.id, u.username, u.email, bm25(users_fts) AS score "
+            "FROM users_fts JOIN users u ON u.id = users_fts.rowid "
+            "WHERE users_fts MATCH ? ORDER BY score LIMIT ?",
+            ('"' + term + '"', args.limit)).fetchall()
+
+    def run_like(term):
+        return read.execute(
+            "SELECT id, username, email FROM users WHERE username LIKE ? OR email LIKE ? LIMIT ?",
+            (f"%{term}%", f"%{term}%", args.limit)).fetchall()
+
+    print(f"{'mode':>8} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, fn in (("fts5", run_fts), ("like", run_like)):
+        samples = []
+        for term in terms:
+            t = time.perf_counter()
+            fn(term)
+            samples.append((time.perf_counter() - t) * 1000)
+        print(f"{name:>8} {percentile(samples, 0.5):>10.2f} {percentile(samples, 0.99):>10.2f}")
+    A03.read_db.release(read)
+
+    client = A03.app.test_client()
+    t = time.perf_counter()
+    for term in terms:
+        client.get(f"/search/secure/fulltext?q={term}&limit={args.limit}")
+    print(f"GET /search/secure/fulltext: {(time.perf_counter() - t) / len(terms) * 1000:.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Benchmark: requests/s của GET /search/secure (A03) - mở kết nối mỗi request
+# (cách cũ) vs pool kết nối (db_pool.py), tuần tự và một thread mới cho mỗi request
+# (như server mặc định của Werkzeug); in số kết nối/file descriptor còn mở sau đó.
+# Chạy trong thư mục tạm nên không đụng tới users.db của repo.
+# Chạy: python benchmarks/bench_a03_search.py [--rows 10000] [--requests 5000] [--concurrency 8]
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    import A03
+    from flask import jsonify, request
+
+    conn = sqlite3.connect(A03.DB_PATH)
+    conn.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(args.rows)))
+    conn.commit()
+    conn.close()
+
+    # Route theo cách cũ: connect/close ở mỗi request
+    @A03.app.route("/bench/search/connect-per-request")
+    def search_connect_per_request():
+        conn = sqlite3.connect(A03.DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM users WHERE username = ?", (request.args.get("username"),))
+        results = cursor.fetchall()
+        conn.close()
+        return jsonify([{"id": row[0], "username": row[1], "email": row[2]} for row in results])
+
+    client = A03.app.test_client()
+    names = [f"user{random.randrange(args.rows)}" for _ in range(args.requests)]
+
+    def run(path):
+        start = time.perf_counter()
+        for name in names:
+            assert client.get(f"{path}?username={name}").status_code == 200
+        return args.requests / (time.perf_counter() - start)
+
+    # Mỗi request trên một thread mới, tối đa `concurrency` thread cùng lúc
+    def run_threaded(path):
+        statuses = []
+
+        def handle(name):
+            statuses.append(client.get(f"{path}?username={name}").status_code)
+
+        start = time.perf_counter()
+        for i in range(0, len(names), args.concurrency):
+            threads = [threading.Thread(target=handle, args=(name,)) for name in names[i:i + args.concurrency]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        assert statuses.count(200) == len(names)
+        return args.requests / (time.perf_counter() - start)
+
+    def open_fds():
+        return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else -1
+
+    # Đo riêng phần SQLite (không qua Flask)
+    def raw_connect():
+        start = time.perf_counter()
+        for name in names:
+            c = sqlite3.connect(A03.DB_PATH)
+            c.execute("SELECT * FROM users WHERE username = ?", (name,)).fetchall()
+            c.close()
+        return args.requests / (time.perf_counter() - start)
+
+    def raw_pool():
+        start = time.perf_counter()
+        for name in names:
+            with A03.read_db.checkout() as c:
+                c.execute("SELECT * FROM users WHERE username = ?", (name,)).fetchall()
+        return args.requests / (time.perf_counter() - start)
+
+    print(f"rows={args.rows} requests={args.requests}")
+    print(f"{'':>22} {'before (req/s)':>15} {'after (req/s)':>14}")
+    print(f"{'sqlite only':>22} {raw_connect():>15.0f} {raw_pool():>14.0f}")
+    print(f"{'GET /search/secure':>22} {run('/bench/search/connect-per-request'):>15.0f} {run('/search/secure'):>14.0f}")
+    print(f"{'thread per request':>22} {run_threaded('/bench/search/connect-per-request'):>15.0f} "
+          f"{run_threaded('/search/secure'):>14.0f}")
+    stats = A03.read_db.stats()
+    print(f"after {args.requests} threads: pool open={stats['open']} (max {stats['max_size']}), "
+          f"in use={stats['in_use']}, process fds={open_fds()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Benchmark: độ trễ p50/p99 của các truy vấn tìm kiếm A03 trên database trên đĩa
+# (SQLiteConnectionPool chỉ đọc) so với bản sao in-memory (MemorySnapshot), cùng thời
+# gian chép snapshot. Database được seed trong thư mục tạm (không đụng users.db của repo).
+# Chạy: python benchmarks/bench_a03_snapshot.py [--rows 1000000] [--queries 20000]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import SQLiteConnectionPool
+from memory_snapshot import MemorySnapshot
+from users_db import seed_users
+
+QUERIES = {
+    "exact username": ("SELECT id, username, email FROM users WHERE username = ? AND id > 0 ORDER BY id LIMIT 101",
+                       lambda i: (f"user{i:08d}",)),
+    "fulltext bm25": ("SELECT u.id, u.username, u.email, bm25(users_fts) AS score "
+                      "FROM users_fts JOIN users u ON u.id = users_fts.rowid "
+                      "WHERE users_fts MATCH ? ORDER BY score LIMIT 20",
+                      lambda i: (f'"{i:06d}"',)),
+    "prefix range": ("SELECT id, username, email, 0 FROM users "
+                     "WHERE username >= ? AND username < ? ORDER BY username LIMIT 20",
+                     lambda i: (f"user{i:05d}", f"user{i:05d}\U0010ffff")),
+}
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def measure(conn, sql, make_params, ids):
+    timings = []
+    for i in ids:
+        params = make_params(i)
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return percentile(timings, 0.5), percentile(timings, 0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "users.db")
+    inserted, elapsed = seed_users(path, args.rows)
+    print(f"seeded {inserted} rows in {elapsed:.1f}s, file {os.path.getsize(path) / 1e6:.0f} MB")
+
+    disk = SQLiteConnectionPool(path, readonly=True)
+    start = time.perf_counter()
+    memory = MemorySnapshot(path, refresh_interval=None)
+    print(f"snapshot copy: {time.perf_counter() - start:.2f}s")
+
+    ids = [random.randrange(1, args.rows) for _ in range(args.queries)]
+    print(f"{'query':>16} | {'disk p50':>9} | {'disk p99':>9} | {'mem p50':>9} | {'mem p99':>9}  (us)")
+    for name, (sql, make_params) in QUERIES.items():
+        # Một lượt làm nóng page cache/mmap cho bản trên đĩa để so sánh công bằng
+        with disk.checkout() as conn:
+            measure(conn, sql, make_params, ids[:1000])
+            disk_p50, disk_p99 = measure(conn, sql, make_params, ids)
+        with memory.checkout() as conn:
+            mem_p50, mem_p99 = measure(conn, sql, make_params, ids)
+        print(f"{name:>16} | {disk_p50:>9.1f} | {disk_p99:>9.1f} | {mem_p50:>9.1f} | {mem_p99:>9.1f}")
+
+    start = time.perf_counter()
+    memory.refresh()
+    print(f"forced refresh (double-buffered copy + swap): {time.perf_counter() - start:.2f}s")
+    disk.close_all()
+    memory.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# Benchmark: thời gian khởi động init_db (A03) khi database chưa có / đã ở schema
+# mới nhất, và thông lượng seed hàng loạt (users_db.seed_users).
+# Chạy: python benchmarks/bench_a03_startup.py [--rows 1000000]
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from users_db import init_db, seed_users
+
+
+def timed_init(path, repeat=1):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        init_db(path)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "users.db")
+    print(f"init_db, new database:            {timed_init(path):8.2f} ms")
+    print(f"init_db, schema already current:  {timed_init(path, repeat=20):8.2f} ms")
+
+    inserted, elapsed = seed_users(path, args.rows)
+    print(f"seed {inserted} users:             {elapsed:8.2f} s ({inserted / elapsed:,.0f} rows/s)")
+    print(f"init_db after seeding:            {timed_init(path, repeat=20):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
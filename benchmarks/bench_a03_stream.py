@@ -0,0 +1,74 @@
+# Benchmark: bộ nhớ đỉnh và thời gian tới byte đầu tiên (TTFB) khi truy vấn
+# khớp nhiều dòng (A03) - fetchall + jsonify (cách cũ) vs stream=1 (fetchmany).
+# Chạy trong thư mục tạm nên không đụng tới users.db của repo.
+# Chạy: python benchmarks/bench_a03_stream.py [--sizes 10000 100000 500000]
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    import A03
+    from flask import jsonify
+
+    client = A03.app.test_client()
+    conn = sqlite3.connect(A03.DB_PATH)
+    loaded = 0
+    fulltext_query = ("SELECT u.id, u.username, u.email, NULL "
+                      "FROM users_fts JOIN users u ON u.id = users_fts.rowid "
+                      "WHERE users_fts MATCH ? ORDER BY users_fts.rowid")
+
+    def old_style():
+        with A03.read_db.checkout() as read:
+            results = read.execute(fulltext_query, ('"bulk.example"',)).fetchall()
+        with A03.app.test_request_context():
+            body = jsonify([{"id": r[0], "username": r[1], "email": r[2], "score": r[3]} for r in results]).get_data()
+        return len(body)
+
+    def streamed():
+        start = time.perf_counter()
+        response = client.get("/search/secure/fulltext?q=bulk.example&stream=1")
+        chunks = iter(response.response)
+        total = len(next(chunks))
+        ttfb = time.perf_counter() - start
+        for chunk in chunks:
+            total += len(chunk)
+        response.close()
+        return ttfb
+
+    print(f"{'matches':>8} {'old peak MB':>12} {'old s':>7} {'stream peak MB':>15} {'stream TTFB ms':>15} {'stream s':>9}")
+    for n in args.sizes:
+        conn.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)",
+                         ((f"bulk{i}", f"bulk{i}@bulk.example") for i in range(loaded, n)))
+        conn.commit()
+        loaded = n
+
+        tracemalloc.start()
+        t = time.perf_counter()
+        old_style()
+        old_time = time.perf_counter() - t
+        old_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        t = time.perf_counter()
+        ttfb = streamed()
+        stream_time = time.perf_counter() - t
+        stream_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        print(f"{n:>8} {old_peak:>12.1f} {old_time:>7.2f} {stream_peak:>15.2f} {ttfb * 1000:>15.2f} {stream_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
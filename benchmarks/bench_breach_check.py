@@ -0,0 +1,70 @@
+# Benchmark: tra cứu mật khẩu bị lộ qua file SHA-1 đã sắp xếp + mmap (breach_check.py).
+# Tạo dump giả N digest, build index (+ Bloom filter), rồi đo độ trễ tra cứu
+# (trúng / trượt) và RSS của process.
+# Chạy: python benchmarks/bench_breach_check.py [--entries 5000000]
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from breach_check import BreachedPasswordIndex, build_bloom, build_index
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def time_lookups(index, passwords):
+    latencies = []
+    for password in passwords:
+        start = time.perf_counter()
+        index.is_breached(password)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "dump.txt")
+        index_path = os.path.join(tmp, "breached.bin")
+        with open(dump, "w") as f:
+            for i in range(args.entries):
+                f.write(f"{hashlib.sha1(f'leaked{i}'.encode()).hexdigest().upper()}:{i % 100 + 1}\n")
+
+        start = time.perf_counter()
+        count = build_index(dump, index_path)
+        build_bloom(index_path)
+        print(f"built {count} digests in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(index_path) / 1024 / 1024:.0f} MB + bloom "
+              f"{os.path.getsize(index_path + '.bloom') / 1024 / 1024:.0f} MB)")
+
+        hits = [f"leaked{random.randrange(args.entries)}" for _ in range(args.lookups)]
+        misses = [f"fresh{i}" for i in range(args.lookups)]
+        rss_before = rss_mb()
+        for use_bloom in (False, True):
+            index = BreachedPasswordIndex(index_path, use_bloom=use_bloom)
+            hit_p50, hit_p99 = time_lookups(index, hits)
+            miss_p50, miss_p99 = time_lookups(index, misses)
+            print(f"bloom={use_bloom!s:5} hit p50={hit_p50:.1f}us p99={hit_p99:.1f}us | "
+                  f"miss p50={miss_p50:.1f}us p99={miss_p99:.1f}us | "
+                  f"RSS +{rss_mb() - rss_before:.1f} MB")
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Benchmark: POST /delete/secure/bulk của A04 (admin, xóa mềm) với số id tăng dần,
+# so với xóa trên list như A04 ban đầu (list.remove, O(n) mỗi lần), cùng thời gian
+# compaction và batch dài nhất (khoảng dừng lớn nhất mà request khác có thể gặp).
+# Chạy: python benchmarks/bench_bulk_delete.py [--sizes 10000 50000 100000] [--batch-size 1000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import A04
+from user_store import ConcurrentUserStore
+
+
+def make_users(n):
+    return [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "is_admin": False}
+        for i in range(10, 10 + n)
+    ] + [{"id": 1, "username": "root", "email": "root@example.com", "is_admin": True}]
+
+
+def list_delete(n, sample):
+    # Cách cũ: tìm rồi users.remove(user) trên list, đo trên `sample` id rồi ngoại suy
+    users = make_users(n)
+    ids = random.sample(range(10, 10 + n), sample)
+    start = time.perf_counter()
+    for user_id in ids:
+        user = next(u for u in users if u["id"] == user_id)
+        users.remove(user)
+    return (time.perf_counter() - start) / sample * n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    A04.users.stop_compactor()
+    print(f"{'ids':>8} | {'bulk request (s)':>16} | {'us/id':>6} | {'compact (s)':>11} | "
+          f"{'max batch (ms)':>14} | {'list.remove (s, est.)':>21}")
+    for n in args.sizes:
+        A04.users = store = ConcurrentUserStore(make_users(n))
+        client = A04.app.test_client()
+        client.post("/login", json={"username": "root"})
+        ids = list(range(10, 10 + n))
+
+        start = time.perf_counter()
+        response = client.post("/delete/secure/bulk?confirm=yes", json={"ids": ids})
+        request_s = time.perf_counter() - start
+        assert response.get_json()["summary"] == {"deleted": n}
+        assert len(store) == 1
+
+        max_batch = 0.0
+        start = time.perf_counter()
+        while True:
+            batch_start = time.perf_counter()
+            if not store.compact(args.batch_size):
+                break
+            max_batch = max(max_batch, time.perf_counter() - batch_start)
+        compact_s = time.perf_counter() - start
+        assert len(store._by_id) == 1 and len(store._by_username) == 1
+
+        legacy = list_delete(n, sample=min(n, 500))
+        print(f"{n:>8} | {request_s:>16.3f} | {request_s / n * 1e6:>6.2f} | {compact_s:>11.3f} | "
+              f"{max_batch * 1000:>14.2f} | {legacy:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
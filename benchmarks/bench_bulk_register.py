@@ -0,0 +1,66 @@
+# Benchmark: seed N người dùng qua POST /register/secure/bulk (A02).
+# Thời gian/người dùng gần như không đổi khi N tăng -> chi phí tuyến tính.
+# Cột "scan dedupe" đo riêng cách kiểm tra trùng cũ (duyệt list, O(N^2) tổng cộng).
+# Chạy: python benchmarks/bench_bulk_register.py [--sizes 1000 2000 4000 8000]
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Cost thấp nhất để thời gian đo phản ánh phần chỉ mục/điều phối, không phải bcrypt
+os.environ.setdefault("BCRYPT_COST", "4")
+os.environ.setdefault("BULK_MAX_ITEMS", "1000000")
+
+import A02
+
+
+def reset_store():
+    A02.secure_users.clear()
+    A02.secure_by_username.clear()
+
+
+def scan_dedupe(usernames):
+    # Cách cũ: mỗi username duyệt toàn bộ list đã có
+    existing = []
+    for username in usernames:
+        for user in existing:
+            if user["username"] == username:
+                break
+        else:
+            existing.append({"username": username})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 2_000, 4_000, 8_000])
+    parser.add_argument("--ndjson", action="store_true")
+    args = parser.parse_args()
+
+    client = A02.app.test_client()
+    print(f"bcrypt cost={A02.hash_executor.rounds} workers={A02.hash_executor.max_workers}")
+    print(f"{'users':>8} {'bulk total (s)':>15} {'bulk us/user':>13} {'scan dedupe (s)':>16}")
+    try:
+        for n in args.sizes:
+            reset_store()
+            users = [{"username": f"user{i}", "password": f"pw{i}"} for i in range(n)]
+            start = time.perf_counter()
+            if args.ndjson:
+                body = "\n".join(json.dumps(u) for u in users)
+                response = client.post("/register/secure/bulk", data=body, content_type="application/x-ndjson")
+            else:
+                response = client.post("/register/secure/bulk", json=users)
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 200 and response.json["summary"] == {"created": n}
+
+            start = time.perf_counter()
+            scan_dedupe([u["username"] for u in users])
+            scan = time.perf_counter() - start
+            print(f"{n:>8} {elapsed:>15.3f} {elapsed / n * 1e6:>13.1f} {scan:>16.3f}")
+    finally:
+        A02.hash_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
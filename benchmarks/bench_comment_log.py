@@ -0,0 +1,88 @@
+# Benchmark: khởi động lại A06 với COMMENT_LOG_PATH khi log đã có sẵn nhiều bình luận -
+# thời gian dựng lại chỉ mục offset, bộ nhớ RAM dùng sau khi khởi động (so với đọc toàn bộ
+# bình luận vào list), độ trễ đọc một trang từ mmap ở đầu/giữa/cuối log, và thời gian import
+# A06 (cold start của app) cùng thời gian thread nền đánh chỉ mục tìm kiếm xong cả log.
+# Chạy: python benchmarks/bench_comment_log.py [--comments 1000000] [--path /tmp/bench_comments.log]
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comment_log import HEADER_SIZE, CommentLog, _LENGTH
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=1_000_000)
+    parser.add_argument("--path", default="/tmp/bench_comments.log")
+    parser.add_argument("--reads", type=int, default=2_000)
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        os.remove(args.path)
+    start = time.perf_counter()
+    log = CommentLog(args.path)
+    batch = 10_000
+    for first in range(0, args.comments, batch):
+        log.extend([f"comment number {i:08d} &lt;b&gt;hello&lt;/b&gt;"
+                    for i in range(first, min(first + batch, args.comments))])
+    log.close()
+    size_mb = os.path.getsize(args.path) / 1e6
+    print(f"wrote {args.comments} comments ({size_mb:.1f} MB) in {time.perf_counter() - start:.2f} s")
+
+    def load_all():
+        # Cách làm "ngây thơ": đọc và parse toàn bộ log vào list khi khởi động
+        with open(args.path, "rb") as f:
+            data = f.read()
+        loaded, position = [], HEADER_SIZE
+        while position < len(data):
+            end = position + 4 + _LENGTH.unpack_from(data, position)[0]
+            loaded.append(json.loads(data[position + 4:end]))
+            position = end
+        return loaded
+
+    # Đo thời gian và bộ nhớ ở hai lần chạy riêng (tracemalloc làm chậm đáng kể)
+    for name, open_store in (("cold start (index only)", lambda: CommentLog(args.path)),
+                             ("cold start (load all)", load_all)):
+        start = time.perf_counter()
+        store = open_store()
+        elapsed = time.perf_counter() - start
+        assert len(store) == args.comments
+        if isinstance(store, CommentLog):
+            store.close()
+        del store
+        tracemalloc.start()
+        store = open_store()
+        mb = tracemalloc.get_traced_memory()[0] / 1e6
+        tracemalloc.stop()
+        if isinstance(store, CommentLog):
+            log = store
+        del store
+        print(f"{name:>26}: {elapsed:>6.2f} s, {mb:>6.1f} MB RAM")
+
+    for name, position in (("head", 0), ("middle", args.comments // 2), ("tail", args.comments - 100)):
+        start = time.perf_counter()
+        for _ in range(args.reads):
+            page = log.page(position, 100)[3]
+        elapsed = (time.perf_counter() - start) / args.reads
+        assert page[0] == f"comment number {position:08d} &lt;b&gt;hello&lt;/b&gt;"
+        print(f"{'page of 100 at ' + name:>26}: {elapsed * 1e6:>6.0f} us")
+    log.close()
+
+    os.environ["COMMENT_LOG_PATH"] = args.path
+    start = time.perf_counter()
+    import A06
+    print(f"{'A06 cold start (import)':>26}: {time.perf_counter() - start:>6.2f} s")
+    A06.search_index_backfill.join()
+    assert A06.search_index_complete() and A06.search_index.stats()["indexed"] == args.comments
+    print(f"{'search index backfilled':>26}: {time.perf_counter() - start:>6.2f} s")
+    A06.comments.close()
+    os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
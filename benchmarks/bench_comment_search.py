@@ -0,0 +1,80 @@
+# Benchmark: tìm kiếm bình luận bằng chỉ mục ngược so với quét tuyến tính mọi bình luận,
+# với truy vấn 1/2/3 từ (AND) trên corpus phân bố Zipf; kèm thời gian dựng và bộ nhớ chỉ mục.
+# Chạy: python benchmarks/bench_comment_search.py [--comments 1000000] [--limit 100] [--scan-queries 3]
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inverted_index import InvertedIndex, tokenize
+
+
+def make_corpus(n, vocabulary):
+    words = [f"w{i}" for i in range(vocabulary)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    corpus = []
+    for _ in range(n):
+        corpus.append(" ".join(random.choices(words, cum_weights=cum_weights, k=random.randint(5, 20))))
+    return corpus, words
+
+
+def linear_search(corpus, query, limit):
+    terms = set(tokenize(query))
+    results = []
+    for seq, comment in enumerate(corpus):
+        if terms.issubset(tokenize(comment)):
+            results.append(seq)
+            if len(results) == limit:
+                break
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(1)
+    corpus, words = make_corpus(args.comments, args.vocabulary)
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for seq, comment in enumerate(corpus):
+        index.add(seq, comment)
+    build = time.perf_counter() - start
+    stats = index.stats()
+    print(f"indexed {args.comments} comments in {build:.1f} s ({build / args.comments * 1e6:.1f} us/comment)")
+    print(f"index: {stats['tokens']} tokens, {stats['postings']} postings, {stats['memory_bytes'] / 1e6:.1f} MB")
+
+    # Từ phổ biến (đầu danh sách Zipf) và từ hiếm: trường hợp tốt/xấu cho cả hai cách
+    cases = [
+        ("1 common term", lambda: random.choice(words[:50])),
+        ("1 rare term", lambda: random.choice(words[-1000:])),
+        ("2 common terms", lambda: " ".join(random.sample(words[:50], 2))),
+        ("3 terms, mixed", lambda: " ".join(random.sample(words[:50], 2) + random.sample(words[100:1000], 1))),
+    ]
+    scan_queries = min(args.queries, args.scan_queries)  # quét tuyến tính rất chậm: chạy ít truy vấn hơn
+    print(f"{'query':>16} | {'index':>10} | {'linear scan':>12}")
+    for name, make_query in cases:
+        queries = [make_query() for _ in range(args.queries)]
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, limit=args.limit)
+        indexed = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        for query in queries[:scan_queries]:
+            expected = linear_search(corpus, query, args.limit)
+            assert index.search(query, limit=args.limit)[0] == expected, query
+        scanned = (time.perf_counter() - start) / scan_queries
+        print(f"{name:>16} | {indexed * 1e3:>7.3f} ms | {scanned * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
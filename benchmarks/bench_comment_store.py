@@ -0,0 +1,60 @@
+# Benchmark: bộ nhớ khi bị spam bình luận (list cũ vs CommentStore ring buffer) và
+# độ trễ GET /comments của A06 khi client polling: trả trang đầy đủ vs 304 (If-None-Match).
+# Chạy: python benchmarks/bench_comment_store.py [--writes 1000000] [--retention 10000]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comment_store import CommentStore
+
+
+def flood(store_append, writes, checkpoints):
+    """Ghi `writes` bình luận, trả về bộ nhớ (MB) đang dùng tại các mốc `checkpoints`."""
+    usage = []
+    tracemalloc.start()
+    for i in range(writes):
+        store_append(f"spam comment number {i:08d}")
+        if i + 1 in checkpoints:
+            usage.append(tracemalloc.get_traced_memory()[0] / 1e6)
+    tracemalloc.stop()
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writes", type=int, default=1_000_000)
+    parser.add_argument("--retention", type=int, default=10_000)
+    parser.add_argument("--polls", type=int, default=2_000)
+    args = parser.parse_args()
+
+    checkpoints = [args.writes // 4, args.writes // 2, args.writes * 3 // 4, args.writes]
+    print(f"memory during a flood of {args.writes} comments (MB at {checkpoints}):")
+    print(f"{'list':>14}: {['%.1f' % mb for mb in flood([].append, args.writes, checkpoints)]}")
+    store = CommentStore(args.retention)
+    print(f"{'CommentStore':>14}: {['%.1f' % mb for mb in flood(store.append, args.writes, checkpoints)]}")
+
+    os.environ["COMMENT_RETENTION"] = str(args.retention)
+    import A06
+    client = A06.app.test_client()
+    for i in range(args.retention):
+        A06.comments.append(f"comment {i}")
+
+    for limit in (100, 1000):
+        etag = client.get(f"/comments?limit={limit}").headers["ETag"]
+        start = time.perf_counter()
+        for _ in range(args.polls):
+            assert client.get(f"/comments?limit={limit}").status_code == 200
+        full = (time.perf_counter() - start) / args.polls
+        start = time.perf_counter()
+        for _ in range(args.polls):
+            assert client.get(f"/comments?limit={limit}", headers={"If-None-Match": etag}).status_code == 304
+        cached = (time.perf_counter() - start) / args.polls
+        print(f"GET /comments?limit={limit:<5}: 200 {full * 1e6:>7.0f} us | 304 {cached * 1e6:>7.0f} us")
+
+
+if __name__ == "__main__":
+    main()
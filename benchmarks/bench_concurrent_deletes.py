@@ -0,0 +1,124 @@
+# Stress test + benchmark: nhiều thread cùng xóa người dùng (các id trùng nhau giữa các thread).
+# - Kho: UserStore (get rồi remove, như A04 cũ) vs ConcurrentUserStore.pop
+# - HTTP: DELETE /delete/secure/<id>?confirm=yes của A04 (admin) qua test client, mỗi thread một session
+# Kiểm tra: mỗi id chỉ được xóa thành công đúng một lần, không có lỗi/500, hai chỉ mục rỗng ở cuối.
+# Chạy: python benchmarks/bench_concurrent_deletes.py [--users 5000] [--threads 16]
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_store import ConcurrentUserStore, UserStore
+
+
+def make_users(n, first_id=1):
+    return [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "is_admin": False}
+        for i in range(first_id, first_id + n)
+    ]
+
+
+def run_threads(threads, target):
+    workers = [threading.Thread(target=target, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start
+
+
+def stress_store(store, delete, n, threads):
+    """Mỗi thread cố xóa toàn bộ id theo thứ tự ngẫu nhiên riêng; trả về (đã xóa, lỗi, giây)."""
+    deleted = [0] * threads
+    errors = [0] * threads
+
+    def worker(t):
+        ids = list(range(1, n + 1))
+        random.shuffle(ids)
+        for user_id in ids:
+            try:
+                if delete(store, user_id):
+                    deleted[t] += 1
+            except ValueError:
+                errors[t] += 1
+
+    elapsed = run_threads(threads, worker)
+    return sum(deleted), sum(errors), elapsed
+
+
+def legacy_delete(store, user_id):
+    # Cách cũ của A04: tra cứu rồi remove, không có khóa
+    user = store.get_by_id(user_id)
+    if not user:
+        return False
+    store.remove(user)
+    return True
+
+
+def stress_http(n, threads):
+    import A04
+
+    A04.users = ConcurrentUserStore(make_users(n, first_id=10) + [
+        {"id": 1, "username": "root", "email": "root@example.com", "is_admin": True}
+    ])
+    ids = list(range(10, 10 + n))
+    statuses = [dict() for _ in range(threads)]
+    successes = [[] for _ in range(threads)]
+
+    def worker(t):
+        client = A04.app.test_client()
+        assert client.post("/login", json={"username": "root"}).status_code == 200
+        order = ids[:]
+        random.shuffle(order)
+        for user_id in order:
+            status = client.delete(f"/delete/secure/{user_id}?confirm=yes").status_code
+            statuses[t][status] = statuses[t].get(status, 0) + 1
+            if status == 200:
+                successes[t].append(user_id)
+
+    elapsed = run_threads(threads, worker)
+    totals = {}
+    for per_thread in statuses:
+        for status, count in per_thread.items():
+            totals[status] = totals.get(status, 0) + count
+    deleted = sorted(user_id for per_thread in successes for user_id in per_thread)
+    assert deleted == ids, "every user must be deleted exactly once"
+    assert set(totals) <= {200, 404}, f"unexpected statuses: {totals}"
+    assert len(A04.users) == 1 and A04.users.get_by_username("user10") is None
+    return totals, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    n, threads = args.users, args.threads
+    # Đổi thread thường xuyên hơn để lộ race condition
+    sys.setswitchinterval(1e-5)
+
+    print(f"users={n} threads={threads} delete attempts={n * threads}")
+    store = UserStore(make_users(n))
+    deleted, errors, elapsed = stress_store(store, legacy_delete, n, threads)
+    print(f"{'UserStore get+remove':>26}: deleted={deleted} ValueError={errors} "
+          f"{n * threads / elapsed:>9.0f} deletes/s")
+
+    store = ConcurrentUserStore(make_users(n))
+    deleted, errors, elapsed = stress_store(store, lambda s, user_id: s.pop(user_id) is not None, n, threads)
+    assert deleted == n and errors == 0, (deleted, errors)
+    assert len(store) == 0 and not store._by_username
+    print(f"{'ConcurrentUserStore.pop':>26}: deleted={deleted} ValueError={errors} "
+          f"{n * threads / elapsed:>9.0f} deletes/s")
+
+    totals, elapsed = stress_http(n, threads)
+    print(f"{'A04 DELETE /delete/secure':>26}: statuses={totals} {n * threads / elapsed:>9.0f} req/s")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
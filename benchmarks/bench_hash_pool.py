@@ -0,0 +1,66 @@
+# Benchmark: thông lượng bcrypt - băm inline vs HashingExecutor (process pool)
+# với 1, 4 và 16 client đồng thời (mỗi client là một thread, giống worker Flask).
+# Chạy: python benchmarks/bench_hash_pool.py [--rounds 10] [--per-client 8]
+import argparse
+import os
+import sys
+import threading
+import time
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hash_pool import HashingExecutor, HashingPoolSaturated
+
+
+def run_clients(clients, per_client, hash_fn):
+    rejected = [0]
+    lock = threading.Lock()
+
+    def client():
+        for i in range(per_client):
+            try:
+                hash_fn(f"password-{i}".encode())
+            except HashingPoolSaturated:
+                with lock:
+                    rejected[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return clients * per_client / elapsed, rejected[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--per-client", type=int, default=8)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    def inline(password):
+        return bcrypt.hashpw(password, bcrypt.gensalt(args.rounds))
+
+    # max_pending đủ lớn để đo thông lượng; giảm xuống để thấy 503 (rejected)
+    executor = HashingExecutor(max_workers=args.workers, max_pending=max(args.clients), rounds=args.rounds)
+    executor.hash_password(b"warmup")
+
+    print(f"cores={os.cpu_count()} workers={executor.max_workers} rounds={args.rounds}")
+    print(f"{'clients':>8} {'inline (hash/s)':>16} {'pooled (hash/s)':>16} {'rejected':>9}")
+    try:
+        for clients in args.clients:
+            inline_rate, _ = run_clients(clients, args.per_client, inline)
+            pooled_rate, rejected = run_clients(clients, args.per_client, executor.hash_password)
+            print(f"{clients:>8} {inline_rate:>16.1f} {pooled_rate:>16.1f} {rejected:>9}")
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
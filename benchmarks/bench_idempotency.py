@@ -0,0 +1,60 @@
+# Benchmark: DELETE /delete/secure/<id> của A04 với Idempotency-Key - lần đầu (chạy
+# kiểm tra quyền + xóa) so với các lần retry (trả response đã lưu), cùng hit rate và
+# kích thước cache khi số key vượt IDEMPOTENCY_CACHE_SIZE.
+# Chạy: python benchmarks/bench_idempotency.py [--users 20000] [--retries 3]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import A04
+from user_store import ConcurrentUserStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    A04.users = ConcurrentUserStore([
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "is_admin": False}
+        for i in range(10, 10 + args.users)
+    ] + [{"id": 1, "username": "root", "email": "root@example.com", "is_admin": True}])
+    client = A04.app.test_client()
+    client.post("/login", json={"username": "root"})
+    ids = range(10, 10 + args.users)
+
+    start = time.perf_counter()
+    for user_id in ids:
+        response = client.delete(f"/delete/secure/{user_id}?confirm=yes", headers={"Idempotency-Key": f"k{user_id}"})
+        assert response.status_code == 200
+    first = (time.perf_counter() - start) / args.users
+
+    # Retry ngay sau request đầu (entry còn trong cache)
+    recent = list(ids)[-min(args.users, A04.IDEMPOTENCY_CACHE_SIZE):]
+    start = time.perf_counter()
+    for _ in range(args.retries):
+        for user_id in recent:
+            response = client.delete(f"/delete/secure/{user_id}?confirm=yes", headers={"Idempotency-Key": f"k{user_id}"})
+            assert response.status_code == 200 and response.headers["Idempotent-Replayed"] == "true"
+    replay = (time.perf_counter() - start) / (args.retries * len(recent))
+
+    start = time.perf_counter()
+    for user_id in recent:
+        assert client.delete(f"/delete/secure/{user_id}?confirm=yes").status_code == 404
+    plain_retry = (time.perf_counter() - start) / len(recent)
+
+    stats = client.get("/idempotency/stats").get_json()
+    print(f"users={args.users} cache maxsize={stats['maxsize']}")
+    print(f"{'first delete':>22}: {first * 1e6:>8.1f} us/req")
+    print(f"{'retry (replayed)':>22}: {replay * 1e6:>8.1f} us/req")
+    print(f"{'retry without key':>22}: {plain_retry * 1e6:>8.1f} us/req (404)")
+    print(f"cache size={stats['size']} evictions={stats['evictions']} "
+          f"hit_rate={stats['hit_rate']:.1%} replayed={stats['replayed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Benchmark: bộ nhớ đỉnh khi liệt kê GET /users/secure (A02).
+# So sánh: dựng toàn bộ list rồi jsonify (cách cũ), một trang (?limit=),
+# và stream NDJSON toàn bộ (?format=ndjson).
+# Chạy: python benchmarks/bench_list_users.py [--sizes 10000 100000]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("BCRYPT_COST", "4")
+
+from flask import jsonify
+
+import A02
+
+FAKE_HASH = b"$2b$04$" + b"x" * 53
+
+
+def old_listing():
+    display_users = []
+    for user in A02.secure_users:
+        display_users.append({"username": user["username"], "password": user["password"].decode('utf-8')})
+    return jsonify(display_users).get_data()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    client = A02.app.test_client()
+
+    def one_page():
+        client.get("/users/secure?limit=100").get_data()
+
+    def stream_all():
+        response = client.get("/users/secure?format=ndjson")
+        for _ in response.response:  # Tiêu thụ từng dòng, không giữ lại
+            pass
+        response.close()
+
+    print(f"{'users':>8} {'full list MB':>13} {'page MB':>9} {'ndjson MB':>10} {'ndjson s':>9}")
+    for n in args.sizes:
+        A02.secure_users.clear()
+        A02.secure_users.extend({"username": f"user{i}", "password": FAKE_HASH} for i in range(n))
+        with A02.app.test_request_context():
+            full, _ = measure(old_listing)
+        page, _ = measure(one_page)
+        stream, stream_time = measure(stream_all)
+        print(f"{n:>8} {full:>13.2f} {page:>9.2f} {stream:>10.2f} {stream_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Benchmark: job migration plain text -> bcrypt (A02) trên fixture N người dùng.
+# Chạy với 1 worker và với tất cả core; thời gian nhiều core nên xấp xỉ
+# thời gian 1 core chia cho số core.
+# Chạy: python benchmarks/bench_migration.py [--users 100000] [--rounds 4]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_migration import PlaintextMigration
+
+
+def run(source, workers, rounds):
+    migrated = {}
+    job = PlaintextMigration(
+        source,
+        is_migrated=lambda username: username in migrated,
+        commit=migrated.__setitem__,
+        rounds=rounds,
+        workers=workers
+    )
+    start = time.perf_counter()
+    job.start()
+    while job.state == "running":
+        time.sleep(1)
+        status = job.status()
+        print(f"  workers={workers} {status['progress'] * 100:5.1f}% {status['users_per_s']:>9.1f} users/s", end="\r")
+    job.join()
+    elapsed = time.perf_counter() - start
+    print()
+    assert job.state == "done" and len(migrated) == len(source), job.status()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    source = [{"username": f"user{i}", "password": f"password{i}"} for i in range(args.users)]
+    single = run(source, 1, args.rounds)
+    parallel = run(source, args.workers, args.rounds)
+    print(f"users={args.users} rounds={args.rounds}")
+    print(f"1 worker:  {single:.2f}s")
+    print(f"{args.workers} workers: {parallel:.2f}s (ideal {single / args.workers:.2f}s, speedup {single / parallel:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
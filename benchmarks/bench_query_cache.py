@@ -0,0 +1,60 @@
+# Benchmark: workload username phân phối Zipf trên GET /search/secure và
+# GET /search/secure/fulltext (A03) - có và không có cache kết quả truy vấn.
+# Tra cứu chính xác trên chỉ mục UNIQUE vốn đã rẻ (~10us) nên lợi ích chủ yếu
+# thấy ở truy vấn full-text xếp hạng bm25.
+# Chạy trong thư mục tạm nên không đụng tới users.db của repo.
+# Chạy: python benchmarks/bench_query_cache.py [--rows 100000] [--requests 20000] [--zipf 1.1]
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent s")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    import A03
+
+    conn = sqlite3.connect(A03.DB_PATH)
+    conn.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(args.rows)))
+    conn.commit()
+
+    # Username thứ k được truy vấn với xác suất tỉ lệ 1/k^s
+    weights = [1 / (k ** args.zipf) for k in range(1, args.rows + 1)]
+    names = random.choices([f"user{i}" for i in range(args.rows)], weights=weights, k=args.requests)
+    client = A03.app.test_client()
+    cache = A03.query_cache
+
+    def run(path, param):
+        start = time.perf_counter()
+        for name in names:
+            client.get(f"{path}?{param}={name}")
+        return args.requests / (time.perf_counter() - start)
+
+    print(f"rows={args.rows} requests={args.requests} zipf s={args.zipf} distinct={len(set(names))}")
+    for path, param in (("/search/secure", "username"), ("/search/secure/fulltext", "q")):
+        A03.query_cache = None
+        uncached = run(path, param)
+        A03.query_cache = cache
+        cache.invalidate()
+        before = cache.stats()
+        cached = run(path, param)
+        after = cache.stats()
+        hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+        hit_rate = hits / max(1, hits + misses)
+        print(f"{path:>24}: no cache {uncached:>6.0f} req/s | cache {cached:>6.0f} req/s (hit rate {hit_rate:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# Benchmark: 1M IP khác nhau (mô phỏng IP giả mạo/tấn công phân tán) đi qua bộ đếm
+# đăng nhập của A07 - defaultdict(int) cũ vs SlidingWindowLimiter (giới hạn số key, LRU + TTL).
+# In bộ nhớ tại các mốc, thời gian mỗi lần kiểm tra, và kiểm tra IP bị chặn được mở lại sau cửa sổ.
+# Chạy: python benchmarks/bench_rate_limiter.py [--ips 1000000] [--max-keys 100000]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import SlidingWindowLimiter
+
+
+def ip(i):
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" if i < 1 << 24 else f"11.0.0.{i}"
+
+
+def flood_dict(ips, checkpoints):
+    attempts = defaultdict(int)
+    usage = []
+    for i, address in enumerate(ips, 1):
+        attempts[address] += 1
+        if i in checkpoints:
+            usage.append(tracemalloc.get_traced_memory()[0] / 1e6)
+    return usage
+
+
+def flood_limiter(limiter, ips, checkpoints):
+    usage = []
+    for i, address in enumerate(ips, 1):
+        limiter.hit(address)
+        if i in checkpoints:
+            usage.append(tracemalloc.get_traced_memory()[0] / 1e6)
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ips", type=int, default=1_000_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    args = parser.parse_args()
+
+    ips = [ip(i) for i in range(args.ips)]
+    checkpoints = {args.ips // 4, args.ips // 2, args.ips * 3 // 4, args.ips}
+    print(f"memory while {args.ips} distinct IPs each try once (MB at {sorted(checkpoints)}):")
+    for name, flood in (
+        ("defaultdict", lambda: flood_dict(ips, checkpoints)),
+        ("limiter", lambda: flood_limiter(SlidingWindowLimiter(5, 60, args.max_keys), ips, checkpoints)),
+    ):
+        tracemalloc.start()
+        usage = flood()
+        tracemalloc.stop()
+        print(f"{name:>12}: {['%.1f' % mb for mb in usage]}")
+
+    limiter = SlidingWindowLimiter(5, 60, args.max_keys)
+    start = time.perf_counter()
+    for address in ips:
+        limiter.hit(address)
+    elapsed = time.perf_counter() - start
+    print(f"limiter.hit: {elapsed / args.ips * 1e6:.2f} us/check, tracked={len(limiter)}, "
+          f"evictions={limiter.stats()['evictions']}")
+
+    # Một IP bị chặn sẽ được mở lại khi chậm lại (defaultdict cũ chặn vĩnh viễn)
+    now = [0.0]
+    limiter = SlidingWindowLimiter(5, 60, args.max_keys, clock=lambda: now[0])
+    results = [limiter.hit("203.0.113.7")[0] for _ in range(6)]
+    allowed, retry_after = limiter.hit("203.0.113.7")
+    now[0] += retry_after
+    print(f"6 attempts: {results}; blocked, retry after {retry_after}s -> "
+          f"allowed again: {limiter.hit('203.0.113.7')[0]}")
+
+
+if __name__ == "__main__":
+    main()
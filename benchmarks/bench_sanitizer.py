@@ -0,0 +1,93 @@
+# Benchmark: mã hóa bình luận trên corpus hỗn hợp (bình thường + payload XSS lặp lại) -
+# InputProcessorV1 (không xử lý), V2 kiểu cũ (tạo instance mỗi request + html.escape),
+# SanitizerEngine.sanitize (fast path + memo) và SanitizerEngine.sanitize_many (batch).
+# Chạy: python benchmarks/bench_sanitizer.py [--comments 200000] [--xss-ratio 0.2] [--batch 1000]
+import argparse
+import html
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sanitizer import SanitizerEngine
+
+XSS = [
+    "<script>alert('XSS')</script>", "<img src=x onerror=alert(1)>", "\"><svg/onload=alert(document.domain)>",
+    "<a href=\"javascript:alert(1)\">click</a>", "<iframe src=//evil.example></iframe>",
+    "'; alert(String.fromCharCode(88,83,83)); //", "<body onload=alert('x')>",
+]
+WORDS = "great post thanks for sharing this really helped me fix my build today nice work".split()
+
+
+class InputProcessorV1:
+    @staticmethod
+    def process_input(data):
+        return data
+
+
+class LegacyInputProcessorV2:
+    # InputProcessorV2 trước khi dùng SanitizerEngine
+    @staticmethod
+    def process_input(data):
+        return html.escape(data)
+
+
+def make_corpus(n, xss_ratio):
+    corpus = []
+    for _ in range(n):
+        if random.random() < xss_ratio:
+            corpus.append(random.choice(XSS))
+        else:
+            text = " ".join(random.choices(WORDS, k=random.randint(3, 20)))
+            if random.random() < 0.1:
+                text += " & more"  # Bình thường nhưng có ký tự đặc biệt
+            corpus.append(text)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=200_000)
+    parser.add_argument("--xss-ratio", type=float, default=0.2)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.comments, args.xss_ratio)
+    expected = [html.escape(text) for text in corpus]
+
+    def per_request(processor_class):
+        def run():
+            return [processor_class().process_input(text) for text in corpus]
+        return run
+
+    engine = SanitizerEngine()
+
+    def engine_single():
+        return [engine.sanitize(text) for text in corpus]
+
+    def engine_batch():
+        out = []
+        for i in range(0, len(corpus), args.batch):
+            out.extend(engine.sanitize_many(corpus[i:i + args.batch]))
+        return out
+
+    print(f"comments={args.comments} xss ratio={args.xss_ratio} batch={args.batch}")
+    for name, run, check in (
+        ("V1 (no escaping)", per_request(InputProcessorV1), False),
+        ("V2 (new instance + html.escape)", per_request(LegacyInputProcessorV2), True),
+        ("engine.sanitize", engine_single, True),
+        ("engine.sanitize_many", engine_batch, True),
+    ):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if check:
+            assert result == expected, name
+        print(f"{name:>34}: {elapsed / args.comments * 1e9:>7.0f} ns/comment")
+    print(f"engine stats: {engine.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Microbenchmark: chi phí thêm header bảo mật cho mỗi response - helper
+# add_security_headers() cũ của A05 so với middleware SecurityHeaders (bộ header
+# tính sẵn, có/không có CSP nonce), đo trực tiếp trên đối tượng Response.
+# Chạy: python benchmarks/bench_security_headers.py [--responses 200000]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, g
+
+from security_headers import SecurityHeaders
+
+
+def add_security_headers(response):
+    # Helper cũ trong A05.py, gọi tay ở từng nhánh của user_secure
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["X-Frame-Options"] = "DENY"
+    response.headers["Content-Security-Policy"] = "default-src 'self'"
+    return response
+
+
+def time_per_response(apply, n):
+    responses = [Response("{}", mimetype="application/json") for _ in range(n)]
+    start = time.perf_counter()
+    for response in responses:
+        apply(response)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.responses
+
+    app = Flask(__name__)
+    headers = SecurityHeaders(app)
+
+    @app.route("/plain")
+    def plain():
+        return ""
+
+    @app.route("/nonce")
+    @headers.override({"Content-Security-Policy": "default-src 'self'; script-src 'nonce-{nonce}'"})
+    def with_nonce():
+        return ""
+
+    @app.route("/exempt")
+    @headers.exempt
+    def exempt():
+        return ""
+
+    print(f"responses={n}")
+    print(f"{'add_security_headers()':>28}: {time_per_response(add_security_headers, n):>6.2f} us/response")
+    for path in ("/plain", "/nonce", "/exempt"):
+        with app.test_request_context(path):
+            headers._apply(Response())  # Tính và lưu bộ header của endpoint
+            if path == "/nonce":
+                # Nonce được giữ trong g theo request: xóa đi để mỗi response lấy nonce mới
+                def apply(response):
+                    g.pop("csp_nonce", None)
+                    headers._apply(response)
+            else:
+                apply = headers._apply
+            us = time_per_response(apply, n)
+        print(f"{'SecurityHeaders ' + path:>28}: {us:>6.2f} us/response")
+
+    pool = headers.nonce_pool
+    start = time.perf_counter()
+    for _ in range(n):
+        pool.get()
+    print(f"{'nonce from pool':>28}: {(time.perf_counter() - start) / n * 1e6:>6.2f} us/nonce")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Benchmark: giới hạn đăng nhập khi chạy nhiều worker (process) - mỗi worker có bộ đếm riêng
+# (SlidingWindowLimiter trong RAM) vs dùng chung SQLiteThrottle (THROTTLE_DB); *-log là bản đếm chính xác
+# (SlidingLogLimiter / SQLiteLogThrottle, dùng cho A09).
+# Các worker cùng brute force một IP: đếm tổng số lần được cho qua; và độ trễ mỗi lần kiểm tra
+# (được phép / bị chặn / peek) khi các worker chạy đồng thời.
+# Chạy: python benchmarks/bench_shared_throttle.py [--workers 4] [--limit 5] [--path /dev/shm/bench_throttle.db]
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import SlidingLogLimiter, SlidingWindowLimiter
+from shared_throttle import SQLiteLogThrottle, SQLiteThrottle
+
+BACKENDS = {
+    "memory": lambda path, limit: SlidingWindowLimiter(limit, 60, 100_000),
+    "sqlite": lambda path, limit: SQLiteThrottle(path, "bench", limit, 60, 100_000),
+    "memory-log": lambda path, limit: SlidingLogLimiter(limit, 60, 100_000),
+    "sqlite-log": lambda path, limit: SQLiteLogThrottle(path, "bench", limit, 60, 100_000),
+}
+
+
+def make_limiter(backend, path, limit):
+    return BACKENDS[backend](path, limit)
+
+
+def brute_force(backend, path, limit, attempts, barrier, results):
+    limiter = make_limiter(backend, path, limit)
+    barrier.wait()
+    results.put(sum(limiter.hit("203.0.113.7")[0] for _ in range(attempts)))
+
+
+def latency(backend, path, worker, checks, barrier, results):
+    limiter = make_limiter(backend, path, 5)
+    keys = [f"10.{worker}.{i >> 8 & 255}.{i & 255}" for i in range(checks)]
+    barrier.wait()
+    timings = {}
+
+    def timed(name, check, repeat=1):
+        wall, cpu = time.perf_counter(), time.process_time()
+        for key in keys:
+            for _ in range(repeat):
+                check(key)
+        timings[name] = ((time.perf_counter() - wall) / repeat, (time.process_time() - cpu) / repeat)
+
+    timed("hit (allowed)", limiter.hit)     # IP mới: được phép, có ghi
+    timed("4 more hits", limiter.hit, repeat=4)
+    timed("hit (denied)", limiter.hit)      # đã đủ 5 lần: bị chặn, chỉ đọc
+    timed("peek", limiter.peek)
+    results.put({name: (wall / checks, cpu / checks) for name, (wall, cpu) in timings.items()})
+
+
+def run(target, workers, args):
+    ctx = multiprocessing.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    processes = [ctx.Process(target=target, args=(*args(worker), barrier, results)) for worker in range(workers)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--attempts", type=int, default=1000)
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--path", default="/dev/shm/bench_throttle.db" if os.path.isdir("/dev/shm")
+                        else "bench_throttle.db")
+    args = parser.parse_args()
+
+    def remove_db():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.path + suffix):
+                os.remove(args.path + suffix)
+
+    print(f"{args.workers} workers x {args.attempts} attempts from one IP, limit {args.limit}:")
+    for backend in BACKENDS:
+        remove_db()
+        allowed = run(brute_force, args.workers, lambda worker: (backend, args.path, args.limit, args.attempts))
+        print(f"{backend:>10}: allowed {sum(allowed)} in total (per worker {allowed})")
+
+    # wall: độ trễ thấy được (gồm chờ CPU/khóa khi các worker chạy cùng lúc); cpu: chi phí thật của lần kiểm tra
+    print(f"per-check latency with {args.workers} workers running concurrently (wall / cpu):")
+    for backend in BACKENDS:
+        remove_db()
+        timings = run(latency, args.workers, lambda worker: (backend, args.path, worker, args.checks))
+        summary = ", ".join(
+            f"{name} {sum(t[name][0] for t in timings) / len(timings) * 1e6:.1f}"
+            f" / {sum(t[name][1] for t in timings) / len(timings) * 1e6:.1f} us" for name in timings[0])
+        print(f"{backend:>10}: {summary}")
+    remove_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Benchmark: sqli_fingerprint.detect trên một corpus đầu vào bình thường và hai corpus tấn công:
+# ATTACKS là biến thể của SEED_PAYLOADS (đổi hoa/thường, số, khoảng trắng, comment /**/);
+# HELDOUT_ATTACKS là payload không dựa trên mẫu nào trong SEED_PAYLOADS (kiểm tra văn phạm).
+# In ra tỉ lệ phát hiện, tỉ lệ báo nhầm và thời gian mỗi lần kiểm tra (không memo / có memo).
+# Chạy: python benchmarks/bench_sqli_fingerprint.py [--repeat 20]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqli_fingerprint
+from sqli_fingerprint import detect
+
+BENIGN = [
+    "alice", "bob", "charlie", "user12345", "john.doe", "jane_doe99", "alice@example.com",
+    "bob+news@mail.example.org", "o'brien", "O'Reilly", "D'Angelo", "Ma'at", "don't stop",
+    "rock and roll", "salt or pepper", "select committee", "union station", "drop zone",
+    "hello world", "x-ray (1999)", "a,b;c", "Tom \"Tiger\" Woods", "1=1", "AT&T", "50% off",
+    "C++ / C#", "what's up?", "it's 5 o'clock", "mary-jane", "nguyen van a", "Lê Thị B",
+    "update me", "insert coin", "order by price", "from here to there", "and then",
+    "1 + 1", "3.14", "-42", "null", "true", "email me: a@b.c", "#hashtag", "--",
+    "the 'quoted' word", "\"double\" quoted", "path/to/file.txt", "[brackets]", "`ticks`",
+    "Rock 'n' roll", "Guns N' Roses", "'Allo 'Allo!", "L'Oréal", "can't; won't", "Jack & Jill",
+    "cats and dogs; birds or fish", "pick one (or two)", "SELECT * is bad practice", "don't drop it",
+    "'quoted' and 'more'", "o'neil or o'hara", "she said 'hi' -- then left", "1;2;3", "v1.2.3-beta",
+    "#1 fan; #2 fan", "x = y", "(555) 123-4567", "a' b' c'", "union of sets: A ∪ B",
+]
+
+ATTACKS = [
+    "' or '1'='1", "' OR 'abc'='abc", "'  OR  2=2  --", "' oR 7=7#", "'/**/OR/**/1=1--",
+    "' OR 'z'='z'--", "' or 1=1 -- -", "' OR 99=99/*", "' OR '' = '", "' OR 5", "' or true #",
+    "' OR email IS NOT NULL--", "' OR username LIKE 'a%", "' OR 3=3 LIMIT 5--", "root'--",
+    "root' #", "administrator'/*", "' UNION ALL SELECT 1,2,3--", "' union select null,null,null--",
+    "' UNION SELECT id, username, email FROM users--", "' UNION SELECT sql, name, 0 FROM sqlite_master--",
+    "' AND 0=1 UNION SELECT 4,5,6--", "'; drop table users; --", "'; DELETE FROM users --",
+    "'; update users set username='pwned' --", "' AND 2=2--", "' AND 'q'='q",
+    "' AND substr(email,2,1)='l", "' AND (SELECT count(*) FROM users)>1--", "' AND length(email)>5--",
+    "' OR sleep(10)--", "' and randomblob(500000000)--", "' OR load_extension('evil')--",
+    "') or ('x'='x", "') OR 2=2--", "')) or (('a'='a", "') UNION SELECT 7,8,9--", "' || '2'='2",
+    "' OR 3 IN (3)--", "' OR 5>4--", "' OR 1 BETWEEN 1 AND 9--", "' ORDER BY 3--", "' GROUP BY 2--",
+    "\" or \"a\"=\"a", "\" OR 4=4--", "root\"--", "\" UNION SELECT 4,5,6--",
+    "2 or 2=2", "5 OR 5=5--", "1 and 1=0", "7 UNION SELECT 1,2,3--", "3; drop table users",
+    "4) or (4=4", "1 AND sleep(3)", "1 OR -1=-1", "' OR -1=-1--", "' OR NOT 1=2--",
+]
+
+# Payload không dựa trên mẫu nào của SEED_PAYLOADS
+HELDOUT_ATTACKS = [
+    "'; SELECT * FROM users--", "' UNION SELECT @@version--", "x' or 'y", "1;SELECT 1",
+    "'+(SELECT 1)+'", "'||(SELECT sqlite_version())||'", "' AND 1 IN (SELECT 1)--",
+    "' OR EXISTS(SELECT 1)--", "' OR username=username--", "' OR rowid>0--", "1 UNION SELECT NULL--",
+    "-1 UNION SELECT 1,2--", "1) UNION SELECT 1--", "1 OR 'a'='a'", "1 OR 1", "\" OR \"\"=\"",
+    "'; PRAGMA table_info(users)--", "'; VACUUM INTO '/tmp/x'--", "' OR '1'",
+    "' UNION SELECT group_concat(name) FROM sqlite_master--", "admin' AND password LIKE 'a%'--",
+    "abc' AND 1=(SELECT 1)--", "1' ORDER BY 10--", "' AND (SELECT substr(sql,1,1) FROM sqlite_master)='C",
+    "' OR typeof(1)='integer", "x') AND 1=1 AND ('a'='a", "'; CREATE TABLE t(x)--", "' OR ?=?--",
+    "1 AND 1 LIKE 1", "' UNION SELECT 1 FROM (SELECT 1)--",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    false_positives = [b for b in BENIGN if detect(b)]
+    print(f"fingerprints={len(sqli_fingerprint.FINGERPRINTS)}")
+    for name, attacks in (("seed variants", ATTACKS), ("held-out", HELDOUT_ATTACKS)):
+        detected = [a for a in attacks if detect(a)]
+        print(f"detection rate ({name}): {len(detected)}/{len(attacks)} ({len(detected) / len(attacks):.1%})")
+        for a in attacks:
+            if a not in detected:
+                print(f"  missed: {a!r} ({sqli_fingerprint.fingerprint(a, sqli_fingerprint._seed_context(a))})")
+    print(f"false positives: {len(false_positives)}/{len(BENIGN)} ({len(false_positives) / len(BENIGN):.1%})")
+    for b in false_positives:
+        print(f"  flagged: {b!r} ({detect(b)})")
+
+    corpus = BENIGN + ATTACKS + HELDOUT_ATTACKS
+    # Không memo: mỗi chuỗi mới (thêm hậu tố ngẫu nhiên vào sau) để không trúng cache
+    unique = [s + " " + str(random.random()) for s in corpus * args.repeat]
+    start = time.perf_counter()
+    for s in unique:
+        detect.__wrapped__(s)
+    cold = (time.perf_counter() - start) / len(unique) * 1e6
+
+    warm_inputs = corpus * args.repeat
+    for s in corpus:
+        detect(s)
+    start = time.perf_counter()
+    for s in warm_inputs:
+        detect(s)
+    warm = (time.perf_counter() - start) / len(warm_inputs) * 1e6
+
+    safe = ["user%d" % i for i in range(len(unique))]
+    start = time.perf_counter()
+    for s in safe:
+        detect.__wrapped__(s)
+    fast = (time.perf_counter() - start) / len(safe) * 1e6
+
+    print(f"{'mode':>22} | {'us/check':>8} | {'checks/s':>10}")
+    for name, us in (("tokenize (no memo)", cold), ("memo hit", warm), ("safe-charset fast path", fast)):
+        print(f"{name:>22} | {us:>8.2f} | {1e6 / us:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
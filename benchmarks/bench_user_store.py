@@ -0,0 +1,58 @@
+# Benchmark: tra cứu người dùng theo id/username - duyệt list vs UserStore.
+# Chạy: python benchmarks/bench_user_store.py [--sizes 1000 10000 100000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_store import UserStore
+
+
+def make_users(n):
+    return [
+        {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "is_admin": False}
+        for i in range(1, n + 1)
+    ]
+
+
+def linear_get_user_by_id(users, user_id):
+    # Cách cũ trong A01/A04/A05
+    for user in users:
+        if user["id"] == user_id:
+            return user
+    return None
+
+
+def time_lookups(fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'list scan (us)':>16} {'store by id (us)':>18} {'store by name (us)':>20}")
+    for n in args.sizes:
+        records = make_users(n)
+        store = UserStore(records)
+        ids = [random.randint(1, n) for _ in range(args.lookups)]
+        names = [f"user{i}" for i in ids]
+
+        # Duyệt tuyến tính chậm, giảm số lần tra cứu để benchmark không quá lâu
+        scan_keys = ids[: max(10, args.lookups * 1_000 // n)]
+        scan = time_lookups(lambda k: linear_get_user_by_id(records, k), scan_keys)
+        by_id = time_lookups(store.get_by_id, ids)
+        by_name = time_lookups(store.get_by_username, names)
+        print(f"{n:>10} {scan * 1e6:>16.2f} {by_id * 1e6:>18.3f} {by_name * 1e6:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# Kiểm tra mật khẩu có nằm trong danh sách bị lộ (kiểu dump HIBP) hay không.
+# File dữ liệu là các SHA-1 digest (20 byte) đã sắp xếp, được mmap và tìm nhị phân
+# nên không cần nạp vào RAM; có thể kèm Bloom filter (.bloom) để loại nhanh
+# các mật khẩu chắc chắn không có trong danh sách.
+#
+# Tạo file từ dump dạng text ("SHA1HEX:count" mỗi dòng, hoặc plain text với --plaintext):
+#   python breach_check.py build pwned-passwords-sha1.txt breached.bin --bloom
+import argparse
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+
+DIGEST_SIZE = 20
+HEADER = struct.Struct("<8sQ")           # magic, số digest
+BLOOM_HEADER = struct.Struct("<8sQI")    # magic, số bit, số hàm băm
+MAGIC = b"PWNDSHA1"
+BLOOM_MAGIC = b"PWNDBLM1"
+
+
+def _bloom_positions(digest, m_bits, k):
+    # Double hashing trên chính SHA-1 digest (đã phân bố đều), không cần băm thêm
+    h1 = int.from_bytes(digest[0:8], "little")
+    h2 = int.from_bytes(digest[8:16], "little") | 1
+    return [(h1 + i * h2) % m_bits for i in range(k)]
+
+
+class BreachedPasswordIndex:
+    """Tra cứu digest trong file đã sắp xếp qua mmap (O(log n), RSS nhỏ)."""
+
+    def __init__(self, path, use_bloom=True):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or len(self._mm) != HEADER.size + self.count * DIGEST_SIZE:
+            raise ValueError(f"Not a breached-password index: {path}")
+
+        self._bloom = None
+        bloom_path = path + ".bloom"
+        if use_bloom and os.path.exists(bloom_path):
+            self._bloom_file = open(bloom_path, "rb")
+            self._bloom = mmap.mmap(self._bloom_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._m_bits, self._k = BLOOM_HEADER.unpack_from(self._bloom, 0)
+            if magic != BLOOM_MAGIC:
+                raise ValueError(f"Not a breached-password bloom filter: {bloom_path}")
+
+    def _maybe_contains(self, digest):
+        if self._bloom is None:
+            return True
+        base = BLOOM_HEADER.size
+        for pos in _bloom_positions(digest, self._m_bits, self._k):
+            if not self._bloom[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def contains_digest(self, digest):
+        if not self._maybe_contains(digest):
+            return False
+        mm = self._mm
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * DIGEST_SIZE
+            current = mm[offset:offset + DIGEST_SIZE]
+            if current < digest:
+                lo = mid + 1
+            elif current > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def is_breached(self, password):
+        return self.contains_digest(hashlib.sha1(password.encode('utf-8')).digest())
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom_file.close()
+
+
+# ---- Công cụ tạo file ----
+
+def _parse_line(line, plaintext):
+    line = line.rstrip("\r\n")
+    if not line:
+        return None
+    if plaintext:
+        return hashlib.sha1(line.encode('utf-8')).digest()
+    hex_digest = line.split(":", 1)[0].strip()
+    if len(hex_digest) != DIGEST_SIZE * 2:
+        return None
+    try:
+        return bytes.fromhex(hex_digest)
+    except ValueError:
+        return None
+
+
+def _write_run(digests, tmp_dir):
+    digests.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(digests))
+    return path
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            digest = f.read(DIGEST_SIZE)
+            if not digest:
+                return
+            yield digest
+
+
+def build_index(input_path, output_path, plaintext=False, chunk_size=5_000_000, tmp_dir=None):
+    """
+    Sắp xếp ngoài (external sort): chia dump thành các run đã sắp xếp,
+    rồi merge và loại trùng khi ghi file kết quả. Trả về số digest đã ghi.
+    """
+    runs = []
+    try:
+        chunk = []
+        with open(input_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                digest = _parse_line(line, plaintext)
+                if digest is not None:
+                    chunk.append(digest)
+                if len(chunk) >= chunk_size:
+                    runs.append(_write_run(chunk, tmp_dir))
+                    chunk = []
+        if chunk:
+            runs.append(_write_run(chunk, tmp_dir))
+
+        count = 0
+        previous = None
+        with open(output_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, 0))
+            for digest in heapq.merge(*(_read_run(path) for path in runs)):
+                if digest != previous:
+                    out.write(digest)
+                    count += 1
+                    previous = digest
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, count))
+        return count
+    finally:
+        for path in runs:
+            os.remove(path)
+
+
+def build_bloom(index_path, false_positive_rate=0.01):
+    """Tạo <index_path>.bloom từ file index đã build."""
+    with open(index_path, "rb") as f:
+        magic, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a breached-password index: {index_path}")
+        m_bits = max(8, int(-count * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        k = max(1, round(m_bits / max(count, 1) * math.log(2)))
+        bits = bytearray((m_bits + 7) // 8)
+        while True:
+            block = f.read(DIGEST_SIZE * 65536)
+            if not block:
+                break
+            for offset in range(0, len(block), DIGEST_SIZE):
+                for pos in _bloom_positions(block[offset:offset + DIGEST_SIZE], m_bits, k):
+                    bits[pos >> 3] |= 1 << (pos & 7)
+    with open(index_path + ".bloom", "wb") as out:
+        out.write(BLOOM_HEADER.pack(BLOOM_MAGIC, m_bits, k))
+        out.write(bits)
+    return m_bits, k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breached-password index tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="convert a text dump into a sorted binary index")
+    build.add_argument("input")
+    build.add_argument("output")
+    build.add_argument("--plaintext", action="store_true", help="input lines are passwords, not SHA-1 hex")
+    build.add_argument("--bloom", action="store_true", help="also write <output>.bloom")
+    build.add_argument("--bloom-fp", type=float, default=0.01)
+    build.add_argument("--chunk-size", type=int, default=5_000_000)
+    check = sub.add_parser("check", help="check passwords against an index")
+    check.add_argument("index")
+    check.add_argument("passwords", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.input, args.output, args.plaintext, args.chunk_size)
+        print(f"Wrote {count} digests to {args.output}")
+        if args.bloom:
+            m_bits, k = build_bloom(args.output, args.bloom_fp)
+            print(f"Wrote bloom filter ({m_bits} bits, k={k}) to {args.output}.bloom")
+    else:
+        index = BreachedPasswordIndex(args.index)
+        for password in args.passwords:
+            print(f"{password}: {'BREACHED' if index.is_breached(password) else 'ok'}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
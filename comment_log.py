@@ -0,0 +1,149 @@
+# Kho bình luận lưu trên đĩa (A06): file log chỉ ghi nối (append-only), mỗi bình luận là
+# một bản ghi [độ dài 4 byte little-endian][JSON UTF-8]. Trong RAM chỉ giữ chỉ mục offset
+# (8 byte/bình luận), nội dung được đọc thẳng từ vùng nhớ mmap của file khi cần.
+# Khi khởi động chỉ quét các tiền tố độ dài để dựng lại chỉ mục, không parse nội dung.
+# Cùng giao diện với CommentStore (seq = thứ tự bản ghi trong file, không bao giờ bị ghi đè).
+# Giả định chỉ một process ghi vào file (nhiều thread thì được).
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+MAGIC = b"CLOG\x00\x00\x00\x01"
+HEADER_SIZE = len(MAGIC) + 8  # MAGIC + id ngẫu nhiên của file (dùng làm epoch cho ETag)
+_LENGTH = struct.Struct("<I")
+
+
+class CommentLog:
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        self._lock = threading.Lock()
+        self._map = None
+        self._mapped_size = 0
+        try:
+            size = os.fstat(self._fd).st_size
+            if size == 0:
+                self._write(MAGIC + os.urandom(8))
+                size = HEADER_SIZE
+            self._offsets = array("Q")  # offset bắt đầu của từng bản ghi, chỉ số = seq
+            self._end = self._rebuild_index(size)
+        except BaseException:
+            self.close()
+            raise
+
+    def _rebuild_index(self, size):
+        """Dựng lại chỉ mục offset, cắt bỏ bản ghi ghi dở ở cuối file (nếu lần trước bị dừng giữa chừng)."""
+        self._remap(size)
+        if size < HEADER_SIZE or self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a comment log")
+        self.epoch = self._map[len(MAGIC):HEADER_SIZE].hex()
+        offsets, unpack_from, data = self._offsets, _LENGTH.unpack_from, self._map
+        position = HEADER_SIZE
+        while position + 4 <= size:
+            end = position + 4 + unpack_from(data, position)[0]
+            if end > size:
+                break
+            offsets.append(position)
+            position = end
+        if position < size:
+            self._unmap()
+            os.ftruncate(self._fd, position)
+            self._remap(position)
+        return position
+
+    def _remap(self, size):
+        self._unmap()
+        if size:
+            self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    @staticmethod
+    def _encode(comment):
+        data = json.dumps(comment, ensure_ascii=False).encode()
+        return _LENGTH.pack(len(data)) + data
+
+    def append(self, comment):
+        """Ghi bình luận vào cuối log, trả về seq của nó."""
+        record = self._encode(comment)
+        with self._lock:
+            self._write(record)
+            seq = len(self._offsets)
+            self._offsets.append(self._end)
+            self._end += len(record)
+        return seq
+
+    def extend(self, comments):
+        """Ghi nhiều bình luận trong một lần write, trả về seq của bình luận đầu tiên."""
+        records = [self._encode(comment) for comment in comments]
+        with self._lock:
+            self._write(b"".join(records))
+            first = len(self._offsets)
+            for record in records:
+                self._offsets.append(self._end)
+                self._end += len(record)
+        return first
+
+    @property
+    def first_seq(self):
+        return 0
+
+    @property
+    def next_seq(self):
+        return len(self._offsets)
+
+    def bounds(self, position, limit):
+        next_seq = len(self._offsets)
+        start = min(position, next_seq)
+        stop = min(start + limit, next_seq)
+        return start, stop, stop < next_seq
+
+    def etag(self, start, stop, has_more):
+        return f"{self.epoch}-{start}-{stop}-{int(has_more)}"
+
+    def _read(self, seq, count):
+        # Gọi khi đang giữ khóa; map lại file nếu có bản ghi mới nằm ngoài vùng đã map
+        if self._end > self._mapped_size:
+            self._remap(self._end)
+        offsets, data, end = self._offsets, self._map, self._end
+        stops = offsets[seq + 1:seq + count + 1]
+        if len(stops) < count:
+            stops.append(end)
+        return [json.loads(data[start + 4:stop]) for start, stop in zip(offsets[seq:seq + count], stops)]
+
+    def page(self, position, limit):
+        """Trả về (start, stop, has_more, list bình luận), chỉ đọc các bản ghi của trang từ mmap."""
+        with self._lock:
+            start, stop, has_more = self.bounds(position, limit)
+            comments = self._read(start, stop - start) if stop > start else []
+        return start, stop, has_more, comments
+
+    def get(self, seq):
+        """Bình luận có số thứ tự `seq`, hoặc None nếu chưa tồn tại."""
+        with self._lock:
+            if 0 <= seq < len(self._offsets):
+                return self._read(seq, 1)[0]
+        return None
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __len__(self):
+        return len(self._offsets)
@@ -0,0 +1,75 @@
+# Kho bình luận có giới hạn dung lượng (A06): ring buffer giữ `capacity` bình luận
+# mới nhất, bình luận cũ hơn bị ghi đè nên bộ nhớ không tăng dù bị spam liên tục.
+# Mỗi bình luận có số thứ tự (seq) tăng dần, không bao giờ dùng lại: seq vừa là vị trí
+# cho cursor phân trang, vừa cho biết nội dung một trang có thay đổi hay không (ETag).
+import os
+import threading
+
+
+class CommentStore:
+
+    def __init__(self, capacity=10_000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        # seq bắt đầu lại từ 0 sau mỗi lần khởi động: thêm epoch vào ETag để không trùng
+        self.epoch = os.urandom(4).hex()
+        self._buffer = [None] * capacity
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, comment):
+        """Thêm bình luận, trả về seq của nó (ghi đè bình luận cũ nhất nếu đã đầy)."""
+        with self._lock:
+            seq = self._next_seq
+            self._buffer[seq % self.capacity] = comment
+            self._next_seq = seq + 1
+        return seq
+
+    def extend(self, comments):
+        """Thêm nhiều bình luận dưới một lần khóa, trả về seq của bình luận đầu tiên."""
+        with self._lock:
+            first = self._next_seq
+            for seq, comment in enumerate(comments, first):
+                self._buffer[seq % self.capacity] = comment
+            self._next_seq = first + len(comments)
+        return first
+
+    @property
+    def first_seq(self):
+        """seq của bình luận cũ nhất còn giữ."""
+        return max(0, self._next_seq - self.capacity)
+
+    @property
+    def next_seq(self):
+        return self._next_seq
+
+    def bounds(self, position, limit):
+        """
+        (start, stop, còn trang sau hay không) của trang bắt đầu từ seq `position`.
+        Nội dung trang chỉ phụ thuộc vào bộ ba này nên có thể dùng làm ETag mà không cần đọc dữ liệu.
+        """
+        next_seq = self._next_seq
+        start = min(max(position, next_seq - self.capacity, 0), next_seq)
+        stop = min(start + limit, next_seq)
+        return start, stop, stop < next_seq
+
+    def etag(self, start, stop, has_more):
+        return f"{self.epoch}-{start}-{stop}-{int(has_more)}"
+
+    def page(self, position, limit):
+        """Trả về (start, stop, has_more, list bình luận) của trang, đọc nhất quán dưới khóa."""
+        with self._lock:
+            start, stop, has_more = self.bounds(position, limit)
+            comments = [self._buffer[seq % self.capacity] for seq in range(start, stop)]
+        return start, stop, has_more, comments
+
+    def get(self, seq):
+        """Bình luận có số thứ tự `seq`, hoặc None nếu đã bị ghi đè/chưa tồn tại."""
+        with self._lock:
+            if self.first_seq <= seq < self._next_seq:
+                return self._buffer[seq % self.capacity]
+        return None
+
+    def __len__(self):
+        return self._next_seq - self.first_seq
@@ -0,0 +1,144 @@
+# Pool kết nối SQLite có giới hạn: kết nối được mượn (checkout) rồi trả lại pool.
+# Thay cho việc sqlite3.connect()/close() ở mỗi request: kết nối đã cấu hình sẵn pragma
+# (WAL, cache, mmap) được dùng lại, và số kết nối mở không vượt quá max_size dù server
+# tạo một thread mới cho mỗi request (như server mặc định của Werkzeug).
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from flask import g
+
+# Pragma áp dụng cho mọi kết nối
+CONNECTION_PRAGMAS = {
+    "synchronous": "NORMAL",    # Đủ an toàn với WAL, ít fsync hơn FULL
+    "cache_size": -16000,       # ~16MB page cache cho mỗi kết nối
+    "mmap_size": 268435456,     # Đọc qua mmap tối đa 256MB
+    "temp_store": "MEMORY",
+}
+
+
+def enable_wal(path):
+    """Bật WAL cho file database (lưu trong file, chỉ cần làm một lần)."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+
+class SQLiteConnectionPool:
+    """
+    Tối đa max_size kết nối tới `path`, tạo khi cần; kết nối rảnh được dùng lại theo LIFO.
+    - connection(): kết nối của app context hiện tại, trả lại pool khi app context kết thúc
+      (cần gọi init_app(app) một lần)
+    - checkout(): context manager mượn một kết nối ngoài Flask (ví dụ benchmark, thread nền)
+    Khi mọi kết nối đều đang được mượn, chờ tối đa `timeout` giây rồi ném sqlite3.OperationalError.
+    readonly=True mở kết nối chỉ đọc (mode=ro + query_only), dùng cho các route tìm kiếm.
+    autocommit=True: mỗi câu lệnh là một transaction riêng (isolation_level=None),
+    khóa ghi chỉ bị giữ trong lúc chạy câu lệnh.
+    """
+
+    def __init__(self, path, readonly=False, pragmas=None, autocommit=False, max_size=16, timeout=5.0):
+        self.path = path
+        self.readonly = readonly
+        self.autocommit = autocommit
+        self.pragmas = dict(CONNECTION_PRAGMAS, **(pragmas or {}))
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._size = 0          # Số kết nối đang mở (rảnh + đang được mượn)
+        self._in_use = set()
+        self._retired = set()   # Đang được mượn lúc close_all(): đóng khi được trả lại
+        self._lock = threading.Lock()
+        self._g_key = f"_db_pool_{id(self)}"
+
+    def _open(self):
+        if self.readonly:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.autocommit:
+            conn.isolation_level = None
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def acquire(self):
+        """Mượn một kết nối; phải trả lại bằng release()."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._size < self.max_size
+                if can_open:
+                    self._size += 1
+            if not can_open:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("connection pool exhausted") from None
+            else:
+                try:
+                    conn = self._open()
+                except BaseException:
+                    with self._lock:
+                        self._size -= 1
+                    raise
+        with self._lock:
+            self._in_use.add(conn)
+        return conn
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()  # Không để transaction dở dang (và khóa) sang lần mượn sau
+        with self._lock:
+            self._in_use.discard(conn)
+            retired = conn in self._retired
+            if retired:
+                self._retired.discard(conn)
+                self._size -= 1
+        if retired:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def checkout(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def init_app(self, app):
+        """Trả kết nối mà request đã dùng về pool khi app context kết thúc."""
+        @app.teardown_appcontext
+        def release_connection(exception=None):
+            conn = g.pop(self._g_key, None)
+            if conn is not None:
+                self.release(conn)
+
+    def connection(self):
+        conn = g.get(self._g_key)
+        if conn is None:
+            conn = self.acquire()
+            setattr(g, self._g_key, conn)
+        return conn
+
+    def stats(self):
+        return {"open": self._size, "in_use": len(self._in_use), "max_size": self.max_size}
+
+    def close_all(self):
+        """Đóng mọi kết nối (ví dụ khi tắt app hoặc khi file database bị thay)."""
+        with self._lock:
+            self._retired.update(self._in_use)
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._size -= 1
@@ -0,0 +1,120 @@
+# Thực thi bcrypt trong process pool để không chiếm worker Flask.
+# bcrypt.hashpw/checkpw tốn ~250ms ở cost mặc định; chạy inline thì mỗi lần
+# đăng ký/đăng nhập sẽ chặn worker đó. Pool có giới hạn số việc đang chờ,
+# khi đầy thì báo lỗi ngay để route trả về 503 thay vì xếp hàng vô hạn.
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12  # Giống bcrypt.gensalt()
+
+# Pool được tạo từ thread của request: fork một process nhiều thread có thể làm process con
+# kẹt ở lock mà thread khác đang giữ, nên process con được tạo bằng forkserver (spawn nếu không có)
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+
+class HashingPoolSaturated(Exception):
+    """Số việc băm đang chờ đã đạt giới hạn (hoặc việc băm không xong trong thời gian chờ)."""
+
+
+# Hàm chạy trong process con (phải ở mức module để pickle được)
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check_password(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def _hash_chunk(passwords, rounds):
+    return [bcrypt.hashpw(password, bcrypt.gensalt(rounds)) for password in passwords]
+
+
+class HashingExecutor:
+    """
+    Process pool cho bcrypt với giới hạn độ sâu hàng đợi.
+    - max_workers: số process (mặc định = số core).
+    - max_pending: số việc tối đa đang chạy + chờ; vượt quá -> HashingPoolSaturated.
+    Pool chỉ được tạo ở lần dùng đầu tiên (tránh fork khi import module).
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, timeout=30, rounds=DEFAULT_ROUNDS):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.timeout = timeout
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=MP_CONTEXT)
+        return self._pool
+
+    def _submit(self, fn, *args, wait=False):
+        # wait=True: chờ tối đa `timeout` giây cho một slot thay vì báo đầy ngay
+        acquired = self._slots.acquire(timeout=self.timeout) if wait else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise HashingPoolSaturated("Hashing pool is saturated")
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Trả slot khi việc thật sự xong (kể cả khi người gọi đã timeout)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _result(self, future):
+        # Quá thời gian chờ cũng là dấu hiệu pool quá tải: báo như khi đầy để route trả 503
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HashingPoolSaturated("Hashing timed out")
+
+    def hash_password(self, password, rounds=None):
+        """Băm password (bytes), trả về hash bcrypt (bytes)."""
+        future = self._submit(_hash_password, password, rounds or self.rounds)
+        return self._result(future)
+
+    def hash_many(self, passwords, rounds=None, chunksize=1):
+        """
+        Băm nhiều password song song, giữ nguyên thứ tự.
+        Mỗi chunk chiếm một slot hàng đợi như một việc đơn lẻ, và chỉ có tối đa max_workers
+        chunk được gửi vào pool cùng lúc: việc băm/kiểm tra đơn lẻ chỉ phải chờ sau vài chunk,
+        không phải sau cả batch.
+        """
+        if not passwords:
+            return []
+        rounds = rounds or self.rounds
+        results = []
+        in_flight = deque()
+        for start in range(0, len(passwords), chunksize):
+            if len(in_flight) >= self.max_workers:
+                results.extend(self._result(in_flight.popleft()))
+            # Chunk đầu tiên báo đầy ngay như việc đơn lẻ; các chunk sau chờ slot được trả
+            in_flight.append(self._submit(_hash_chunk, passwords[start:start + chunksize], rounds,
+                                          wait=start > 0))
+        while in_flight:
+            results.extend(self._result(in_flight.popleft()))
+        return results
+
+    def check_password(self, password, hashed):
+        """So sánh password (bytes) với hash bcrypt (bytes)."""
+        future = self._submit(_check_password, password, hashed)
+        return self._result(future)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
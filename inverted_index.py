@@ -0,0 +1,107 @@
+# Chỉ mục ngược cho tìm kiếm bình luận (A06): mỗi token trỏ tới posting list là các seq
+# (tăng dần) của bình luận chứa token đó. Chỉ mục được cập nhật dần khi thêm bình luận,
+# truy vấn AND giao các posting list bắt đầu từ list ngắn nhất, không phải quét mọi bình luận.
+import html
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left, insort
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Danh sách token (chữ thường) của text; giải mã entity HTML trước để "&lt;" không thành token "lt"."""
+    return _TOKEN_RE.findall(html.unescape(text).lower())
+
+
+class InvertedIndex:
+    """
+    - retention: nếu đặt, tự bỏ các seq cũ hơn `retention` bình luận gần nhất
+      (khớp với CommentStore ring buffer, để chỉ mục không phình mãi)
+    """
+
+    def __init__(self, retention=None):
+        self.retention = retention
+        self._postings = {}    # token -> array("Q") các seq tăng dần
+        self._min_seq = 0      # seq nhỏ hơn giá trị này đã bị bỏ khỏi chỉ mục
+        self._indexed = 0      # tổng số bình luận đã đánh chỉ mục
+        self._lock = threading.Lock()
+
+    def add(self, seq, text):
+        """Đánh chỉ mục bình luận `seq` (bỏ qua bình luận không phải chuỗi)."""
+        if not isinstance(text, str):
+            return
+        tokens = set(tokenize(text))
+        with self._lock:
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    self._postings[token] = array("Q", (seq,))
+                elif postings[-1] < seq:
+                    postings.append(seq)
+                else:
+                    # Hai request ghi đồng thời có thể đánh chỉ mục lệch thứ tự
+                    insort(postings, seq)
+            self._indexed += 1
+            if self.retention is not None and seq + 1 - self._min_seq >= 2 * self.retention:
+                self._prune(seq + 1 - self.retention)
+
+    def add_many(self, first_seq, texts):
+        for seq, text in enumerate(texts, first_seq):
+            self.add(seq, text)
+
+    def _prune(self, min_seq):
+        # Bỏ phần đầu (seq < min_seq) của mọi posting list; chạy một lần mỗi `retention` bình luận
+        for token in list(self._postings):
+            postings = self._postings[token]
+            cut = bisect_left(postings, min_seq)
+            if cut == len(postings):
+                del self._postings[token]
+            elif cut:
+                del postings[:cut]
+        self._min_seq = min_seq
+
+    def search(self, query, position=0, limit=100):
+        """
+        Seq của các bình luận chứa tất cả token trong `query` (AND), tăng dần, bắt đầu từ seq `position`.
+        Trả về (list seq, còn kết quả sau hay không).
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return [], False
+        with self._lock:
+            lists = []
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    return [], False
+                lists.append(postings)
+            lists.sort(key=len)
+            smallest, others = lists[0], lists[1:]
+            cursors = [0] * len(others)
+            results = []
+            for i in range(bisect_left(smallest, max(position, self._min_seq)), len(smallest)):
+                seq = smallest[i]
+                for j, postings in enumerate(others):
+                    k = bisect_left(postings, seq, cursors[j])
+                    cursors[j] = k
+                    if k == len(postings):
+                        return results, False   # một list đã hết: không còn kết quả nào nữa
+                    if postings[k] != seq:
+                        break
+                else:
+                    if len(results) == limit:
+                        return results, True
+                    results.append(seq)
+        return results, False
+
+    def stats(self):
+        """Số token, số phần tử posting và bộ nhớ ước tính (byte) của chỉ mục."""
+        with self._lock:
+            postings = sum(len(p) for p in self._postings.values())
+            memory = sys.getsizeof(self._postings) + sum(
+                sys.getsizeof(token) + sys.getsizeof(p) for token, p in self._postings.items())
+            return {"indexed": self._indexed, "tokens": len(self._postings),
+                    "postings": postings, "memory_bytes": memory}
@@ -0,0 +1,213 @@
+# Bản sao trong RAM (SQLite in-memory, shared cache) của một database trên đĩa,
+# dùng cho các route chỉ đọc: mọi truy vấn chạy trên bản sao, ghi vẫn vào file.
+#
+# Double buffer: mỗi lần làm mới, database được chép (backup API, theo từng nhóm
+# trang) vào một database in-memory MỚI trong khi bản cũ vẫn phục vụ truy vấn; chép
+# xong mới đổi sang bản mới. Kết nối tới bản sao được mượn từ một pool có giới hạn
+# (như db_pool.SQLiteConnectionPool); khi đổi bản, kết nối rảnh tới bản cũ bị đóng ngay,
+# kết nối đang được mượn bị đóng khi trả lại, nên bản cũ được giải phóng khi request
+# cuối cùng dùng nó kết thúc. Một thread nền kiểm tra PRAGMA data_version trên
+# file theo chu kỳ và chỉ làm mới khi dữ liệu đã thay đổi.
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g
+
+_snapshot_ids = itertools.count(1)
+
+
+class MemorySnapshot:
+    """
+    Cùng interface với SQLiteConnectionPool (connection(), checkout(), init_app(), close_all()).
+    - refresh_interval: số giây giữa các lần kiểm tra data_version (None/0 = không tự làm mới)
+    - pages_per_step: số trang chép mỗi bước backup (nhả khóa đọc giữa các bước để không chặn ghi)
+    - on_refresh: hàm gọi sau mỗi lần thay bản sao cũ bằng bản mới (ví dụ xóa cache kết quả)
+    - max_size, timeout: số kết nối tối đa tới bản sao, thời gian chờ khi mọi kết nối đang được mượn
+    """
+
+    def __init__(self, path, refresh_interval=5.0, pages_per_step=4096, on_refresh=None,
+                 max_size=16, timeout=5.0):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.pages_per_step = pages_per_step
+        self.on_refresh = on_refresh
+        self.max_size = max_size
+        self.timeout = timeout
+        self._id = next(_snapshot_ids)
+        self._generation = 0
+        self._uri = None
+        self._anchor = None          # Giữ database in-memory hiện tại tồn tại
+        self._idle = queue.LifoQueue()  # (generation, kết nối) đang rảnh
+        self._in_use = {}            # kết nối đang được mượn -> generation
+        self._size = 0               # Số kết nối đang mở (rảnh + đang được mượn)
+        self._closed = False
+        self._lock = threading.Lock()         # Bảo vệ pool kết nối và việc đổi bản sao
+        self._refresh_lock = threading.Lock()  # Mỗi lúc chỉ một lần làm mới
+        self._g_key = f"_memory_snapshot_{self._id}"
+        self._stop = threading.Event()
+        self.refreshes = 0
+        self.last_refresh_s = None
+        self.last_refresh_at = None
+
+        # Kết nối chỉ đọc tới file: nguồn cho backup và để đọc data_version
+        self._source = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._data_version = None
+        self.refresh()
+
+        self._thread = None
+        if refresh_interval:
+            self._thread = threading.Thread(target=self._run, name="memory-snapshot", daemon=True)
+            self._thread.start()
+
+    def _read_data_version(self):
+        return self._source.execute("PRAGMA data_version").fetchone()[0]
+
+    def refresh(self, force=True):
+        """
+        Chép database vào một bản sao mới rồi đổi sang bản đó.
+        force=False: bỏ qua nếu data_version không đổi kể từ lần chép trước.
+        Trả về True nếu đã đổi bản sao.
+        """
+        with self._refresh_lock:
+            version = self._read_data_version()
+            if not force and version == self._data_version:
+                return False
+            start = time.perf_counter()
+            generation = self._generation + 1
+            uri = f"file:snapshot{self._id}_{generation}?mode=memory&cache=shared"
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            try:
+                self._source.backup(anchor, pages=self.pages_per_step)
+            except BaseException:
+                anchor.close()
+                raise
+            with self._lock:
+                old_anchor = self._anchor
+                self._uri, self._anchor, self._generation = uri, anchor, generation
+                if old_anchor is not None:
+                    old_anchor.close()  # Bản cũ được giải phóng khi kết nối cuối cùng tới nó đóng
+            swapped = old_anchor is not None
+            self._close_idle()
+            self._data_version = version
+            self.refreshes += 1
+            self.last_refresh_s = time.perf_counter() - start
+            self.last_refresh_at = time.time()
+        if swapped and self.on_refresh is not None:
+            self.on_refresh()
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh(force=False)
+            except sqlite3.Error:
+                pass  # Thử lại ở chu kỳ sau, vẫn phục vụ bản sao hiện tại
+
+    def _open(self):
+        # Gọi khi đang giữ self._lock: bản sao không thể bị đóng giữa chừng
+        # (mở URI của một bản đã giải phóng sẽ tạo ra database rỗng)
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _close_idle(self):
+        """Đóng các kết nối rảnh tới bản sao cũ (hoặc mọi kết nối rảnh sau close_all())."""
+        keep = []
+        while True:
+            try:
+                generation, conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._generation and not self._closed:
+                keep.append((generation, conn))
+                continue
+            conn.close()
+            with self._lock:
+                self._size -= 1
+        for item in reversed(keep):
+            self._idle.put(item)
+
+    def acquire(self):
+        """Mượn một kết nối tới bản sao hiện tại; phải trả lại bằng release()."""
+        while True:
+            try:
+                generation, conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self._size < self.max_size:
+                        conn = self._open()
+                        self._size += 1
+                        self._in_use[conn] = self._generation
+                        return conn
+                try:
+                    generation, conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("connection pool exhausted") from None
+            with self._lock:
+                if generation == self._generation:
+                    self._in_use[conn] = generation
+                    return conn
+                self._size -= 1
+            conn.close()  # Kết nối tới bản sao cũ: bỏ, lấy kết nối khác
+
+    def release(self, conn):
+        with self._lock:
+            generation = self._in_use.pop(conn)
+            stale = generation != self._generation or self._closed
+            if stale:
+                self._size -= 1
+        if stale:
+            conn.close()
+        else:
+            self._idle.put((generation, conn))
+
+    @contextmanager
+    def checkout(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def init_app(self, app):
+        """Trả kết nối mà request đã dùng về pool khi app context kết thúc."""
+        @app.teardown_appcontext
+        def release_connection(exception=None):
+            conn = g.pop(self._g_key, None)
+            if conn is not None:
+                self.release(conn)
+
+    def connection(self):
+        conn = g.get(self._g_key)
+        if conn is None:
+            conn = self.acquire()
+            setattr(g, self._g_key, conn)
+        return conn
+
+    def stats(self):
+        return {
+            "generation": self._generation,
+            "refreshes": self.refreshes,
+            "last_refresh_s": self.last_refresh_s,
+            "last_refresh_at": self.last_refresh_at,
+            "data_version": self._data_version,
+            "connections": self._size,
+            "connections_in_use": len(self._in_use),
+        }
+
+    def close_all(self):
+        """Dừng thread làm mới và đóng mọi kết nối (bản sao in-memory bị giải phóng)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._closed = True
+        self._close_idle()  # Kết nối đang được mượn bị đóng khi trả lại
+        with self._refresh_lock:
+            if self._anchor is not None:
+                self._anchor.close()
+                self._anchor = None
+            self._source.close()
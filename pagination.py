@@ -0,0 +1,59 @@
+# Phân trang bằng cursor cho các route trả về danh sách lớn.
+# Cursor là chuỗi opaque (base64 của vị trí), client chỉ việc gửi lại
+# giá trị "next_cursor" nhận được ở trang trước.
+import base64
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(f"p:{position}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Trả về vị trí từ cursor; ValueError nếu cursor không hợp lệ."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, position = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        position = int(position)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if prefix != "p" or position < 0:
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def parse_page_args(args, default_limit=DEFAULT_LIMIT, max_limit=MAX_LIMIT):
+    """
+    Đọc "cursor" và "limit" từ query string (request.args).
+    Trả về (position, limit); ValueError nếu tham số không hợp lệ.
+    """
+    cursor = args.get("cursor")
+    position = decode_cursor(cursor) if cursor else 0
+    try:
+        limit = int(args.get("limit", default_limit))
+    except ValueError:
+        raise ValueError("Invalid limit")
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return position, min(limit, max_limit)
+
+
+def iter_slice(items, start, stop=None):
+    """
+    Duyệt items[start:stop] theo chỉ số, không sao chép list.
+    An toàn khi list được append thêm trong lúc đang duyệt (dùng cho streaming).
+    """
+    index = start
+    while index < len(items) and (stop is None or index < stop):
+        yield items[index]
+        index += 1
+
+
+def paginate(items, position, limit):
+    """Trả về (trang hiện tại, next_cursor hoặc None nếu đã hết)."""
+    page = list(iter_slice(items, position, position + limit))
+    end = position + len(page)
+    next_cursor = encode_cursor(end) if end < len(items) else None
+    return page, next_cursor
@@ -0,0 +1,173 @@
+# Job chuyển mật khẩu plain text sang bcrypt (A02: insecure_users -> secure_users).
+# Chạy trong thread nền, băm song song bằng process pool riêng (mặc định một nửa số core,
+# phần còn lại cho pool băm của route đăng nhập), có thể dừng và chạy tiếp từ
+# checkpoint, và báo tiến độ/thông lượng qua status().
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from hash_pool import MP_CONTEXT
+
+
+# Chạy trong process con: băm cả một batch để giảm chi phí IPC
+def _hash_batch(passwords, rounds):
+    return [bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)) for password in passwords]
+
+
+class PlaintextMigration:
+    """
+    - source: list các bản ghi {"username", "password" (plain text)}, chỉ được append.
+    - is_migrated(username): True nếu username đã có trong kho an toàn (bỏ qua).
+    - commit(username, hashed): ghi bản ghi đã băm vào kho an toàn.
+    Vị trí đã xử lý được lưu vào checkpoint_path sau mỗi batch nên có thể chạy tiếp.
+    Checkpoint kèm digest các username trước vị trí đó: nếu source không còn khớp (ví dụ list
+    trong RAM trống sau khi khởi động lại) thì chạy lại từ đầu, is_migrated() bỏ qua phần đã chuyển.
+    """
+
+    def __init__(self, source, is_migrated, commit, rounds, workers=None,
+                 batch_size=64, checkpoint_path=None):
+        self.source = source
+        self.is_migrated = is_migrated
+        self.commit = commit
+        self.rounds = rounds
+        self.workers = workers or max(1, (os.cpu_count() or 1) // 2)
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.position, self._checkpoint_digest = self._load_checkpoint()
+        self._digest = None
+        self.state = "idle"
+        self.error = None
+        self._stats = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _load_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            return checkpoint.get("position", 0), checkpoint.get("digest")
+        return 0, None
+
+    def _update_digest(self, start, end):
+        for record in self.source[start:end]:
+            self._digest.update(record["username"].encode("utf-8") + b"\0")
+
+    def _validate_checkpoint(self):
+        """Digest các username trong source[:position]; về 0 nếu không khớp checkpoint."""
+        self._digest = hashlib.sha256()
+        if self.position > len(self.source):
+            self.position = 0
+        self._update_digest(0, self.position)
+        if self.position and self._digest.hexdigest() != self._checkpoint_digest:
+            self.position = 0
+            self._digest = hashlib.sha256()
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"position": self.position, "digest": self._checkpoint_digest,
+                       "saved_at": time.time()}, f)
+        os.replace(tmp_path, self.checkpoint_path)  # Ghi nguyên tử
+
+    def start(self):
+        """Bắt đầu (hoặc chạy tiếp) job; False nếu job đang chạy."""
+        with self._lock:
+            if self.state == "running":
+                return False
+            self._stop.clear()
+            self.state = "running"
+            self.error = None
+            self._validate_checkpoint()
+            self._stats = {"migrated": 0, "skipped": 0, "started_at": time.time(),
+                           "start_position": self.position, "finished_at": None}
+            self._thread = threading.Thread(target=self._run, name="password-migration", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, wait=False):
+        """Dừng sau batch hiện tại; vị trí đã commit được giữ lại để chạy tiếp."""
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_batch(self, start):
+        # Lấy batch kế tiếp, bỏ qua các username đã được chuyển trước đó
+        end = min(start + self.batch_size, len(self.source))
+        items = []
+        for record in self.source[start:end]:
+            if self.is_migrated(record["username"]):
+                self._stats["skipped"] += 1
+            else:
+                items.append(record)
+        return end, items
+
+    def _run(self):
+        in_flight = deque()  # (vị trí kết thúc batch, records, future), theo thứ tự
+        next_start = self.position
+        try:
+            # Pool được tạo từ thread nền: dùng forkserver/spawn thay vì fork (xem hash_pool.MP_CONTEXT)
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=MP_CONTEXT) as pool:
+                while True:
+                    # Giữ đủ việc cho mọi process (2 batch mỗi worker)
+                    while (not self._stop.is_set() and len(in_flight) < self.workers * 2
+                           and next_start < len(self.source)):
+                        end, records = self._next_batch(next_start)
+                        future = pool.submit(_hash_batch, [r["password"] for r in records], self.rounds)
+                        in_flight.append((end, records, future))
+                        next_start = end
+                    if not in_flight:
+                        break
+                    end, records, future = in_flight.popleft()
+                    for record, hashed in zip(records, future.result()):
+                        if not self.is_migrated(record["username"]):
+                            self.commit(record["username"], hashed)
+                            self._stats["migrated"] += 1
+                    self._update_digest(self.position, end)
+                    self.position = end
+                    self._checkpoint_digest = self._digest.hexdigest()
+                    self._save_checkpoint()
+                    if self._stop.is_set():
+                        # Bỏ các batch chưa commit; lần chạy sau sẽ băm lại từ self.position
+                        for _, _, pending in in_flight:
+                            pending.cancel()
+                        in_flight.clear()
+            self.state = "stopped" if self.position < len(self.source) else "done"
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+        finally:
+            self._stats["finished_at"] = time.time()
+
+    def status(self):
+        stats = dict(self._stats)
+        total = len(self.source)
+        started_at = stats.get("started_at")
+        elapsed = ((stats.get("finished_at") or time.time()) - started_at) if started_at else 0.0
+        processed = self.position - stats.get("start_position", self.position)
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        return {
+            "state": self.state,
+            "error": self.error,
+            "workers": self.workers,
+            "total": total,
+            "position": self.position,
+            "progress": round(self.position / total, 4) if total else 1.0,
+            "migrated": stats.get("migrated", 0),
+            "skipped": stats.get("skipped", 0),
+            "elapsed_s": round(elapsed, 3),
+            "users_per_s": round(rate, 1),
+            "eta_s": round((total - self.position) / rate, 1) if rate > 0 else None,
+        }
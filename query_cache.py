@@ -0,0 +1,76 @@
+# Cache kết quả truy vấn SQLite (A03), khóa theo câu SQL đã chuẩn hóa + tham số.
+# Trước mỗi lần đọc cache, kiểm tra PRAGMA data_version trên một kết nối riêng:
+# giá trị này thay đổi mỗi khi có kết nối khác commit vào database, khi đó toàn
+# bộ cache bị xóa nên không bao giờ trả về kết quả cũ sau một lần ghi.
+# Kết quả chỉ được lưu nếu cache không bị xóa trong lúc chạy truy vấn (truy vấn có thể
+# đã đọc dữ liệu trước lần ghi vừa làm đổi data_version).
+import sqlite3
+import threading
+from functools import lru_cache
+
+from ttl_cache import TTLCache
+
+
+@lru_cache(maxsize=256)
+def normalize_sql(sql):
+    return " ".join(sql.split())
+
+
+class QueryResultCache:
+
+    def __init__(self, path, maxsize=1024, ttl=30):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Kết nối chỉ dùng để đọc data_version (không bao giờ ghi)
+        self._probe = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._probe_cursor = self._probe.cursor()
+        self._probe_lock = threading.Lock()
+        self._lock = threading.RLock()  # Đổi data_version/xóa cache và lưu kết quả không xen vào nhau
+        self._data_version = self._read_data_version()
+        self.invalidations = 0
+
+    def _read_data_version(self):
+        with self._probe_lock:
+            return self._probe_cursor.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_data_version(self):
+        """Xóa cache nếu data_version đã đổi; trả về số lần xóa cache tới thời điểm này."""
+        version = self._read_data_version()
+        with self._lock:
+            if version != self._data_version:
+                self._data_version = version
+                self.invalidate()
+            return self.invalidations
+
+    def invalidate(self):
+        """Xóa toàn bộ cache (gọi sau khi ghi nếu không muốn chờ data_version)."""
+        with self._lock:
+            self._cache.clear()
+            self.invalidations += 1
+
+    def fetch(self, conn, sql, params=(), max_rows=None, run=None):
+        """
+        Trả về list các dòng của truy vấn (tối đa max_rows dòng),
+        từ cache nếu có, ngược lại chạy trên conn rồi lưu vào cache.
+        run(conn, sql, params, max_rows), nếu có, được dùng để chạy truy vấn khi cache miss.
+        """
+        generation = self._check_data_version()
+        key = (normalize_sql(sql), tuple(params), max_rows)
+        rows = self._cache.get(key)
+        if rows is None:
+            if run is not None:
+                rows = run(conn, sql, params, max_rows)
+            else:
+                cursor = conn.execute(sql, params)
+                rows = cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows)
+            with self._lock:
+                # Cache bị xóa trong lúc chạy truy vấn: rows có thể là dữ liệu trước lần ghi đó
+                if self.invalidations == generation:
+                    self._cache.set(key, rows)
+        return rows
+
+    def stats(self):
+        return dict(self._cache.stats(), invalidations=self.invalidations, data_version=self._data_version)
+
+    def close(self):
+        with self._probe_lock:
+            self._probe.close()
@@ -0,0 +1,210 @@
+# Giới hạn tần suất theo key (ví dụ IP đăng nhập) bằng sliding window counter:
+# mỗi key chỉ giữ 3 số (đầu cửa sổ hiện tại, số lần của cửa sổ trước và cửa sổ hiện tại),
+# số lần trong 60 giây gần nhất được ước lượng = trước * phần cửa sổ trước còn nằm trong khoảng + hiện tại.
+# Key không còn lần nào trong khoảng được xóa lười; số key tối đa có giới hạn (bỏ key lâu không dùng nhất - LRU).
+# SlidingLogLimiter: cùng interface nhưng lưu thời điểm từng lần, đếm chính xác thay vì ước lượng.
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class SlidingWindowLimiter:
+    """
+    - limit: số lần tối đa trong `window` giây
+    - max_keys: số key được theo dõi tối đa; vượt quá thì bỏ key ít được dùng nhất (LRU)
+    Mọi thao tác là O(1) (khấu hao) và an toàn giữa các thread.
+    """
+
+    def __init__(self, limit=5, window=60, max_keys=100_000, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._clock = clock
+        self._state = OrderedDict()  # key -> [đầu cửa sổ hiện tại, số lần cửa sổ trước, số lần cửa sổ hiện tại]
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.denied = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expire(self, now):
+        # Thứ tự LRU cũng là thứ tự đầu cửa sổ (cửa sổ chỉ tiến khi key được dùng), nên key hết hạn luôn ở đầu
+        horizon = now - 2 * self.window
+        state = self._state
+        while state:
+            key, entry = next(iter(state.items()))
+            if entry[0] > horizon:
+                break
+            del state[key]
+            self.expirations += 1
+
+    def _roll(self, entry, now):
+        """Dịch cửa sổ của entry ([đầu cửa sổ, trước, hiện tại]) tới `now`."""
+        start = now - now % self.window
+        if start == entry[0]:
+            return
+        # Sang cửa sổ mới: cửa sổ hiện tại thành cửa sổ trước (hoặc bỏ hẳn nếu đã qua hơn một cửa sổ)
+        entry[1] = entry[2] if start - entry[0] == self.window else 0
+        entry[2] = 0
+        entry[0] = start
+
+    def _entry(self, key, now):
+        """Trạng thái của key sau khi đã dịch cửa sổ tới `now` (None nếu key chưa được theo dõi)."""
+        entry = self._state.get(key)
+        if entry is None:
+            return None
+        self._roll(entry, now)
+        self._state.move_to_end(key)
+        return entry
+
+    def _add(self, key, now):
+        self._state[key] = [now - now % self.window, 0, 1]
+        while len(self._state) > self.max_keys:
+            self._state.popitem(last=False)
+            self.evictions += 1
+
+    def _estimate(self, entry, now):
+        elapsed = (now - entry[0]) / self.window
+        return entry[1] * (1 - elapsed) + entry[2]
+
+    def _retry_after(self, entry, now):
+        """Số giây (làm tròn lên) tới khi ước lượng xuống dưới `limit`."""
+        start, previous, current = entry
+        if current >= self.limit:
+            # Phải sang cửa sổ sau, rồi chờ số lần của cửa sổ này giảm dần
+            wait = start + self.window - now + (1 - (self.limit - 1) / current) * self.window
+        else:
+            wait = ((1 - (self.limit - current) / previous) - (now - start) / self.window) * self.window
+        return max(1, math.ceil(wait))
+
+    def hit(self, key):
+        """
+        Ghi nhận một lần thử nếu key chưa vượt giới hạn.
+        Trả về (được phép hay không, số giây nên chờ nếu bị chặn). Lần bị chặn không được tính thêm.
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            entry = self._entry(key, now)
+            if entry is None:
+                self._add(key, now)
+                self.allowed += 1
+                return True, 0
+            if self._estimate(entry, now) >= self.limit:
+                self.denied += 1
+                return False, self._retry_after(entry, now)
+            entry[2] += 1
+            self.allowed += 1
+            return True, 0
+
+    def record(self, key):
+        """Ghi nhận một lần (ví dụ đăng nhập sai) mà không kiểm tra giới hạn."""
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            entry = self._entry(key, now)
+            if entry is None:
+                self._add(key, now)
+            else:
+                entry[2] += 1
+
+    def peek(self, key):
+        """Như hit() nhưng không ghi nhận lần thử."""
+        with self._lock:
+            now = self._clock()
+            entry = self._entry(key, now)
+            if entry is None or self._estimate(entry, now) < self.limit:
+                return True, 0
+            return False, self._retry_after(entry, now)
+
+    def reset(self, key):
+        """Xóa bộ đếm của key (ví dụ sau khi đăng nhập thành công)."""
+        with self._lock:
+            self._state.pop(key, None)
+
+    def __len__(self):
+        return len(self._state)
+
+    def stats(self):
+        return {
+            "tracked_keys": len(self._state),
+            "max_keys": self.max_keys,
+            "limit": self.limit,
+            "window": self.window,
+            "allowed": self.allowed,
+            "denied": self.denied,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SlidingLogLimiter(SlidingWindowLimiter):
+    """
+    Như SlidingWindowLimiter nhưng đếm chính xác (sliding window log): mỗi key giữ thời điểm
+    của tối đa `limit` lần gần nhất, lần thử bị chặn khi đã có `limit` lần trong `window` giây
+    vừa qua. Tốn bộ nhớ gấp limit/3 lần, dùng khi giới hạn phải đúng tuyệt đối (ví dụ A09).
+    """
+
+    def __init__(self, limit=5, window=60, max_keys=100_000, clock=time.monotonic):
+        super().__init__(limit, window, max_keys, clock)
+        self._state = OrderedDict()  # key -> deque các thời điểm, cũ nhất trước; thứ tự key theo lần gần nhất
+
+    def _expire(self, now):
+        # Key chỉ được đưa về cuối khi ghi nhận lần mới, nên key hết hạn (lần gần nhất đã quá cũ) luôn ở đầu
+        horizon = now - self.window
+        state = self._state
+        while state:
+            key, times = next(iter(state.items()))
+            if times[-1] > horizon:
+                break
+            del state[key]
+            self.expirations += 1
+
+    def _full(self, key, now):
+        """Thời điểm cũ nhất nếu key đã có đủ `limit` lần trong cửa sổ, ngược lại None."""
+        times = self._state.get(key)
+        if times is None or len(times) < self.limit or times[0] <= now - self.window:
+            return None
+        return times[0]
+
+    def _retry_after(self, oldest, now):
+        return max(1, math.ceil(oldest + self.window - now))
+
+    def _append(self, key, now):
+        times = self._state.get(key)
+        if times is None:
+            # Chỉ cần `limit` lần gần nhất để biết key có vượt giới hạn không
+            times = self._state[key] = deque(maxlen=self.limit)
+            while len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._state.move_to_end(key)
+        times.append(now)
+
+    def hit(self, key):
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            oldest = self._full(key, now)
+            if oldest is not None:
+                self.denied += 1
+                return False, self._retry_after(oldest, now)
+            self._append(key, now)
+            self.allowed += 1
+            return True, 0
+
+    def record(self, key):
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            self._append(key, now)
+
+    def peek(self, key):
+        with self._lock:
+            now = self._clock()
+            oldest = self._full(key, now)
+            if oldest is None:
+                return True, 0
+            return False, self._retry_after(oldest, now)
@@ -0,0 +1,102 @@
+# Middleware after_request thêm header bảo mật cho mọi response của một app Flask
+# (dùng chung cho các demo A0x), thay cho việc gọi add_security_headers() ở từng nhánh.
+#
+# Bộ header được tính sẵn một lần thành tuple (không đổi); route có thể:
+#   @headers.exempt                         -> không thêm header nào (route demo lỗ hổng)
+#   @headers.override({"X-Frame-Options": "SAMEORIGIN"})  -> thay/thêm header cho route đó
+# CSP có thể chứa "{nonce}": view gọi headers.nonce() để lấy nonce cho <script nonce=...>,
+# nonce được lấy từ một pool sinh sẵn theo lô (mỗi response một nonce khác nhau).
+import base64
+import os
+import threading
+from collections import deque
+
+from flask import g, request
+
+DEFAULT_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Content-Security-Policy": "default-src 'self'",
+}
+
+_EXEMPT = ()
+
+
+def _compile(headers):
+    # (tên, giá trị, có chứa {nonce} hay không) - tính một lần, không đổi về sau
+    return tuple((name, value, "{nonce}" in value) for name, value in headers.items())
+
+
+class NoncePool:
+    """Nonce ngẫu nhiên (16 byte, base64) sinh sẵn theo lô `batch_size` từ một lần os.urandom."""
+
+    def __init__(self, batch_size=1024):
+        self.batch_size = batch_size
+        self._nonces = deque()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        raw = base64.urlsafe_b64encode(os.urandom(18 * self.batch_size)).decode("ascii")
+        # 18 byte -> đúng 24 ký tự base64, không có padding
+        self._nonces.extend(raw[i:i + 24] for i in range(0, len(raw), 24))
+
+    def get(self):
+        try:
+            return self._nonces.popleft()
+        except IndexError:
+            with self._lock:
+                if not self._nonces:
+                    self._refill()
+            return self.get()
+
+
+class SecurityHeaders:
+
+    def __init__(self, app=None, headers=None, nonce_pool=None):
+        self.headers = _compile(headers if headers is not None else DEFAULT_HEADERS)
+        self.nonce_pool = nonce_pool or NoncePool()
+        self._views = {}  # endpoint -> bộ header đã tính (tuple rỗng nếu route được miễn)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.after_request(self._apply)
+
+    def _config(self, view):
+        # Bộ header của route được tính một lần khi khai báo
+        return getattr(view, "_security_headers", self.headers)
+
+    def exempt(self, view):
+        view._security_headers = _EXEMPT
+        return view
+
+    def override(self, headers):
+        """Decorator: gộp `headers` vào bộ mặc định cho route này (giá trị None = bỏ header đó)."""
+        merged = {name: value for name, value, _ in self.headers}
+        merged.update(headers)
+        computed = _compile({name: value for name, value in merged.items() if value is not None})
+
+        def decorator(view):
+            view._security_headers = computed
+            return view
+        return decorator
+
+    def nonce(self):
+        """Nonce CSP của request hiện tại (cùng giá trị cho mọi lần gọi trong một request)."""
+        nonce = g.get("csp_nonce")
+        if nonce is None:
+            nonce = g.csp_nonce = self.nonce_pool.get()
+        return nonce
+
+    def _apply(self, response):
+        endpoint = request.endpoint
+        headers = self._views.get(endpoint)
+        if headers is None:
+            headers = self._views[endpoint] = self._config(self.app.view_functions.get(endpoint))
+        # add() thay vì headers[name] = ...: bỏ bước dò và xóa header trùng tên.
+        # View không tự đặt các header này mà dùng @override để thay giá trị.
+        add = response.headers.add
+        for name, value, uses_nonce in headers:
+            add(name, value.replace("{nonce}", self.nonce()) if uses_nonce else value)
+        return response
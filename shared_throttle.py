@@ -0,0 +1,306 @@
+# Bộ giới hạn số lần đăng nhập dùng chung giữa nhiều process (ví dụ nhiều worker gunicorn):
+# cùng thuật toán và interface với SlidingWindowLimiter nhưng trạng thái nằm trong một file
+# SQLite ở chế độ WAL. Mỗi lần hit() là một câu UPSERT ... RETURNING có điều kiện (dịch cửa sổ,
+# kiểm tra giới hạn và tăng bộ đếm ngay trong SQL) ở chế độ autocommit, nên các worker luôn thấy
+# chung một bộ đếm, giới hạn không bị nhân lên theo số worker, và khóa ghi chỉ bị giữ trong một câu lệnh.
+# SQLiteLogThrottle là bản dùng chung của SlidingLogLimiter (đếm chính xác, mỗi lần thử là một dòng).
+# Đặt file trên tmpfs (ví dụ /dev/shm) để tránh ghi xuống đĩa: trạng thái này không cần giữ lâu.
+import math
+import os
+import sqlite3
+import time
+
+from db_pool import CONNECTION_PRAGMAS, enable_wal
+from rate_limiter import SlidingWindowLimiter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS throttle (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    start REAL NOT NULL,
+    previous INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    PRIMARY KEY (name, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS throttle_start ON throttle (name, start);
+CREATE TABLE IF NOT EXISTS throttle_log (
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS throttle_log_key ON throttle_log (name, key, ts);
+CREATE INDEX IF NOT EXISTS throttle_log_ts ON throttle_log (name, ts);
+"""
+
+# Dịch cửa sổ giống SlidingWindowLimiter._roll (?1 name, ?2 key, ?3 đầu cửa sổ, ?4 window).
+# Trong SET/WHERE mọi cột đều là giá trị trước khi cập nhật.
+PREVIOUS = "CASE WHEN start = ?3 THEN previous WHEN start = ?3 - ?4 THEN current ELSE 0 END"
+CURRENT = "CASE WHEN start = ?3 THEN current ELSE 0 END"
+
+# Dịch cửa sổ rồi tăng bộ đếm
+UPSERT = f"""
+INSERT INTO throttle (name, key, start, previous, current) VALUES (?1, ?2, ?3, 0, 1)
+ON CONFLICT (name, key) DO UPDATE SET start = ?3, previous = {PREVIOUS}, current = {CURRENT} + 1
+"""
+
+# Như UPSERT nhưng chỉ tăng khi ước lượng (giống _estimate, ?5 now) còn dưới giới hạn ?6:
+# kiểm tra và tăng trong cùng một câu lệnh, nên không có worker nào chen vào giữa.
+# Không trả về dòng nào nghĩa là key đã vượt giới hạn.
+UPSERT_UNDER_LIMIT = UPSERT + f"""WHERE {PREVIOUS} * (1.0 - (?5 - ?3) / ?4) + {CURRENT} < ?6
+RETURNING current
+"""
+
+SELECT = "SELECT start, previous, current FROM throttle WHERE name = ? AND key = ?"
+
+# SQLiteLogThrottle: ghi lần thử mới (?3 now) chỉ khi số lần trong `window` giây vừa qua (?4) còn dưới ?5
+LOG_INSERT_UNDER_LIMIT = """
+INSERT INTO throttle_log (name, key, ts) SELECT ?1, ?2, ?3
+WHERE (SELECT count(*) FROM throttle_log WHERE name = ?1 AND key = ?2 AND ts > ?3 - ?4) < ?5
+RETURNING ts
+"""
+
+# `limit` lần gần nhất còn trong cửa sổ (?1 name, ?2 key, ?3 now - window, ?4 limit)
+LOG_SELECT = "SELECT ts FROM throttle_log WHERE name = ?1 AND key = ?2 AND ts > ?3 ORDER BY ts DESC LIMIT ?4"
+
+
+class SQLiteThrottle(SlidingWindowLimiter):
+    """
+    - path: file SQLite dùng chung (mọi process trên cùng máy trỏ tới cùng file)
+    - name: tên bộ đếm, để nhiều bộ đếm (A07, A09, ...) dùng chung một file
+    - cleanup_every: sau bao nhiêu lần ghi thì xóa key hết hạn và cắt bớt key vượt max_keys
+    Key không phải chuỗi (ví dụ tuple (ip, username)) được lưu dưới dạng repr().
+    Đồng hồ mặc định là time.time() vì phải giống nhau giữa các process.
+    Mỗi process dùng một kết nối (mở lại sau fork), các thread lần lượt dùng nó qua self._lock.
+    Khi database bận quá lâu (sqlite3.OperationalError, ví dụ hết thời gian chờ khóa ghi),
+    hit()/peek() chặn lần thử với Retry-After 1 giây thay vì ném lỗi (route trả 429, không phải 500);
+    record()/reset() bỏ qua lần ghi đó. Số lần như vậy nằm trong stats()["errors"].
+    """
+
+    # Retry-After (giây) khi không đọc/ghi được bộ đếm
+    BUSY_RETRY_AFTER = 1
+
+    def __init__(self, path, name, limit=5, window=60, max_keys=100_000, cleanup_every=1000, clock=time.time):
+        super().__init__(limit, window, max_keys, clock)
+        self.path = path
+        self.name = name
+        self.cleanup_every = cleanup_every
+        self._writes = 0
+        self.errors = 0
+        self._conn = None
+        self._pid = None
+        enable_wal(path)
+        with self._lock:
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        """Kết nối của process hiện tại (gọi khi đang giữ self._lock)."""
+        if self._pid != os.getpid():
+            # Kết nối mở trước khi fork không được dùng ở process con
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            for pragma, value in CONNECTION_PRAGMAS.items():
+                conn.execute(f"PRAGMA {pragma}={value}")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _key(key):
+        return key if isinstance(key, str) else repr(key)
+
+    def _select(self, key):
+        """Trạng thái của key đã dịch cửa sổ tới `now` (None nếu key chưa được theo dõi)."""
+        with self._lock:
+            row = self._connection().execute(SELECT, (self.name, self._key(key))).fetchone()
+        if row is None:
+            return None, self._clock()
+        entry, now = list(row), self._clock()
+        self._roll(entry, now)
+        return entry, now
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes % self.cleanup_every == 0:
+            self.cleanup()
+
+    def hit(self, key):
+        now = self._clock()
+        start = now - now % self.window
+        try:
+            # fetchall() chạy câu lệnh tới hết để transaction (và khóa ghi) kết thúc ngay
+            with self._lock:
+                rows = self._connection().execute(
+                    UPSERT_UNDER_LIMIT, (self.name, self._key(key), start, self.window, now, self.limit)).fetchall()
+            if rows:
+                self.allowed += 1
+                self._wrote()
+                return True, 0
+            # Bị chặn: đọc trạng thái để tính Retry-After
+            entry, now = self._select(key)
+        except sqlite3.OperationalError:
+            self.errors += 1
+            self.denied += 1
+            return False, self.BUSY_RETRY_AFTER
+        self.denied += 1
+        if entry is None or self._estimate(entry, now) < self.limit:
+            # Key vừa được reset/dọn ở worker khác
+            return False, 1
+        return False, self._retry_after(entry, now)
+
+    def record(self, key):
+        now = self._clock()
+        try:
+            with self._lock:
+                self._connection().execute(UPSERT, (self.name, self._key(key), now - now % self.window, self.window))
+        except sqlite3.OperationalError:
+            self.errors += 1
+            return
+        self._wrote()
+
+    def peek(self, key):
+        try:
+            entry, now = self._select(key)
+        except sqlite3.OperationalError:
+            # Không biết key đã vượt giới hạn chưa: chặn (fail closed)
+            self.errors += 1
+            return False, self.BUSY_RETRY_AFTER
+        if entry is None or self._estimate(entry, now) < self.limit:
+            return True, 0
+        return False, self._retry_after(entry, now)
+
+    def reset(self, key):
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM throttle WHERE name = ? AND key = ?",
+                                           (self.name, self._key(key)))
+        except sqlite3.OperationalError:
+            self.errors += 1
+
+    def cleanup(self):
+        """
+        Xóa key hết hạn (không còn lần nào trong khoảng) rồi cắt bớt key vượt max_keys,
+        bỏ các key có cửa sổ cũ nhất trước (xấp xỉ LRU: cửa sổ chỉ tiến khi key được ghi).
+        """
+        try:
+            with self._lock:
+                conn = self._connection()
+                expired = conn.execute("DELETE FROM throttle WHERE name = ? AND start <= ?",
+                                       (self.name, self._clock() - 2 * self.window)).rowcount
+                excess = conn.execute("SELECT count(*) FROM throttle WHERE name = ?",
+                                      (self.name,)).fetchone()[0] - self.max_keys
+                if excess > 0:
+                    conn.execute("DELETE FROM throttle WHERE name = ? AND key IN ("
+                                 "SELECT key FROM throttle WHERE name = ? ORDER BY start LIMIT ?)",
+                                 (self.name, self.name, excess))
+        except sqlite3.OperationalError:
+            # Database đang bận quá lâu: bỏ qua, lần sau dọn tiếp
+            return
+        self.expirations += expired
+        self.evictions += max(excess, 0)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute("SELECT count(*) FROM throttle WHERE name = ?",
+                                              (self.name,)).fetchone()[0]
+
+    def stats(self):
+        """Bộ đếm allowed/denied/... là của riêng process này; tracked_keys là của cả file."""
+        return dict(super().stats(), tracked_keys=len(self), errors=self.errors, backend="sqlite", path=self.path, name=self.name)
+
+    def close(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._conn.close()
+            self._conn = self._pid = None
+
+
+class SQLiteLogThrottle(SQLiteThrottle):
+    """
+    Như SlidingLogLimiter (đếm chính xác số lần trong `window` giây vừa qua) nhưng dùng chung giữa
+    các process: mỗi lần là một dòng (name, key, ts) trong bảng throttle_log.
+    hit() đếm và ghi trong cùng một câu lệnh; dòng quá cũ và key vượt max_keys được xóa trong cleanup().
+    """
+
+    def _oldest_in_window(self, key, now):
+        """Thời điểm cũ nhất nếu key đã có đủ `limit` lần trong cửa sổ, ngược lại None."""
+        with self._lock:
+            rows = self._connection().execute(
+                LOG_SELECT, (self.name, self._key(key), now - self.window, self.limit)).fetchall()
+        return rows[-1][0] if len(rows) >= self.limit else None
+
+    def _retry_after(self, oldest, now):
+        return max(1, math.ceil(oldest + self.window - now))
+
+    def hit(self, key):
+        now = self._clock()
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    LOG_INSERT_UNDER_LIMIT, (self.name, self._key(key), now, self.window, self.limit)).fetchall()
+            if rows:
+                self.allowed += 1
+                self._wrote()
+                return True, 0
+            # Bị chặn: đọc lần cũ nhất trong cửa sổ để tính Retry-After
+            oldest = self._oldest_in_window(key, now)
+        except sqlite3.OperationalError:
+            self.errors += 1
+            self.denied += 1
+            return False, self.BUSY_RETRY_AFTER
+        self.denied += 1
+        if oldest is None:
+            # Key vừa được reset/dọn ở worker khác
+            return False, 1
+        return False, self._retry_after(oldest, now)
+
+    def record(self, key):
+        try:
+            with self._lock:
+                self._connection().execute("INSERT INTO throttle_log (name, key, ts) VALUES (?, ?, ?)",
+                                           (self.name, self._key(key), self._clock()))
+        except sqlite3.OperationalError:
+            self.errors += 1
+            return
+        self._wrote()
+
+    def peek(self, key):
+        now = self._clock()
+        try:
+            oldest = self._oldest_in_window(key, now)
+        except sqlite3.OperationalError:
+            # Không biết key đã vượt giới hạn chưa: chặn (fail closed)
+            self.errors += 1
+            return False, self.BUSY_RETRY_AFTER
+        if oldest is None:
+            return True, 0
+        return False, self._retry_after(oldest, now)
+
+    def reset(self, key):
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM throttle_log WHERE name = ? AND key = ?",
+                                           (self.name, self._key(key)))
+        except sqlite3.OperationalError:
+            self.errors += 1
+
+    def cleanup(self):
+        """Xóa các lần đã ra khỏi cửa sổ rồi cắt bớt key vượt max_keys, bỏ key có lần gần nhất cũ nhất trước."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                expired = conn.execute("DELETE FROM throttle_log WHERE name = ? AND ts <= ?",
+                                       (self.name, self._clock() - self.window)).rowcount
+                excess = conn.execute("SELECT count(DISTINCT key) FROM throttle_log WHERE name = ?",
+                                      (self.name,)).fetchone()[0] - self.max_keys
+                if excess > 0:
+                    conn.execute("DELETE FROM throttle_log WHERE name = ? AND key IN ("
+                                 "SELECT key FROM throttle_log WHERE name = ? GROUP BY key ORDER BY max(ts) LIMIT ?)",
+                                 (self.name, self.name, excess))
+        except sqlite3.OperationalError:
+            # Database đang bận quá lâu: bỏ qua, lần sau dọn tiếp
+            return
+        self.expirations += expired
+        self.evictions += max(excess, 0)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute("SELECT count(DISTINCT key) FROM throttle_log WHERE name = ?",
+                                              (self.name,)).fetchone()[0]
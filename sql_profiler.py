@@ -0,0 +1,162 @@
+# Đo thời gian các câu SQL (A03): histogram độ trễ theo từng dạng câu lệnh,
+# EXPLAIN QUERY PLAN cho câu lệnh mới gặp hoặc chạy chậm, và slow-query log
+# (mỗi dòng một JSON). Câu lệnh được chuẩn hóa (literal -> ?) nên mọi payload
+# ' OR '1'='1 đều gom về cùng một dạng, kèm plan "SCAN users".
+#
+# Xem top câu lệnh theo tổng thời gian từ slow-query log:
+#   python sql_profiler.py slow_query.log [--top 10]
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Cận trên (ms) của các bucket histogram
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+MAX_STATEMENTS = 1000   # Giới hạn số dạng câu lệnh được theo dõi
+OTHER_STATEMENT = "<other>"
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(sql):
+    return _SPACE_RE.sub(" ", _LITERAL_RE.sub("?", sql)).strip()
+
+
+def _is_full_scan(plan):
+    # "SCAN users" là quét toàn bảng; "SCAN ... USING (COVERING) INDEX" hoặc SEARCH thì không
+    return any(detail.startswith("SCAN") and "INDEX" not in detail for detail in plan)
+
+
+class QueryProfiler:
+
+    def __init__(self, slow_ms=50, log_path="slow_query.log"):
+        self.slow_ms = slow_ms
+        self._stats = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("slow_query")
+        if log_path and not self.logger.handlers:
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+            self.logger.propagate = False
+
+    @contextmanager
+    def profile(self, conn, sql, params=()):
+        """Đo thời gian khối lệnh thực thi `sql` (gồm cả execute và fetch)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(conn, sql, params, (time.perf_counter() - start) * 1000)
+
+    def _explain(self, conn, sql, params):
+        try:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except sqlite3.Error:
+            return None
+        return [row[3] for row in rows]
+
+    def record(self, conn, sql, params, elapsed_ms):
+        statement = normalize_statement(sql)
+        with self._lock:
+            stats = self._stats.get(statement)
+            if stats is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    statement = OTHER_STATEMENT
+                    stats = self._stats.setdefault(statement, self._new_stats())
+                else:
+                    stats = self._stats[statement] = self._new_stats()
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            for i, bound in enumerate(BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    stats["histogram"][i] += 1
+                    break
+            is_slow = elapsed_ms >= self.slow_ms
+            need_plan = stats["plan"] is None and statement != OTHER_STATEMENT
+            if is_slow:
+                stats["slow"] += 1
+
+        # Lấy plan ngoài lock: lần đầu gặp dạng câu lệnh này, và mỗi lần chạy chậm
+        if need_plan or is_slow:
+            plan = self._explain(conn, sql, params)
+            if plan is not None and statement != OTHER_STATEMENT:
+                stats["plan"] = plan
+                stats["full_scan"] = _is_full_scan(plan)
+            if is_slow:
+                self.logger.info(json.dumps({
+                    "ts": time.time(), "ms": round(elapsed_ms, 3),
+                    "statement": statement, "plan": plan
+                }))
+
+    @staticmethod
+    def _new_stats():
+        return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "slow": 0,
+                "histogram": [0] * len(BUCKETS_MS), "plan": None, "full_scan": None}
+
+    def report(self, top=10):
+        """Top câu lệnh theo tổng thời gian."""
+        with self._lock:
+            items = [(statement, dict(stats, histogram=list(stats["histogram"])))
+                     for statement, stats in self._stats.items()]
+        items.sort(key=lambda item: item[1]["total_ms"], reverse=True)
+        report = []
+        for statement, stats in items[:top]:
+            report.append({
+                "statement": statement,
+                "count": stats["count"],
+                "total_ms": round(stats["total_ms"], 3),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "slow": stats["slow"],
+                "histogram_ms": {("inf" if bound == float("inf") else str(bound)): n
+                                 for bound, n in zip(BUCKETS_MS, stats["histogram"]) if n},
+                "plan": stats["plan"],
+                "full_scan": stats["full_scan"],
+            })
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def summarize_log(path, top=10):
+    """Gom slow-query log theo câu lệnh, sắp theo tổng thời gian."""
+    totals = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            stats = totals.setdefault(entry["statement"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "plan": None})
+            stats["count"] += 1
+            stats["total_ms"] += entry["ms"]
+            stats["max_ms"] = max(stats["max_ms"], entry["ms"])
+            stats["plan"] = entry.get("plan") or stats["plan"]
+    return sorted(totals.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a slow-query log")
+    parser.add_argument("log", nargs="?", default="slow_query.log")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    for statement, stats in summarize_log(args.log, args.top):
+        print(f"{stats['total_ms']:10.1f} ms total  {stats['count']:6d}x  max {stats['max_ms']:8.1f} ms  {statement}")
+        for detail in stats["plan"] or []:
+            print(f"{'':>14}plan: {detail}")
+
+
+if __name__ == "__main__":
+    main()
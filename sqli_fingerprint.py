@@ -0,0 +1,225 @@
+# Phát hiện SQL injection theo kiểu libinjection (thuần Python), dùng để cảnh báo
+# trên tham số tìm kiếm của A03 - không thay thế parameterized query.
+#
+# Chuỗi đầu vào được tách token một lần cho mỗi ngữ cảnh (đứng trần, nằm sau dấu '
+# hoặc dấu "), mỗi token đổi thành một ký tự loại (s=chuỗi, 1=số, &=AND/OR, o=toán tử,
+# U=UNION, E=SELECT/DROP..., f=hàm, c=comment, ...) và 5 ký tự đầu tạo thành
+# fingerprint, ví dụ ' OR '1'='1  ->  "s&sos". Fingerprint được tra trong một tập
+# sinh ra từ văn phạm các dạng injection theo loại token (GRAMMAR: thoát khỏi giá trị rồi
+# nối điều kiện AND/OR, UNION SELECT, câu lệnh thứ hai sau ";", ORDER BY, comment...),
+# cộng với fingerprint của vài payload mẫu (SEED_PAYLOADS); kết quả được memo theo chuỗi đầu vào.
+#
+# Xem fingerprint của một chuỗi:
+#   python sqli_fingerprint.py "' OR 1=1--"
+import argparse
+import re
+from functools import lru_cache
+
+MAX_TOKENS = 5
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<block>/\*.*?\*/)
+  | (?P<comment>--[^\n]*|\#[^\n]*|/\*.*)
+  | (?P<string>'(?:[^']|'')*'?|"(?:[^"]|"")*"?)
+  | (?P<number>0x[0-9a-f]+|\d+(?:\.\d*)?(?:e[+-]?\d+)?|\.\d+)
+  | (?P<var>[@:$?][\w@]*)
+  | (?P<func>[a-z_][\w$]*(?=\s*\())
+  | (?P<word>[a-z_][\w$.]*|`[^`]*`?|\[[^\]]*\]?)
+  | (?P<op>\|\||&&|<>|!=|<=|>=|==|<<|>>|[=<>+\-*/%&|~!^])
+  | (?P<punct>[(),;])
+  | (?P<other>.)
+""", re.IGNORECASE | re.DOTALL | re.VERBOSE)
+
+# Từ khóa -> loại token (từ không có trong bảng là bareword "n")
+KEYWORDS = {
+    "UNION": "U", "INTERSECT": "U", "EXCEPT": "U",
+    "SELECT": "E", "INSERT": "E", "UPDATE": "E", "DELETE": "E", "DROP": "E", "CREATE": "E",
+    "ALTER": "E", "REPLACE": "E", "PRAGMA": "E", "ATTACH": "E", "DETACH": "E", "VACUUM": "E",
+    "EXEC": "E", "EXECUTE": "E", "DECLARE": "E", "SHUTDOWN": "E",
+    "AND": "&", "OR": "&", "XOR": "&", "&&": "&", "||": "&",
+    "LIKE": "o", "GLOB": "o", "REGEXP": "o", "MATCH": "o", "IS": "o", "IN": "o",
+    "BETWEEN": "o", "NOT": "o", "DIV": "o", "MOD": "o",
+    "FROM": "k", "WHERE": "k", "LIMIT": "k", "OFFSET": "k", "ORDER": "k", "GROUP": "k",
+    "BY": "k", "HAVING": "k", "INTO": "k", "VALUES": "k", "TABLE": "k", "SET": "k",
+    "CASE": "k", "WHEN": "k", "THEN": "k", "ELSE": "k", "END": "k", "AS": "k",
+    "NULL": "1", "TRUE": "1", "FALSE": "1",
+}
+# Bỏ qua hoàn toàn (UNION ALL SELECT ~ UNION SELECT)
+IGNORED_WORDS = frozenset({"ALL", "DISTINCT"})
+# Toán tử một ngôi: "-1", "NOT 1" được gộp thành số/giá trị phía sau
+UNARY_OPS = frozenset({"+", "-", "~", "!", "NOT"})
+_UNARY_PREV = frozenset({None, "o", "&", "(", ",", "k", "E"})
+
+CONTEXTS = ("", "'", '"')
+
+
+def tokenize(value, context=""):
+    """Trả về list (loại, giá trị) của tối đa MAX_TOKENS token đầu tiên."""
+    tokens = []
+    prev = None
+    for match in _TOKEN_RE.finditer(context + value):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "ws" or kind == "block":
+            continue
+        if kind == "string":
+            token = "s"
+        elif kind == "number":
+            token = "1"
+        elif kind == "var":
+            token = "v"
+        elif kind == "comment":
+            tokens.append(("c", text))
+            break  # Phần còn lại đều là comment
+        elif kind in ("func", "word"):
+            upper = text.upper()
+            if upper in IGNORED_WORDS:
+                continue
+            token = KEYWORDS.get(upper) or ("f" if kind == "func" else "n")
+            if upper in UNARY_OPS and prev in _UNARY_PREV:
+                continue
+        elif kind == "op":
+            token = KEYWORDS.get(text, "o")
+            if text in UNARY_OPS and prev in _UNARY_PREV:
+                continue
+        elif kind == "punct":
+            token = text
+        else:
+            token = "x"
+        tokens.append((token, text))
+        prev = token
+        if len(tokens) >= MAX_TOKENS:
+            break
+    return tokens
+
+
+def fingerprint(value, context=""):
+    return "".join(token for token, _ in tokenize(value, context))
+
+
+# Payload mẫu; fingerprint của chúng (trong ngữ cảnh phù hợp) tạo thành tập tra cứu
+SEED_PAYLOADS = [
+    # Thoát khỏi chuỗi '...'
+    "' OR '1'='1", "' OR '1'='1'--", "' OR 1=1", "' OR 1=1--", "' OR 1=1#", "' OR 1=1/*",
+    "' OR ''='", "' OR 'a'='a", "' OR 'x' LIKE 'x", "' OR 1", "' OR 1--", "' OR true--",
+    "' OR username IS NOT NULL--", "' OR username LIKE '%", "' OR 1=1 LIMIT 1--",
+    "admin'--", "admin'#", "admin' --", "admin'/*", "'--", "' ; --",
+    "' AND 1=0 UNION SELECT 1,2,3--", "' UNION SELECT username, email, 1 FROM users--",
+    "' UNION SELECT NULL, NULL, NULL--", "' UNION SELECT sqlite_version(), 1, 1--",
+    "' UNION SELECT name, sql, 1 FROM sqlite_master--", "x' UNION SELECT 1,2,3 '",
+    "'; DROP TABLE users;--", "'; DELETE FROM users;--", "'; UPDATE users SET email='x'--",
+    "'; INSERT INTO users VALUES (1,'a','b')--", "'; ATTACH DATABASE '/tmp/x' AS x--",
+    "' AND 1=1--", "' AND 1=2--", "' AND 'a'='a", "' AND substr(username,1,1)='a",
+    "' AND (SELECT count(*) FROM users) > 0--", "' AND length(username)>1--",
+    "' OR sleep(5)--", "' AND randomblob(1000000000)--", "' OR load_extension('x')--",
+    "' AND unicode(substr(email,1,1))>64--", "' OR (SELECT 1)--",
+    "') OR ('1'='1", "') OR 1=1--", "')) OR (('1'='1", "') UNION SELECT 1,2,3--",
+    "' || '1'='1", "' OR 1 IN (1)--", "' OR 2>1--", "' OR 1<2--", "' OR 1 BETWEEN 0 AND 2--",
+    "' GROUP BY 1--", "' ORDER BY 1--", "' HAVING 1=1--",
+    "' OR CASE WHEN 1=1 THEN 1 ELSE 0 END--",
+    # Cùng các payload trên nhưng cho chuỗi "..."
+    "\" OR \"1\"=\"1", "\" OR 1=1--", "admin\"--", "\" UNION SELECT 1,2,3--",
+    # Ngữ cảnh số (không có dấu nháy)
+    "1 OR 1=1", "1 OR 1=1--", "1 AND 1=2", "1 UNION SELECT 1,2,3--", "1; DROP TABLE users",
+    "1) OR (1=1", "1 AND sleep(5)", "1 OR true", "1 ORDER BY 1--", "1--",
+    "1 AND (SELECT count(*) FROM users) > 0",
+]
+
+
+def _seed_context(payload):
+    if "'" in payload:
+        return "'"
+    if '"' in payload:
+        return '"'
+    return ""
+
+
+# Văn phạm của payload theo loại token: ký hiệu viết hoa là luật, còn lại là loại token;
+# "*" là một token bất kỳ (hoặc hết chuỗi). Chỉ cần sinh tới MAX_TOKENS token đầu (phần sau không ảnh hưởng fingerprint).
+TOKEN_TYPES = "s1nvfo&UEkc(),;x"
+GRAMMAR = {
+    # Giá trị bị chèn vào: chuỗi đã đóng nháy (s), số (1) hoặc tên (n), có thể đóng thêm ngoặc
+    "ATTACK": [["s", "CLOSE", "TAIL"], ["1", "CLOSE", "TAIL"], ["n", ")", "CLOSE", "TAIL"],
+               ["n", "UNION"], ["n", "STACKED"], ["s", "o", "CALL"], ["s", "o", "(", "E", "*"]],
+    "CLOSE": [[], [")"], [")", ")"]],
+    "TAIL": [["END"], ["&", "COND", "END"], ["UNION"], ["STACKED"],
+             ["k", "k", "VALUE", "END"],    # ORDER BY 1--, GROUP BY 1--
+             ["k", "COND", "END"]],         # HAVING 1=1--, LIMIT 1--
+    "END": [[], ["c"], [";"], [";", "c"]],
+    "UNION": [["U", "E", "*", "*"], ["U", "(", "E", "*"]],
+    "STACKED": [[";", "E", "*", "*"]],
+    "COND": [["EXPR"], ["EXPR", "&", "COND"], ["(", "COND", ")"]],
+    "EXPR": [["VALUE"], ["VALUE", "o", "VALUE"], ["VALUE", "o", "(", "ARGS", ")"],
+             ["VALUE", "o", "VALUE", "&", "VALUE"]],   # IN (...), BETWEEN a AND b
+    "VALUE": [["1"], ["s"], ["n"], ["v"], ["CALL"], ["(", "E", "*"], ["k", "COND", "k"]],  # CASE WHEN
+    "CALL": [["f", "(", "ARGS", ")"]],
+    "ARGS": [[], ["VALUE"], ["VALUE", ",", "ARGS"]],
+}
+
+
+def generate_fingerprints(grammar=GRAMMAR, start="ATTACK", max_tokens=MAX_TOKENS):
+    """Mọi fingerprint (tối đa max_tokens token đầu) mà văn phạm sinh ra."""
+    results = set()
+    seen = set()
+    pending = [("", (start,))]
+    while pending:
+        prefix, symbols = pending.pop()
+        if (prefix, symbols) in seen:
+            continue
+        seen.add((prefix, symbols))
+        if len(prefix) == max_tokens or not symbols:
+            results.add(prefix)
+            continue
+        head, rest = symbols[0], symbols[1:]
+        if head in grammar:
+            for alternative in grammar[head]:
+                expanded = tuple(alternative) + rest
+                if len(expanded) <= 2 * max_tokens:  # Luật đệ quy: chặn độ sâu
+                    pending.append((prefix, expanded))
+        elif head == "*":
+            results.add(prefix)  # Payload có thể kết thúc ở đây
+            for token in TOKEN_TYPES:
+                pending.append((prefix + token, rest))
+        else:
+            pending.append((prefix + head, rest))
+    return results
+
+
+# Tập fingerprint độc hại (bỏ fingerprint 1 token: "s", "n", "1" là đầu vào thường)
+FINGERPRINTS = frozenset(
+    fp for fp in generate_fingerprints() | {fingerprint(p, _seed_context(p)) for p in SEED_PAYLOADS}
+    if len(fp) > 1
+)
+
+# Đầu vào chỉ gồm ký tự "an toàn" (username, email...) và không có "--" luôn là một token duy nhất
+_SAFE_RE = re.compile(r"(?!.*--)[\w.@+-]*\Z")
+
+
+@lru_cache(maxsize=4096)
+def detect(value):
+    """Trả về fingerprint khớp đầu tiên nếu `value` trông giống SQL injection, ngược lại None."""
+    if _SAFE_RE.match(value):
+        return None
+    for context in CONTEXTS:
+        # Không có dấu nháy tương ứng thì cả chuỗi chỉ là một token "s"
+        if context and context not in value:
+            continue
+        fp = fingerprint(value, context)
+        if fp in FINGERPRINTS:
+            return fp
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show SQL-injection fingerprints for an input")
+    parser.add_argument("value")
+    args = parser.parse_args()
+    for context in CONTEXTS:
+        fp = fingerprint(args.value, context)
+        print(f"context {context or 'none':>4}: {fp:<6} {'MATCH' if fp in FINGERPRINTS else ''}")
+    print(f"detect: {detect(args.value)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,24 @@
 from flask import Flask, request, jsonify, render_template
 import sqlite3
 import os
+import sys
 
-app = Flask(__name__)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import SQLiteConnectionPool
+from users_db import init_db
 
+app = Flask(__name__)
 
-# Khởi tạo database SQLite
-def init_db():
-    if os.path.exists("../users.db"):
-        os.remove("../users.db")
+DB_PATH = "../users.db"
 
-    conn = sqlite3.connect("../users.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            email TEXT NOT NULL
-        )
-    """)
-    sample_users = [
-        ("alice", "alice@example.com"),
-        ("bob", "bob@example.com"),
-        ("charlie", "charlie@example.com")
-    ]
-    cursor.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)", sample_users)
-    conn.commit()
-    conn.close()
 
+# Khởi tạo/migrate database SQLite khi khởi động (bỏ qua nếu schema đã mới nhất)
+init_db(DB_PATH)
 
-init_db()
+# Pool kết nối chỉ đọc cho các route tìm kiếm (mỗi request mượn một kết nối, trả lại khi xong)
+read_db = SQLiteConnectionPool(DB_PATH, readonly=True)
+read_db.init_app(app)
 
 
 # Tìm kiếm người dùng - Phiên bản không an toàn (SQL Injection)
@@ -39,17 +28,14 @@ def search_insecure():
     if not username:
         return jsonify({"error": "Missing username parameter"}), 400
 
-    conn = sqlite3.connect("../users.db")
-    cursor = conn.cursor()
     query = f"SELECT * FROM users WHERE username = '{username}'"
     try:
+        cursor = read_db.connection().cursor()
         cursor.execute(query)
         results = cursor.fetchall()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({"error": str(e)}), 500
 
-    conn.close()
     if not results:
         return jsonify({"message": "No users found"}), 404
 
@@ -64,17 +50,14 @@ def search_secure():
     if not username:
         return jsonify({"error": "Missing username parameter"}), 400
 
-    conn = sqlite3.connect("../users.db")
-    cursor = conn.cursor()
     query = "SELECT * FROM users WHERE username = ?"
     try:
+        cursor = read_db.connection().cursor()
         cursor.execute(query, (username,))
         results = cursor.fetchall()
     except sqlite3.Error as e:
-        conn.close()
         return jsonify({"error": str(e)}), 500
 
-    conn.close()
     if not results:
         return jsonify({"message": "No users found"}), 404
 
@@ -92,13 +75,11 @@ def index():
     message = None
 
     if username:
-        conn = sqlite3.connect("../users.db")
-        cursor = conn.cursor()
-
         if mode == "insecure":
             # Phiên bản không an toàn
             query = f"SELECT * FROM users WHERE username = '{username}'"
             try:
+                cursor = read_db.connection().cursor()
                 cursor.execute(query)
                 results = cursor.fetchall()
             except sqlite3.Error as e:
@@ -108,14 +89,13 @@ def index():
             # Phiên bản an toàn
             query = "SELECT * FROM users WHERE username = ?"
             try:
+                cursor = read_db.connection().cursor()
                 cursor.execute(query, (username,))
                 results = cursor.fetchall()
             except sqlite3.Error as e:
                 error = str(e)
                 results = None
 
-        conn.close()
-
         if results:
             users = [{"id": row[0], "username": row[1], "email": row[2]} for row in results]
         elif not error:
@@ -0,0 +1,201 @@
+# Kho người dùng trong bộ nhớ, dùng chung cho các demo A01, A04, A05.
+# Thay cho việc duyệt tuần tự list `users` ở mỗi request: tra cứu theo id
+# và theo username đều là O(1) nhờ hai chỉ mục dict.
+import threading
+import time
+from collections import deque
+
+
+class UserStore:
+    """
+    Danh sách người dùng có chỉ mục băm theo "id" và "username".
+    Hai chỉ mục luôn được cập nhật cùng nhau khi thêm/xóa bản ghi.
+    Thứ tự duyệt giữ nguyên thứ tự thêm vào (giống list cũ).
+    """
+
+    def __init__(self, records=()):
+        self._by_id = {}
+        self._by_username = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        if record["id"] in self._by_id:
+            raise ValueError(f"Duplicate user id: {record['id']}")
+        if record["username"] in self._by_username:
+            raise ValueError(f"Duplicate username: {record['username']}")
+        self._by_id[record["id"]] = record
+        self._by_username[record["username"]] = record
+        return record
+
+    def remove(self, record):
+        # Giữ cùng ngữ nghĩa với list.remove: lỗi nếu bản ghi không tồn tại
+        if self._by_id.get(record["id"]) is not record:
+            raise ValueError("User not in store")
+        del self._by_id[record["id"]]
+        del self._by_username[record["username"]]
+
+    def get_by_id(self, user_id):
+        return self._by_id.get(user_id)
+
+    def get_by_username(self, username):
+        # username lấy từ JSON có thể là list/dict (không hash được)
+        try:
+            return self._by_username.get(username)
+        except TypeError:
+            return None
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, record):
+        return self._by_id.get(record["id"]) is record
+
+
+class ConcurrentUserStore(UserStore):
+    """
+    UserStore an toàn khi nhiều thread cùng thêm/xóa (server chạy threaded).
+    Khóa theo dải (striped locks): id và username được băm vào một trong `stripes`
+    khóa, nên các thao tác trên những người dùng khác nhau hầu như không chặn nhau.
+    Luôn lấy khóa id trước rồi tới khóa username để tránh deadlock.
+
+    Xóa mềm: tombstone(id) chỉ đánh dấu bản ghi là đã xóa (O(1), ẩn ngay với mọi
+    tra cứu); compact() / thread compactor gỡ hẳn các bản ghi đó khỏi hai chỉ mục
+    theo từng batch nhỏ, ngoài luồng xử lý request.
+    """
+
+    def __init__(self, records=(), stripes=64):
+        self._id_locks = [threading.Lock() for _ in range(stripes)]
+        self._name_locks = [threading.Lock() for _ in range(stripes)]
+        self._tombstones = set()        # id đã bị xóa mềm nhưng chưa gỡ khỏi chỉ mục
+        self._pending = deque()         # Thứ tự gỡ cho compactor
+        self.compacted = 0
+        self._compactor = None
+        self._stop_compactor = threading.Event()
+        super().__init__(records)
+
+    def _locks_for(self, user_id, username):
+        return (self._id_locks[hash(user_id) % len(self._id_locks)],
+                self._name_locks[hash(username) % len(self._name_locks)])
+
+    def add(self, record):
+        # id/username của bản ghi đã xóa mềm được gỡ hẳn trước để có thể dùng lại
+        old = self._by_id.get(record["id"])
+        if old is not None and old["id"] in self._tombstones:
+            self._purge(old["id"])
+        old = super().get_by_username(record["username"])
+        if old is not None and old["id"] in self._tombstones:
+            self._purge(old["id"])
+        id_lock, name_lock = self._locks_for(record["id"], record["username"])
+        with id_lock, name_lock:
+            return super().add(record)
+
+    def pop(self, user_id):
+        """Xóa và trả về người dùng có id `user_id` (O(1)), hoặc None nếu không còn tồn tại."""
+        while True:
+            record = self._by_id.get(user_id)
+            if record is None:
+                return None
+            id_lock, name_lock = self._locks_for(user_id, record["username"])
+            with id_lock, name_lock:
+                # Thread khác có thể đã xóa (hoặc thay) bản ghi trước khi lấy được khóa
+                if self._by_id.get(user_id) is not record:
+                    continue
+                if user_id in self._tombstones:
+                    return None
+                del self._by_id[user_id]
+                del self._by_username[record["username"]]
+                return record
+
+    def remove(self, record):
+        id_lock, name_lock = self._locks_for(record["id"], record["username"])
+        with id_lock, name_lock:
+            if record["id"] in self._tombstones:
+                raise ValueError("User not in store")
+            super().remove(record)
+
+    def tombstone(self, user_id):
+        """Xóa mềm người dùng `user_id` (O(1)); trả về bản ghi, hoặc None nếu không còn tồn tại."""
+        record = self._by_id.get(user_id)
+        if record is None:
+            return None
+        with self._id_locks[hash(user_id) % len(self._id_locks)]:
+            if self._by_id.get(user_id) is not record or user_id in self._tombstones:
+                return None
+            self._tombstones.add(user_id)
+            self._pending.append(user_id)
+        return record
+
+    def _purge(self, user_id):
+        record = self._by_id.get(user_id)
+        if record is None:
+            self._tombstones.discard(user_id)
+            return False
+        id_lock, name_lock = self._locks_for(user_id, record["username"])
+        with id_lock, name_lock:
+            if user_id not in self._tombstones or self._by_id.get(user_id) is not record:
+                return False
+            del self._by_id[user_id]
+            del self._by_username[record["username"]]
+            self._tombstones.discard(user_id)
+        self.compacted += 1
+        return True
+
+    def compact(self, max_items=None):
+        """Gỡ tối đa `max_items` bản ghi đã xóa mềm khỏi chỉ mục; trả về số bản ghi đã gỡ."""
+        purged = 0
+        while self._pending and (max_items is None or purged < max_items):
+            try:
+                user_id = self._pending.popleft()
+            except IndexError:
+                break
+            if self._purge(user_id):
+                purged += 1
+        return purged
+
+    def start_compactor(self, interval=1.0, batch_size=1000):
+        """Chạy compact() trong thread nền: mỗi `interval` giây, gỡ theo batch `batch_size`."""
+        if self._compactor is not None:
+            return
+        def run():
+            while not self._stop_compactor.wait(interval):
+                while self._pending and not self._stop_compactor.is_set():
+                    self.compact(batch_size)
+                    time.sleep(0)  # Nhường GIL cho các request giữa hai batch
+        self._compactor = threading.Thread(target=run, name="user-store-compactor", daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self):
+        self._stop_compactor.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self._stop_compactor.clear()
+
+    def compaction_stats(self):
+        return {"tombstones": len(self._tombstones), "pending": len(self._pending), "compacted": self.compacted}
+
+    def get_by_id(self, user_id):
+        record = self._by_id.get(user_id)
+        if record is None or user_id in self._tombstones:
+            return None
+        return record
+
+    def get_by_username(self, username):
+        record = super().get_by_username(username)
+        if record is None or record["id"] in self._tombstones:
+            return None
+        return record
+
+    def __iter__(self):
+        tombstones = self._tombstones
+        return iter([record for record in list(self._by_id.values()) if record["id"] not in tombstones])
+
+    def __len__(self):
+        return len(self._by_id) - len(self._tombstones)
+
+    def __contains__(self, record):
+        return super().__contains__(record) and record["id"] not in self._tombstones
@@ -0,0 +1,167 @@
+# Schema và dữ liệu của database users.db (dùng chung cho A03 và template/A03-index.py).
+# Phiên bản schema được lưu trong bảng schema_version: khi khởi động, nếu database
+# đã ở phiên bản mới nhất thì init_db() trả về ngay, chỉ chạy các migration còn thiếu.
+#
+# Seed nhanh hàng loạt người dùng giả (một transaction, executemany theo batch,
+# dựng chỉ mục full-text sau khi nạp xong):
+#   python users_db.py seed --rows 1000000 [--db users.db]
+import argparse
+import sqlite3
+import time
+
+from db_pool import enable_wal
+
+# Trigger giữ users_fts đồng bộ với bảng users
+FTS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+        INSERT INTO users_fts(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+]
+DROP_FTS_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS users_fts_insert",
+    "DROP TRIGGER IF EXISTS users_fts_delete",
+    "DROP TRIGGER IF EXISTS users_fts_update",
+]
+
+
+def _migrate_v1(cursor):
+    # Tạo bảng users và dữ liệu mẫu
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            email TEXT NOT NULL
+        )
+    """)
+    sample_users = [
+        ("alice", "alice@example.com"),
+        ("bob", "bob@example.com"),
+        ("charlie", "charlie@example.com")
+    ]
+    cursor.executemany("INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)", sample_users)
+
+
+def _migrate_v2(cursor):
+    # Chỉ mục full-text (FTS5, tokenizer trigram) cho tìm kiếm theo chuỗi con trên username/email
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+            username, email, content='users', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    for statement in FTS_TRIGGERS:
+        cursor.execute(statement)
+    # Dựng chỉ mục từ dữ liệu đã có trong bảng users
+    cursor.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+
+
+# (phiên bản, hàm migration) theo thứ tự tăng dần
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _schema_version(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    if cursor.fetchone() is None:
+        return 0
+    row = cursor.execute("SELECT version FROM schema_version").fetchone()
+    return row[0] if row else 0
+
+
+def init_db(path):
+    """
+    Đưa database lên SCHEMA_VERSION. Nếu đã đúng phiên bản thì chỉ tốn một truy vấn.
+    Trả về danh sách các phiên bản migration đã chạy.
+    """
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        cursor = conn.cursor()
+        if _schema_version(cursor) == SCHEMA_VERSION:
+            return []
+        conn.close()
+        enable_wal(path)
+        conn = sqlite3.connect(path, isolation_level=None)
+        cursor = conn.cursor()
+        # Chạy migration trong một transaction ghi (chặn tiến trình khác migrate cùng lúc)
+        cursor.execute("BEGIN IMMEDIATE")
+        current = _schema_version(cursor)
+        applied = []
+        for version, migrate in MIGRATIONS:
+            if version > current:
+                migrate(cursor)
+                applied.append(version)
+        cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        cursor.execute("DELETE FROM schema_version")
+        cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+        cursor.execute("COMMIT")
+        return applied
+    finally:
+        conn.close()
+
+
+def seed_users(path, rows, batch_size=50_000):
+    """
+    Thêm `rows` người dùng giả trong một transaction. Trigger FTS được gỡ ra
+    trong lúc nạp và chỉ mục full-text được dựng lại một lần ở cuối.
+    Trả về (số dòng đã thêm, số giây).
+    """
+    init_db(path)
+    start = time.perf_counter()
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA cache_size=-262144")  # 256MB cho lúc nạp
+        conn.execute("BEGIN IMMEDIATE")
+        for statement in DROP_FTS_TRIGGERS:
+            conn.execute(statement)
+        first = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]) + 1
+        before = conn.total_changes
+        for batch_start in range(first, first + rows, batch_size):
+            batch_end = min(batch_start + batch_size, first + rows)
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, email) VALUES (?, ?)",
+                ((f"user{i:08d}", f"user{i:08d}@example.com") for i in range(batch_start, batch_end))
+            )
+        inserted = conn.total_changes - before
+        # Dựng chỉ mục FTS một lần rồi gắn lại trigger
+        conn.execute("INSERT INTO users_fts(users_fts) VALUES ('rebuild')")
+        for statement in FTS_TRIGGERS:
+            conn.execute(statement)
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return inserted, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="users.db schema and seeding tools")
+    parser.add_argument("--db", default="users.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("init", help="create or migrate the schema")
+    seed = sub.add_parser("seed", help="bulk-insert synthetic users")
+    seed.add_argument("--rows", type=int, default=1_000_000)
+    seed.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if args.command == "init":
+        start = time.perf_counter()
+        applied = init_db(args.db)
+        print(f"schema v{SCHEMA_VERSION} (applied {applied or 'nothing'}) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    else:
+        inserted, elapsed = seed_users(args.db, args.rows, args.batch_size)
+        print(f"seeded {inserted} users in {elapsed:.2f}s ({inserted / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()